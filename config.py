@@ -1,21 +1,123 @@
 
 import os
+import re
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "Conut bakery Scaled Data")
 ARTIFACTS_DIR = os.path.join(BASE_DIR, "artifacts")
-os.makedirs(ARTIFACTS_DIR, exist_ok=True)
-
-CLEANED_ORDERS_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_orders.csv")
-CLEANED_SALES_DETAIL_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_sales_detail.csv")
-CLEANED_MONTHLY_SALES_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_monthly_sales.csv")
-CLEANED_ATTENDANCE_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_attendance.csv")
-CLEANED_ITEMS_GROUPS_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_items_by_group.csv")
-CLEANED_AVG_SALES_MENU_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_avg_sales_menu.csv")
-CLEANED_TAX_BRANCH_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_tax_by_branch.csv")
-
-DEMAND_FORECAST_ARTIFACT = os.path.join(ARTIFACTS_DIR, "demand_forecast.json")
-COMBO_ARTIFACT = os.path.join(ARTIFACTS_DIR, "combo_recommendations.json")
-EXPANSION_ARTIFACT = os.path.join(ARTIFACTS_DIR, "expansion_feasibility.json")
-STAFFING_ARTIFACT = os.path.join(ARTIFACTS_DIR, "staffing_recommendations.json")
-COFFEE_MILKSHAKE_STRATEGY_ARTIFACT = os.path.join(ARTIFACTS_DIR, "coffee_milkshake_strategy.json")
+BENCHMARK_RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+# Published snapshots kept besides the current one, for instant rollback.
+SNAPSHOT_KEEP = int(os.environ.get("CONUT_SNAPSHOT_KEEP", "5"))
+# Running API that watch mode notifies after refreshing artifacts.
+API_BASE_URL = os.environ.get("CONUT_API_URL", "http://127.0.0.1:8000")
+# Shared secret for the state-changing admin endpoints (reload, rollback), sent as X-Admin-Token.
+# When unset they only accept same-host requests that carry no browser Origin.
+ADMIN_TOKEN = os.environ.get("CONUT_ADMIN_TOKEN") or None
+
+# Month names as they appear in the REP_S exports, in calendar order.
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December"]
+
+# Named datasets (one per franchise group): datasets/<name>/data holds its exports and
+# datasets/<name>/artifacts its outputs. "default" is DATA_DIR / ARTIFACTS_DIR as last set by configure()
+# (the bundled data unless e.g. the benchmark suite points it elsewhere).
+DEFAULT_DATASET = "default"
+DATASET = DEFAULT_DATASET
+DATASETS_DIR = os.environ.get("CONUT_DATASETS_DIR", os.path.join(BASE_DIR, "datasets"))
+# Dirs of the default dataset; configure() moves them unless a named dataset is in use.
+_DEFAULT_DIRS = (DATA_DIR, ARTIFACTS_DIR)
+# Memory budget for parsed artifacts the API keeps resident, shared by all datasets (LRU).
+ARTIFACT_CACHE_MB = float(os.environ.get("CONUT_ARTIFACT_CACHE_MB", "256"))
+# Cap on cached artifacts; each memory-mapped one holds open file descriptors until evicted.
+ARTIFACT_CACHE_ENTRIES = int(os.environ.get("CONUT_ARTIFACT_CACHE_ENTRIES", "128"))
+# Threads for chunked batch forecasting (item x branch series).
+FORECAST_WORKERS = int(os.environ.get("CONUT_FORECAST_WORKERS", str(os.cpu_count() or 1)))
+
+
+def configure(data_dir=None, artifacts_dir=None):
+    """
+    Point the pipeline at another data / artifacts root and recompute every derived path.
+    Used by the benchmark suite to run loaders and objectives against synthetic exports.
+    """
+    global DATA_DIR, ARTIFACTS_DIR, _DEFAULT_DIRS
+    global CLEANED_ORDERS_PATH, CLEANED_SALES_DETAIL_PATH, CLEANED_MONTHLY_SALES_PATH, CLEANED_ATTENDANCE_PATH
+    global CLEANED_ITEMS_GROUPS_PATH, CLEANED_AVG_SALES_MENU_PATH, CLEANED_TAX_BRANCH_PATH
+    global DICTIONARIES_DIR, SNAPSHOTS_DIR, CURRENT_SNAPSHOT_POINTER
+    global DEMAND_FORECAST_ARTIFACT, COMBO_ARTIFACT, EXPANSION_ARTIFACT, STAFFING_ARTIFACT, COFFEE_MILKSHAKE_STRATEGY_ARTIFACT
+    global CUSTOMER_FEATURES_ARTIFACT, CUSTOMER_SEGMENTS_ARTIFACT
+    global CUSTOMER_COHORTS_ARTIFACT, CUSTOMER_COHORT_STATE_ARTIFACT
+    global BRANCH_FEATURES_ARTIFACT, BRANCH_INDEX_ARTIFACT, BRANCH_SIMILARITY_ARTIFACT
+    global ITEM_FORECASTS_ARTIFACT, ITEM_FORECAST_SUMMARY_ARTIFACT
+    global VALIDATION_REPORT_PATH, QUARANTINE_DIR
+
+    if data_dir:
+        DATA_DIR = data_dir
+    if artifacts_dir:
+        ARTIFACTS_DIR = artifacts_dir
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    if DATASET == DEFAULT_DATASET:
+        _DEFAULT_DIRS = (DATA_DIR, ARTIFACTS_DIR)
+
+    CLEANED_ORDERS_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_orders.csv")
+    CLEANED_SALES_DETAIL_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_sales_detail.csv")
+    CLEANED_MONTHLY_SALES_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_monthly_sales.csv")
+    CLEANED_ATTENDANCE_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_attendance.csv")
+    CLEANED_ITEMS_GROUPS_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_items_by_group.csv")
+    CLEANED_AVG_SALES_MENU_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_avg_sales_menu.csv")
+    CLEANED_TAX_BRANCH_PATH = os.path.join(ARTIFACTS_DIR, "cleaned_tax_by_branch.csv")
+
+    # Reconciliation of cleaned tables against the reports' own total rows (see src/data/reconciliation.py).
+    VALIDATION_REPORT_PATH = os.path.join(ARTIFACTS_DIR, "validation_report.json")
+    QUARANTINE_DIR = os.path.join(ARTIFACTS_DIR, "quarantine")
+
+    # Global code <-> string dictionaries for products, customers, branches and employees.
+    DICTIONARIES_DIR = os.path.join(ARTIFACTS_DIR, "dictionaries")
+
+    # JSON artifacts are published as immutable snapshot directories; CURRENT names the live one.
+    SNAPSHOTS_DIR = os.path.join(ARTIFACTS_DIR, "snapshots")
+    CURRENT_SNAPSHOT_POINTER = os.path.join(ARTIFACTS_DIR, "CURRENT")
+
+    DEMAND_FORECAST_ARTIFACT = os.path.join(ARTIFACTS_DIR, "demand_forecast.json")
+    COMBO_ARTIFACT = os.path.join(ARTIFACTS_DIR, "combo_recommendations.json")
+    EXPANSION_ARTIFACT = os.path.join(ARTIFACTS_DIR, "expansion_feasibility.json")
+    STAFFING_ARTIFACT = os.path.join(ARTIFACTS_DIR, "staffing_recommendations.json")
+    COFFEE_MILKSHAKE_STRATEGY_ARTIFACT = os.path.join(ARTIFACTS_DIR, "coffee_milkshake_strategy.json")
+    CUSTOMER_FEATURES_ARTIFACT = os.path.join(ARTIFACTS_DIR, "customer_features.csv")
+    CUSTOMER_SEGMENTS_ARTIFACT = os.path.join(ARTIFACTS_DIR, "customer_segments.json")
+    CUSTOMER_COHORTS_ARTIFACT = os.path.join(ARTIFACTS_DIR, "customer_cohorts.json")
+    CUSTOMER_COHORT_STATE_ARTIFACT = os.path.join(ARTIFACTS_DIR, "customer_cohort_state.csv")
+    BRANCH_FEATURES_ARTIFACT = os.path.join(ARTIFACTS_DIR, "branch_features.csv")
+    BRANCH_INDEX_ARTIFACT = os.path.join(ARTIFACTS_DIR, "branch_index.joblib")
+    BRANCH_SIMILARITY_ARTIFACT = os.path.join(ARTIFACTS_DIR, "branch_similarity.json")
+    ITEM_FORECASTS_ARTIFACT = os.path.join(ARTIFACTS_DIR, "item_forecasts.csv")
+    ITEM_FORECAST_SUMMARY_ARTIFACT = os.path.join(ARTIFACTS_DIR, "item_forecast_summary.json")
+
+
+def dataset_dirs(name):
+    """(data_dir, artifacts_dir) of a named dataset. Raises ValueError for names that are not plain identifiers."""
+    if not name or name == DEFAULT_DATASET:
+        return _DEFAULT_DIRS
+    if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9_-]*", name):
+        raise ValueError(f"Invalid dataset name: {name!r}")
+    root = os.path.join(DATASETS_DIR, name)
+    return os.path.join(root, "data"), os.path.join(root, "artifacts")
+
+
+def list_datasets():
+    """The default dataset plus every datasets/<name>/ directory."""
+    names = [DEFAULT_DATASET]
+    if os.path.isdir(DATASETS_DIR):
+        names += sorted(d for d in os.listdir(DATASETS_DIR)
+                        if d != DEFAULT_DATASET and os.path.isdir(os.path.join(DATASETS_DIR, d)))
+    return names
+
+
+def use_dataset(name):
+    """Point the whole process (pipeline, objectives, stores) at one named dataset."""
+    global DATASET
+    data_dir, artifacts_dir = dataset_dirs(name)
+    DATASET = name or DEFAULT_DATASET
+    configure(data_dir, artifacts_dir)
+
+
+configure()
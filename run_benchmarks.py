@@ -0,0 +1,298 @@
+
+# SCALING BENCHMARK SUITE
+
+# Run: python run_benchmarks.py --scales 1,10,100
+# 1. Generates synthetic REP_S exports at each scale (src/data/synthetic.py)
+# 2. Times every ingestion loader, every objective and every API endpoint against them
+# 3. Records wall time, throughput and peak memory in benchmarks/results/<timestamp>_<commit>.json
+# 4. Optionally compares against an earlier results file to flag regressions
+
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+import config
+
+from src.data import ingestion
+from src.data.snapshots import staging
+from src.data.store import DataStore
+from src.data.synthetic import generate_dataset
+from src.objectives.combo_optimization import run_combo_optimization
+from src.objectives.demand_forecasting import run_demand_forecasting
+from src.objectives.expansion_feasibility import run_expansion_feasibility
+from src.objectives.shift_staffing import run_shift_staffing
+from src.objectives.coffee_milkshake_strategy import run_coffee_milkshake_strategy
+from src.objectives.customer_features import run_customer_features
+from src.objectives.customer_cohorts import run_customer_cohorts
+from src.objectives.branch_similarity import run_branch_similarity
+from src.objectives.item_forecasting import run_item_forecasting
+
+LOADERS = [
+    ("orders", ingestion.load_and_clean_customer_orders, "rep_s_00150.csv"),
+    ("sales_detail", ingestion.load_and_clean_sales_detail, "REP_S_00502.csv"),
+    ("monthly_sales", ingestion.load_and_clean_monthly_sales, "rep_s_00334_1_SMRY.csv"),
+    ("attendance", ingestion.load_and_clean_attendance, "REP_S_00461.csv"),
+    ("items_by_group", ingestion.load_and_clean_items_by_group, "rep_s_00191_SMRY.csv"),
+    ("avg_sales_menu", ingestion.load_and_clean_avg_sales_menu, "rep_s_00435_SMRY.csv"),
+    ("tax_by_branch", ingestion.load_and_clean_tax_by_branch, "REP_S_00194_SMRY.csv"),
+]
+
+# (name, function, tables it consumes in argument order)
+OBJECTIVES = [
+    ("combo_optimization", run_combo_optimization, ["sales_detail"]),
+    ("demand_forecasting", run_demand_forecasting, ["monthly_sales"]),
+    ("expansion_feasibility", run_expansion_feasibility, ["monthly_sales", "tax_by_branch", "avg_sales_menu"]),
+    ("shift_staffing", run_shift_staffing, ["attendance", "monthly_sales"]),
+    ("coffee_milkshake_strategy", run_coffee_milkshake_strategy, ["items_by_group", "sales_detail"]),
+    ("customer_features", run_customer_features, ["orders", "sales_detail", "items_by_group"]),
+    ("customer_cohorts", run_customer_cohorts, ["orders"]),
+    ("branch_similarity", run_branch_similarity, ["monthly_sales", "tax_by_branch", "avg_sales_menu", "attendance", "items_by_group"]),
+    ("item_forecasting", run_item_forecasting, ["items_by_group", "monthly_sales"]),
+]
+
+ENDPOINTS = [
+    "/api/combo_recommendations",
+    "/api/demand_forecast",
+    "/api/expansion_feasibility",
+    "/api/staffing_recommendation",
+    "/api/coffee_milkshake_strategy",
+    "/api/customers/segments",
+    "/api/customer_cohorts",
+    "/api/item_forecast?branch=Conut",
+    "/api/export/sales_detail",
+    "/api/tools/list",
+    # (path, JSON body) entries are POSTed: one batch answering what the GETs above take five round trips for.
+    ("/api/tools/batch", {"calls": [{"tool": "demand_forecast"}, {"tool": "staffing_recommendation"},
+                                    {"tool": "combo_recommendations", "args": {"limit": 5}},
+                                    {"tool": "customer_segments"}, {"tool": "customer_cohorts"}]}),
+]
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _count_lines(path):
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def _measure(fn, repeat, track_memory):
+    """Run fn `repeat` times; return (result, best wall seconds, peak MB of one traced run)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    peak_mb = None
+    if track_memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = round(peak / 1e6, 3)
+    return result, best, peak_mb
+
+
+def _record(scale, stage, name, wall, peak_mb, rows):
+    return {
+        "scale": scale,
+        "stage": stage,
+        "name": name,
+        "wall_s": round(wall, 6),
+        "peak_mb": peak_mb,
+        "rows": rows,
+        "rows_per_s": round(rows / wall, 1) if wall > 0 and rows else None,
+    }
+
+
+def bench_loaders(scale, data_dir, repeat, track_memory):
+    results, tables = [], {}
+    for name, fn, filename in LOADERS:
+        src_rows = _count_lines(os.path.join(data_dir, filename))
+        df, wall, peak = _measure(fn, repeat, track_memory)
+        tables[name] = df
+        results.append(_record(scale, "loader", name, wall, peak, src_rows))
+        print(f"    loader {name:<28} {wall * 1000:10.1f} ms  {src_rows:>10} lines")
+    return results, tables
+
+
+def bench_objectives(scale, tables, repeat, track_memory):
+    results = []
+    store = DataStore(tables)
+    # One staged snapshot for the whole stage, as in run_pipeline.py, so publishing is not timed per objective.
+    with staging():
+        for name, fn, inputs in OBJECTIVES:
+            rows = sum(len(store.table(t)) for t in inputs)
+            call = lambda fn=fn, inputs=inputs: fn(*[store.table(t) for t in inputs])
+            _, wall, peak = _measure(call, repeat, track_memory)
+            results.append(_record(scale, "objective", name, wall, peak, rows))
+            print(f"    objective {name:<25} {wall * 1000:10.1f} ms  {rows:>10} rows")
+    return results
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_api(scale, requests_per_endpoint, track_memory):
+    import uvicorn
+    from src.api.app import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    results = []
+    try:
+        for path in ENDPOINTS:
+            path, body = path if isinstance(path, tuple) else (path, None)
+            url = f"http://127.0.0.1:{port}{path}"
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+
+            def hit(url=url, data=data):
+                for _ in range(requests_per_endpoint):
+                    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+                    with urllib.request.urlopen(req, timeout=30) as resp:
+                        resp.read()
+
+            _, wall, peak = _measure(hit, 1, track_memory)
+            rec = _record(scale, "api", path, wall, peak, requests_per_endpoint)
+            rec["latency_ms"] = round(wall * 1000 / requests_per_endpoint, 3)
+            results.append(rec)
+            print(f"    api {path:<31} {rec['latency_ms']:10.2f} ms/req")
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+    return results
+
+
+def compare(current, baseline_path, threshold):
+    """Print wall-time ratios against a baseline results file; return list of regressions."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    base = {(r["scale"], r["stage"], r["name"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\nComparison vs {baseline.get('commit')} ({os.path.basename(baseline_path)}):")
+    for r in current["results"]:
+        b = base.get((r["scale"], r["stage"], r["name"]))
+        if not b or not b["wall_s"]:
+            continue
+        ratio = r["wall_s"] / b["wall_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append({**r, "baseline_wall_s": b["wall_s"], "ratio": round(ratio, 3)})
+        print(f"  x{r['scale']:<6} {r['stage']:<9} {r['name']:<31} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def _latest_result(exclude=None):
+    if not os.path.isdir(config.BENCHMARK_RESULTS_DIR):
+        return None
+    files = sorted(f for f in os.listdir(config.BENCHMARK_RESULTS_DIR) if f.endswith(".json"))
+    files = [os.path.join(config.BENCHMARK_RESULTS_DIR, f) for f in files]
+    files = [f for f in files if f != exclude]
+    return files[-1] if files else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark loaders, objectives and API endpoints on synthetic data.")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated multipliers, e.g. 1,10,100,1000.")
+    parser.add_argument("--dims", default="customers,branches,months",
+                        help="Which dimensions the multiplier applies to (attendance grows with branches x months).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per step; the best is recorded.")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per API endpoint.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the extra tracemalloc run per step.")
+    parser.add_argument("--no-api", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", nargs="?", const="latest", help="Baseline results file (default: latest).")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression.")
+    parser.add_argument("--keep-data", action="store_true", help="Keep generated exports and artifacts.")
+    args = parser.parse_args(argv)
+
+    scales = [float(s) for s in args.scales.split(",") if s]
+    dims = {d.strip() for d in args.dims.split(",") if d.strip()}
+    track_memory = not args.no_memory
+    original_data, original_artifacts = config.DATA_DIR, config.ARTIFACTS_DIR
+    work = tempfile.mkdtemp(prefix="conut_bench_")
+
+    run = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "dims": sorted(dims),
+        "results": [],
+    }
+    try:
+        for scale in scales:
+            label = f"{scale:g}"
+            data_dir = os.path.join(work, f"x{label}", "data")
+            artifacts_dir = os.path.join(work, f"x{label}", "artifacts")
+            print(f"Scale x{label}: generating exports...")
+            t0 = time.perf_counter()
+            rows = generate_dataset(
+                data_dir,
+                customers=scale if "customers" in dims else 1,
+                branches=scale if "branches" in dims else 1,
+                months=scale if "months" in dims else 1,
+                seed=args.seed,
+                sample_dir=original_data,
+            )
+            run["results"].append(_record(label, "generate", "synthetic", time.perf_counter() - t0, None, sum(rows.values())))
+
+            config.configure(data_dir=data_dir, artifacts_dir=artifacts_dir)
+            loader_results, tables = bench_loaders(label, data_dir, args.repeat, track_memory)
+            run["results"].extend(loader_results)
+            run["results"].extend(bench_objectives(label, tables, args.repeat, track_memory))
+            if not args.no_api:
+                run["results"].extend(bench_api(label, args.requests, track_memory))
+    finally:
+        config.configure(data_dir=original_data, artifacts_dir=original_artifacts)
+        if not args.keep_data:
+            shutil.rmtree(work, ignore_errors=True)
+        else:
+            print("Generated data kept in:", work)
+
+    os.makedirs(config.BENCHMARK_RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(config.BENCHMARK_RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{run['commit']}.json")
+    if args.compare:
+        baseline = _latest_result(exclude=out_path) if args.compare == "latest" else args.compare
+        if baseline:
+            run["regressions"] = compare(run, baseline, args.threshold)
+        else:
+            print("No baseline results to compare against.")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print("\nResults written to:", out_path)
+    return 1 if run.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,46 +1,123 @@
 import sys
 import os
+import time
+import inspect
+import argparse
+import traceback
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config
 
-from src.data.ingestion import run_ingestion
+from src.data.ingestion import run_ingestion, tables_for_files
+from src.data.snapshots import staging, current_version
+from src.data.store import DataStore
+from src.data.watch import watch_changes, notify_api
 from src.objectives.combo_optimization import run_combo_optimization
 from src.objectives.demand_forecasting import run_demand_forecasting
 from src.objectives.expansion_feasibility import run_expansion_feasibility
 from src.objectives.shift_staffing import run_shift_staffing
 from src.objectives.coffee_milkshake_strategy import run_coffee_milkshake_strategy
+from src.objectives.customer_features import run_customer_features
+from src.objectives.customer_cohorts import run_customer_cohorts
+from src.objectives.branch_similarity import run_branch_similarity
+from src.objectives.item_forecasting import run_item_forecasting
 
+# (label, function, tables it consumes in argument order)
+OBJECTIVES = [
+    ("[OBJECTIVE 1] Combo optimization...", run_combo_optimization, ["sales_detail"]),
+    ("[OBJECTIVE 2] Demand forecasting by branch...", run_demand_forecasting, ["monthly_sales"]),
+    ("[OBJECTIVE 3] Expansion feasibility...", run_expansion_feasibility, ["monthly_sales", "tax_by_branch", "avg_sales_menu"]),
+    ("[OBJECTIVE 4] Shift staffing estimation...", run_shift_staffing, ["attendance", "monthly_sales"]),
+    ("[OBJECTIVE 5] Coffee & milkshake growth strategy...", run_coffee_milkshake_strategy, ["items_by_group", "sales_detail"]),
+    ("[FEATURES] Customer feature store and RFM segments...", run_customer_features, ["orders", "sales_detail", "items_by_group"]),
+    ("[COHORTS] Customer cohort retention matrices...", run_customer_cohorts, ["orders"]),
+    ("[SIMILARITY] Branch feature vectors and nearest-neighbour index...", run_branch_similarity,
+     ["monthly_sales", "tax_by_branch", "avg_sales_menu", "attendance", "items_by_group"]),
+    ("[ITEM FORECAST] Item x branch batch demand forecasts...", run_item_forecasting, ["items_by_group", "monthly_sales"]),
+]
 
-def main():
-    print("Conut AI Pipeline: Ingestion + Cleaning...")
-    data = run_ingestion()
-    print("  Orders:", len(data.get("orders", [])))
-    print("  Sales detail:", len(data.get("sales_detail", [])))
-    print("  Monthly sales:", len(data.get("monthly_sales", [])))
-    print("  Attendance:", len(data.get("attendance", [])))
 
-    print("\n[OBJECTIVE 1] Combo optimization...")
-    run_combo_optimization(data.get("sales_detail"))
+def run_objectives(data, changed=None, previous=None):
+    """
+    Run every objective, or only those reading one of the `changed` tables. All artifacts they
+    write are published together as one new snapshot; untouched ones carry over from the current one.
+    `previous` maps changed tables to their frames before the refresh; objectives that take a
+    `previous` argument use it to recompute only the rows that changed.
+    """
+    with staging():
+        for label, fn, inputs in OBJECTIVES:
+            if changed is not None and not set(inputs) & set(changed):
+                continue
+            print(label)
+            kwargs = {}
+            if previous and "previous" in inspect.signature(fn).parameters:
+                kwargs["previous"] = {t: previous[t] for t in inputs if t in previous}
+            fn(*[data.table(t) for t in inputs], **kwargs)
+    return current_version()
 
-    print("[OBJECTIVE 2] Demand forecasting by branch...")
-    run_demand_forecasting(data.get("monthly_sales"))
 
-    print("[OBJECTIVE 3] Expansion feasibility...")
-    run_expansion_feasibility(
-        data.get("monthly_sales"),
-        data.get("tax_by_branch"),
-        data.get("avg_sales_menu"),
-    )
+def watch(data, debounce, interval, use_inotify):
+    """Re-run only the loaders and objectives affected by each batch of new or changed exports."""
+    print(f"\nWatching {config.DATA_DIR} for new exports (Ctrl+C to stop)...")
+    try:
+        for files in watch_changes(config.DATA_DIR, debounce=debounce, interval=interval, use_inotify=use_inotify):
+            tables = tables_for_files(files)
+            if not tables:
+                continue
+            t0 = time.perf_counter()
+            print(f"\nChanged: {', '.join(sorted(files))} -> reloading {', '.join(tables)}")
+            previous = {table: data.table(table) for table in tables}
+            try:
+                for table, df in run_ingestion(tables).items():
+                    data.put(table, df)
+                version = run_objectives(data, changed=tables, previous=previous)  # a failure discards the staging dir
+                notified = notify_api()
+            except Exception as e:
+                # One bad export must not stop the watcher: keep serving the last good snapshot and tables.
+                traceback.print_exc()
+                for table, frame in previous.items():
+                    data.put(table, frame)
+                print(f"Refresh failed ({type(e).__name__}: {e}); snapshot {current_version()} stays live. Still watching.")
+                continue
+            print(f"Published snapshot {version} in {time.perf_counter() - t0:.2f}s;",
+                  "API reloaded." if notified else f"API not reachable at {config.API_BASE_URL}.")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
 
-    print("[OBJECTIVE 4] Shift staffing estimation...")
-    run_shift_staffing(data.get("attendance"), data.get("monthly_sales"))
 
-    print("[OBJECTIVE 5] Coffee & milkshake growth strategy...")
-    run_coffee_milkshake_strategy(data.get("items_by_group"), data.get("sales_detail"))
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run ingestion and all objectives; optionally keep watching for new exports.")
+    parser.add_argument("--dataset", default=config.DEFAULT_DATASET,
+                        help="Named dataset: reads datasets/<name>/data, writes datasets/<name>/artifacts.")
+    parser.add_argument("--watch", action="store_true", help="After the full run, refresh incrementally as exports land.")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Seconds of quiet before a burst of changes is processed.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval when inotify is unavailable.")
+    parser.add_argument("--poll", action="store_true", help="Force stat polling instead of inotify.")
+    args = parser.parse_args(argv)
+    try:
+        data_dir = config.dataset_dirs(args.dataset)[0]
+    except ValueError as e:
+        parser.error(str(e))
+    if not os.path.isdir(data_dir):
+        parser.error(f"No exports for dataset {args.dataset!r}: {data_dir} does not exist.")
+    config.use_dataset(args.dataset)
 
-    print("\nPipeline complete. Artifacts in:", config.ARTIFACTS_DIR)
+    print(f"Conut AI Pipeline [{config.DATASET}]: Ingestion + Cleaning...")
+    data = DataStore(run_ingestion())
+    print("  Orders:", len(data.table("orders")))
+    print("  Sales detail:", len(data.table("sales_detail")))
+    print("  Monthly sales:", len(data.table("monthly_sales")))
+    print("  Attendance:", len(data.table("attendance")))
+    print()
+
+    version = run_objectives(data)
+
+    print("\nPipeline complete. Artifacts in:", config.ARTIFACTS_DIR, f"(snapshot {version})")
+    notify_api()
+
+    if args.watch:
+        watch(data, args.debounce, args.interval, use_inotify=not args.poll)
 
 
 if __name__ == "__main__":
@@ -1,95 +1,528 @@
 
 import os
+import hmac
 import json
 import sys
+import inspect
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
 
-from fastapi import FastAPI, HTTPException
+from src.api.cache import ArtifactCache
+from src.api.export import ExportError, exportable_tables, iter_export, plan_export
+from src.data import resident, snapshots
+from src.objectives.branch_similarity import MAX_PROFILES, nearest_branches
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
+
+# Parsed artifacts, keyed by (dataset, snapshot version, file name) and bounded by one LRU byte budget
+# (config.ARTIFACT_CACHE_MB) and entry cap (config.ARTIFACT_CACHE_ENTRIES) across all datasets. Snapshots are immutable, so entries never go stale;
+# a dataset's older versions are dropped when its CURRENT moves or on /api/admin/reload.
+_ARTIFACT_CACHE = ArtifactCache(config.ARTIFACT_CACHE_MB * 1024 * 1024, config.ARTIFACT_CACHE_ENTRIES)
+_DATASET_VERSIONS = {}
+_DATASET = contextvars.ContextVar("dataset", default=config.DEFAULT_DATASET)
+# Set by /api/tools/batch so every call in a batch reads the same snapshot even if CURRENT moves meanwhile.
+_PINNED_VERSION = contextvars.ContextVar("pinned_version", default=None)
+
+
+async def _select_dataset(dataset: str = Query(None, description="Named dataset; defaults to the bundled one."),
+                          x_dataset: str = Header(None)):
+    """Pick the request's dataset from ?dataset= or the X-Dataset header (async, so the choice is visible to the handler)."""
+    name = dataset or x_dataset or config.DEFAULT_DATASET
+    try:
+        _, artifacts_dir = config.dataset_dirs(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.isdir(artifacts_dir):
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {name}")
+    _DATASET.set(name)
+
+
+def _artifacts_dir():
+    return config.dataset_dirs(_DATASET.get())[1]
+
 
 app = FastAPI(
     title="Conut Chief of Operations Agent API",
     description="AI-driven operational queries: demand forecast, combos, staffing, expansion, coffee/milkshake strategy. For OpenClaw integration.",
     version="1.0.0",
+    dependencies=[Depends(_select_dataset)],
 )
 
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+class _PublicCORS:
+    """Wildcard CORS for the query endpoints only; /api/admin/* never answers cross-origin browsers."""
 
+    def __init__(self, app, **options):
+        self.app = app
+        self.cors = CORSMiddleware(app, **options)
 
-def _load_artifact(path, default=None):
-    """Load JSON artifact if present; return default otherwise. Tolerates NaN in file."""
-    if default is None:
-        default = {}
-    if not os.path.exists(path):
-        return default
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-        text = text.replace(": NaN", ": null").replace(": nan", ": null")
-        return json.loads(text)
-    except Exception:
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/api/admin/"):
+            await self.app(scope, receive, send)
+        else:
+            await self.cors(scope, receive, send)
+
+
+app.add_middleware(_PublicCORS, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+_LOOPBACK = ("127.0.0.1", "::1", "localhost")
+
+
+def _require_admin(request: Request, x_admin_token: str = Header(None)):
+    """
+    Guard for state-changing admin endpoints: X-Admin-Token must match config.ADMIN_TOKEN; without a
+    configured token, only same-host callers that are not a browser page (no Origin header) get through.
+    """
+    if config.ADMIN_TOKEN:
+        if not x_admin_token or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+            raise HTTPException(status_code=401, detail="Missing or wrong X-Admin-Token")
+        return
+    if request.client is None or request.client.host not in _LOOPBACK or request.headers.get("origin"):
+        raise HTTPException(status_code=403, detail="Admin endpoints are local-only unless CONUT_ADMIN_TOKEN is set")
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    text = text.replace(": NaN", ": null").replace(": nan", ": null")
+    return json.loads(text)
+
+
+def _read_features(path):
+    """Customer feature table as memory-mapped columns shared by all workers, with a sorted key index for lookups."""
+    return resident.open_table(path)
+
+
+def _read_document(path):
+    """Pre-rendered JSON document, mapped read-only; served whole or spliced by byte spans, never parsed in the worker."""
+    return resident.open_document(path)
+
+
+def _read_index(path):
+    """Fitted nearest-neighbour index; its arrays are mapped from the snapshot file rather than copied."""
+    return joblib.load(path, mmap_mode="r")
+
+
+def _sizeof(data, path):
+    """Bytes charged against the cache budget: mapped size for resident artifacts, real footprint for frames, file size (a floor) for parsed JSON."""
+    if isinstance(data, (resident.ResidentTable, resident.ResidentDocument)):
+        # Mapped pages are shared through the page cache, but the mapping and its descriptors are this
+        # worker's until the entry is evicted, so it is charged like any other artifact.
+        return data.nbytes
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(index=True, deep=True).sum())
+    return os.path.getsize(path)
+
+
+def _document(path):
+    return _load_artifact(path, None, reader=_read_document)
+
+
+def _json_response(content):
+    return Response(content=bytes(content), media_type="application/json")
+
+
+def _rendered(path, default):
+    """Response with an artifact's pre-rendered bytes, for endpoints that return the whole artifact."""
+    doc = _document(path)
+    if doc is None:
         return default
+    return _json_response(doc.body)
+
+
+def _matching(labels, text):
+    """Rows whose label contains `text`, case-insensitively (the endpoints' branch filter)."""
+    return np.flatnonzero(np.char.find(np.char.lower(np.asarray(labels)), text.lower()) >= 0)
+
+
+def _load_artifact(path, default=None, reader=_read_json):
+    """Load an artifact (JSON unless `reader` says otherwise) from the request dataset's current snapshot; return default if it was never published."""
+    if default is None and reader is _read_json:
+        default = {}
+    name = os.path.basename(path)
+    # One file can be cached in several forms (parsed JSON, pre-rendered bytes), one entry each.
+    key = name if reader is _read_json else f"{name}:{reader.__name__}"
+    dataset, artifacts_dir = _DATASET.get(), _artifacts_dir()
+    pinned = _PINNED_VERSION.get()
+    for _ in range(2):
+        version = pinned or snapshots.current_version(artifacts_dir)
+        if pinned is None:
+            if _DATASET_VERSIONS.get(dataset, version) != version:
+                _ARTIFACT_CACHE.drop(dataset, keep_version=version)
+            _DATASET_VERSIONS[dataset] = version
+        cached = _ARTIFACT_CACHE.get((dataset, version, key))
+        if cached is not None:
+            return cached
+        full_path = snapshots.artifact_path(name, version, artifacts_dir)
+        if version is not None and not os.path.isdir(snapshots.snapshot_dir(version, artifacts_dir)):
+            if pinned:
+                raise HTTPException(status_code=503, detail=f"Snapshot {version} was pruned while the batch was running")
+            continue  # pruned between reading CURRENT and opening the file; resolve again
+        if not os.path.exists(full_path):
+            return default
+        try:
+            data = reader(full_path)
+            size = _sizeof(data, full_path)
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=503, detail=f"Artifact {name} in snapshot {version} is unreadable: {e}")
+        if version is not None:
+            _ARTIFACT_CACHE.put((dataset, version, key), data, size)
+        return data
+    return default
 
 
 @app.get("/api/combo_recommendations", summary="Get optimal product combo suggestions")
 def get_combo_recommendations(limit: int = 10):
     """Return top product pairs and combo suggestions from purchasing patterns."""
-    data = _load_artifact(config.COMBO_ARTIFACT, {"top_combos": [], "top_pairs": []})
-    combos = data.get("top_combos", [])[:limit]
-    pairs = data.get("top_pairs", [])[:limit]
-    return {"combos": combos, "pairs": pairs, "note": "Based on co-occurrence in orders."}
+    doc = _document(config.COMBO_ARTIFACT)
+    parts = {"combos": [], "pairs": [], "note": "Based on co-occurrence in orders."}
+    for out, key in (("combos", "top_combos"), ("pairs", "top_pairs")):
+        if doc is not None and key in doc:
+            parts[out] = doc.items(key, np.arange(len(doc.labels(key)))[:limit])
+    return _json_response(resident.render_object(parts))
 
 
 @app.get("/api/demand_forecast", summary="Get demand forecast by branch")
 def get_demand_forecast(branch: str = None):
     """Return demand forecast per branch (scaled units). Optional branch filter."""
-    data = _load_artifact(config.DEMAND_FORECAST_ARTIFACT, {"forecasts": []})
-    forecasts = data.get("forecasts", [])
-    if branch:
-        forecasts = [f for f in forecasts if branch.lower() in f.get("branch", "").lower()]
-    return {"forecasts": forecasts}
+    doc = _document(config.DEMAND_FORECAST_ARTIFACT)
+    if doc is None or "forecasts" not in doc:
+        return {"forecasts": []}
+    rows = _matching(doc.labels("forecasts"), branch) if branch else None
+    return _json_response(resident.render_object({"forecasts": doc.items("forecasts", rows)}))
 
 
 @app.get("/api/expansion_feasibility", summary="Expansion feasibility and branch metrics")
 def get_expansion_feasibility():
     """Return branch metrics and feasibility recommendation for new locations."""
-    return _load_artifact(config.EXPANSION_ARTIFACT, {"branch_metrics": [], "recommendation": {}})
+    return _rendered(config.EXPANSION_ARTIFACT, {"branch_metrics": [], "recommendation": {}})
+
+
+def _branch_index():
+    model = _load_artifact(config.BRANCH_INDEX_ARTIFACT, None, reader=_read_index)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Branch similarity index not built yet; run the pipeline.")
+    return model
+
+
+class BranchProfiles(BaseModel):
+    profiles: List[Dict[str, float]] = [{}]
+    k: int = 3
+    base: Optional[str] = None
+
+
+@app.get("/api/expansion/similar_branches", summary="Existing branches most similar to one branch")
+def get_similar_branches(branch: str = None, k: int = 3):
+    """Without `branch`, every branch's peers; with it, its k nearest other branches and their outcomes."""
+    if not branch:
+        return _rendered(config.BRANCH_SIMILARITY_ARTIFACT, {"peers": []})
+    try:
+        neighbors = nearest_branches(_branch_index(), [{}], k=max(k, 1), base=branch, exclude_base=True)[0]
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"branch": branch, "neighbors": neighbors}
+
+
+@app.post("/api/expansion/similar_branches", summary="Existing branches most similar to candidate site profiles")
+def query_similar_branches(query: BranchProfiles):
+    """
+    Each profile maps feature columns (see `feature_columns`) to values in branch_features.csv units;
+    omitted features take the `base` branch's value or the fleet average. Many profiles can be swept in one call.
+    """
+    if len(query.profiles) > MAX_PROFILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROFILES} profiles per request")
+    model = _branch_index()
+    try:
+        results = nearest_branches(model, query.profiles, k=max(query.k, 1), base=query.base)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"feature_columns": model["columns"], "results": [{"neighbors": r} for r in results]}
 
 
 @app.get("/api/staffing_recommendation", summary="Recommended employees per shift by branch")
 def get_staffing_recommendation(branch: str = None):
     """Return recommended employees per shift per branch."""
-    data = _load_artifact(config.STAFFING_ARTIFACT, {"recommendations": []})
-    recs = data.get("recommendations", [])
-    if branch:
-        recs = [r for r in recs if branch.lower() in r.get("branch", "").lower()]
-    return {"recommendations": recs}
+    doc = _document(config.STAFFING_ARTIFACT)
+    if doc is None or "recommendations" not in doc:
+        return {"recommendations": []}
+    rows = _matching(doc.labels("recommendations"), branch) if branch else None
+    return _json_response(resident.render_object({"recommendations": doc.items("recommendations", rows)}))
 
 
 @app.get("/api/coffee_milkshake_strategy", summary="Growth strategies for coffee and milkshakes")
 def get_coffee_milkshake_strategy():
     """Return data-driven strategies and top products for coffee and milkshakes."""
-    return _load_artifact(config.COFFEE_MILKSHAKE_STRATEGY_ARTIFACT, {"coffee": {}, "milkshake": {}, "growth_strategies": []})
+    return _rendered(config.COFFEE_MILKSHAKE_STRATEGY_ARTIFACT, {"coffee": {}, "milkshake": {}, "growth_strategies": []})
+
+
+@app.get("/api/item_forecast", summary="Next-month unit forecast per item and branch")
+def get_item_forecast(product: str = None, branch: str = None, limit: int = 50):
+    """Without filters, the per-branch summary; otherwise the matching item x branch series, largest forecast first."""
+    if not product and not branch:
+        return _rendered(config.ITEM_FORECAST_SUMMARY_ARTIFACT, {"series": 0, "branches": []})
+    summary = _document(config.ITEM_FORECAST_SUMMARY_ARTIFACT)
+    table = _load_artifact(config.ITEM_FORECASTS_ARTIFACT, None, reader=_read_features)
+    if table is None:
+        return {"forecast_period": None, "total": 0, "series": []}
+    rows = np.arange(len(table))
+    if product:
+        rows = table.find_all(product)
+        if not len(rows):
+            rows = table.find_all(product.upper())
+    if branch:
+        names = summary.labels("branches") if summary is not None and "branches" in summary else np.empty(0, dtype="U")
+        names = names[_matching(names, branch)]
+        rows = rows[np.isin(table.column("branch")[rows], names)]
+    order = np.argsort(-table.column("forecast_next_period")[rows], kind="stable")
+    series = table.frame(rows[order[:max(limit, 0)]]).drop(columns=["product_code", "branch_code"])
+    period = json.loads(bytes(summary.value("forecast_period"))) if summary is not None and "forecast_period" in summary else None
+    return {"forecast_period": period, "total": int(len(rows)),
+            "series": [_customer_record(r) for _, r in series.iterrows()]}
+
+
+COHORT_METRICS = ("retention", "retained", "retained_revenue")
+
+
+@app.get("/api/customer_cohorts", summary="Customer cohort x period retention and revenue matrices")
+def get_customer_cohorts(cohort: str = None, metric: str = None):
+    """Cohorts by first-order month (YYYY-MM); `cohort` selects one, `metric` keeps one matrix."""
+    if metric and metric not in COHORT_METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric: {metric}. Use one of: {', '.join(COHORT_METRICS)}")
+    doc = _document(config.CUSTOMER_COHORTS_ARTIFACT)
+    if doc is None or "cohorts" not in doc:
+        return {"cohorts": [], "average_retention": []}
+    rows = np.flatnonzero(doc.labels("cohorts") == cohort) if cohort else None
+    drop = [m for m in COHORT_METRICS if m != metric] if metric else ()
+    return _json_response(doc.render({"cohorts": doc.items("cohorts", rows, drop)}, drop=("histogram",)))
+
+
+def _customer_record(row):
+    return {k: (None if pd.isna(v) else v.item() if hasattr(v, "item") else v) for k, v in row.items() if k != "customer_code"}
+
+
+@app.get("/api/customers/segments", summary="RFM segment summary, or the customers in one segment")
+def get_customer_segments(segment: str = None, limit: int = 50, sort: str = "monetary"):
+    """Without `segment`, the per-segment summary; with it, that segment's customers sorted by `sort` (descending)."""
+    if not segment:
+        return _rendered(config.CUSTOMER_SEGMENTS_ARTIFACT, {"segments": []})
+    summary = _load_artifact(config.CUSTOMER_SEGMENTS_ARTIFACT, {"segments": []})
+    features = _load_artifact(config.CUSTOMER_FEATURES_ARTIFACT, None, reader=_read_features)
+    if features is None:
+        return {"segment": segment, "customers": []}
+    if sort not in features.columns:
+        raise HTTPException(status_code=400, detail=f"Unknown sort column: {sort}")
+    # Match the published segment name case-insensitively, then compare the mapped column exactly.
+    names = [s["segment"] for s in summary.get("segments", []) if s["segment"].lower() == segment.lower()]
+    matches = np.flatnonzero(features.column("segment") == names[0]) if names else np.empty(0, dtype=np.int64)
+    order = pd.Series(features.column(sort)[matches]).sort_values(ascending=sort == "recency_days", kind="stable").index
+    rows = features.frame(matches[order[:max(limit, 0)]])
+    return {"segment": segment, "as_of": summary.get("as_of"), "total": int(len(matches)),
+            "customers": [_customer_record(r) for _, r in rows.iterrows()]}
+
+
+@app.get("/api/customers/{customer}", summary="Precomputed features and RFM segment for one customer")
+def get_customer(customer: str):
+    """Look up one customer (e.g. Person_0662) in the feature store."""
+    features = _load_artifact(config.CUSTOMER_FEATURES_ARTIFACT, None, reader=_read_features)
+    row = features.find(customer) if features is not None else None
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Unknown customer: {customer}")
+    return _customer_record(features.frame([row]).iloc[0])
+
+
+@app.get("/api/export", summary="Cleaned tables available for streaming export")
+def list_exports():
+    """Table names and their exportable columns (dictionary codes appear under their decoded names)."""
+    return {"tables": exportable_tables(), "formats": ["ndjson", "csv"]}
+
+
+@app.get("/api/export/{table}", summary="Stream a cleaned table as NDJSON or CSV")
+def export_table(table: str, format: str = "ndjson", columns: str = None,
+                 filter: List[str] = Query(None, description="Repeatable, e.g. branch=Conut Jnah or qty>=2"),
+                 offset: int = 0, limit: int = None):
+    """
+    Stream rows chunk by chunk (constant memory). `columns` is comma-separated; `offset`/`limit`
+    count rows after filtering, so an interrupted download resumes with offset = rows received.
+    """
+    try:
+        plan = plan_export(table, _artifacts_dir(), columns=columns.split(",") if columns else None,
+                           filters=filter, fmt=format)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Table {table} has not been produced for dataset {_DATASET.get()}")
+    headers = {"Content-Disposition": f'inline; filename="{table}.{format}"', "X-Export-Offset": str(max(offset, 0))}
+    return StreamingResponse(iter_export(plan, offset=offset, limit=limit), media_type=plan["media_type"], headers=headers)
+
+
+# OpenClaw tools: name -> (handler, HTTP method, path). /api/tools/list and /api/tools/batch are both
+# generated from this registry, so a tool's args are always its handler's parameters.
+TOOLS = {
+    "combo_recommendations": (get_combo_recommendations, "GET", "/api/combo_recommendations"),
+    "demand_forecast": (get_demand_forecast, "GET", "/api/demand_forecast"),
+    "expansion_feasibility": (get_expansion_feasibility, "GET", "/api/expansion_feasibility"),
+    "staffing_recommendation": (get_staffing_recommendation, "GET", "/api/staffing_recommendation"),
+    "coffee_milkshake_strategy": (get_coffee_milkshake_strategy, "GET", "/api/coffee_milkshake_strategy"),
+    "customer_profile": (get_customer, "GET", "/api/customers/{customer}"),
+    "customer_segments": (get_customer_segments, "GET", "/api/customers/segments"),
+    "customer_cohorts": (get_customer_cohorts, "GET", "/api/customer_cohorts"),
+    "similar_branches": (get_similar_branches, "GET", "/api/expansion/similar_branches"),
+    "item_forecast": (get_item_forecast, "GET", "/api/item_forecast"),
+}
+TOOL_BATCH_MAX_CALLS = 32
+_TOOL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-batch")
+
+
+class ToolCall(BaseModel):
+    tool: str
+    args: Dict[str, Any] = {}
+
+
+class ToolBatch(BaseModel):
+    calls: List[ToolCall]
 
 
-# OpenClaw tools descriptor: GET /api/tools/list returns tool names and args for discovery.
 @app.get("/api/tools/list", summary="List available tools for OpenClaw integration")
 def list_tools():
-    """Return tool names and parameters so OpenClaw can invoke them (e.g. via POST /tools/invoke or HTTP)."""
+    """Return tool names and parameters so OpenClaw can invoke them one by one or via POST /api/tools/batch."""
     return {
-        "tools": [
-            {"name": "combo_recommendations", "method": "GET", "path": "/api/combo_recommendations", "args": ["limit"]},
-            {"name": "demand_forecast", "method": "GET", "path": "/api/demand_forecast", "args": ["branch"]},
-            {"name": "expansion_feasibility", "method": "GET", "path": "/api/expansion_feasibility", "args": []},
-            {"name": "staffing_recommendation", "method": "GET", "path": "/api/staffing_recommendation", "args": ["branch"]},
-            {"name": "coffee_milkshake_strategy", "method": "GET", "path": "/api/coffee_milkshake_strategy", "args": []},
-        ],
+        "tools": [{"name": name, "method": method, "path": path, "args": list(inspect.signature(handler).parameters)}
+                  for name, (handler, method, path) in TOOLS.items()],
+        "batch": {"method": "POST", "path": "/api/tools/batch", "max_calls": TOOL_BATCH_MAX_CALLS},
         "base_url": "http://localhost:8000",
     }
 
 
+def _bind_tool_call(call):
+    """(handler, kwargs) with args coerced to the handler's annotations; raises HTTPException like the GET route would."""
+    if call.tool not in TOOLS:
+        raise HTTPException(status_code=404, detail=f"Unknown tool: {call.tool}")
+    handler = TOOLS[call.tool][0]
+    params = inspect.signature(handler).parameters
+    unknown = [k for k in call.args if k not in params]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown arg(s) for {call.tool}: {', '.join(unknown)}")
+    kwargs = {}
+    for name, p in params.items():
+        if name in call.args and call.args[name] is not None:
+            try:
+                kwargs[name] = p.annotation(call.args[name]) if p.annotation in (int, float, str) else call.args[name]
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail=f"Arg {name} of {call.tool} must be {p.annotation.__name__}")
+        elif p.default is inspect.Parameter.empty:
+            raise HTTPException(status_code=400, detail=f"Missing arg for {call.tool}: {name}")
+    return handler, kwargs
+
+
+def _run_tool(handler, kwargs):
+    try:
+        result = handler(**kwargs)
+        if isinstance(result, Response):  # pre-rendered artifact bytes
+            result = json.loads(bytes(result.body))
+        return {"status": 200, "result": result}
+    except HTTPException as e:
+        return {"status": e.status_code, "error": e.detail}
+    except Exception as e:  # one failing tool must not take the other calls' results down with it
+        return {"status": 500, "error": str(e)}
+
+
+@app.post("/api/tools/batch", summary="Run several tool calls against one snapshot in a single round trip")
+def run_tool_batch(batch: ToolBatch):
+    """
+    Results come back in request order, each with its own status. Identical calls (same tool and
+    args after coercion) run once; all calls read the snapshot that was current when the batch arrived.
+    """
+    if len(batch.calls) > TOOL_BATCH_MAX_CALLS:
+        raise HTTPException(status_code=400, detail=f"At most {TOOL_BATCH_MAX_CALLS} calls per batch")
+    version = snapshots.current_version(_artifacts_dir())
+    _PINNED_VERSION.set(version)
+
+    slots, pending = [], {}
+    for call in batch.calls:
+        try:
+            handler, kwargs = _bind_tool_call(call)
+        except HTTPException as e:
+            slots.append({"status": e.status_code, "error": e.detail})
+            continue
+        key = (call.tool, json.dumps(kwargs, sort_keys=True, default=str))
+        if key not in pending:
+            # Each worker gets its own copy of this request's context (dataset + pinned version).
+            pending[key] = _TOOL_POOL.submit(contextvars.copy_context().run, _run_tool, handler, kwargs)
+        slots.append(key)
+
+    results = []
+    for call, slot in zip(batch.calls, slots):
+        outcome = pending[slot].result() if isinstance(slot, tuple) else slot
+        results.append({"tool": call.tool, "args": call.args, **outcome})
+    return {"dataset": _DATASET.get(), "snapshot": version, "calls": len(batch.calls),
+            "executed": len(pending), "results": results}
+
+
+@app.post("/api/admin/reload", summary="Drop cached artifacts so the next request reads the latest files",
+          dependencies=[Depends(_require_admin)])
+def reload_artifacts():
+    """Called by `run_pipeline.py` (batch and --watch) after the selected dataset's artifacts are refreshed."""
+    dataset = _DATASET.get()
+    dropped = _ARTIFACT_CACHE.drop(dataset)
+    _DATASET_VERSIONS.pop(dataset, None)
+    return {"status": "reloaded", "dataset": dataset, "dropped": dropped}
+
+
+@app.get("/api/admin/snapshots", summary="List published artifact snapshots")
+def list_snapshots():
+    """Return the current snapshot and the ones kept for rollback (oldest first)."""
+    artifacts_dir = _artifacts_dir()
+    return {"dataset": _DATASET.get(), "current": snapshots.current_version(artifacts_dir),
+            "versions": snapshots.list_versions(artifacts_dir)}
+
+
+@app.post("/api/admin/rollback", summary="Make an earlier artifact snapshot current",
+          dependencies=[Depends(_require_admin)])
+def rollback_snapshot(version: str = None):
+    """Roll back to `version`, or to the snapshot published before the current one."""
+    try:
+        current = snapshots.rollback(version, _artifacts_dir())
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    reload_artifacts()
+    return {"status": "rolled_back", "dataset": _DATASET.get(), "current": current}
+
+
+@app.get("/api/admin/validation", summary="Reconciliation of cleaned tables against report totals")
+def get_validation_report():
+    """The last ingestion's validation report: per table and level, blocks whose sums disagree with the report."""
+    path = os.path.join(_artifacts_dir(), os.path.basename(config.VALIDATION_REPORT_PATH))
+    if not os.path.exists(path):
+        return {"status": "unknown", "tables": {}}
+    return _read_json(path)
+
+
+@app.get("/api/admin/datasets", summary="Datasets this API can serve and artifact cache residency")
+def list_datasets():
+    """Every named dataset with its live snapshot, plus LRU cache usage (cold datasets hold no memory)."""
+    datasets = []
+    for name in config.list_datasets():
+        artifacts_dir = config.dataset_dirs(name)[1]
+        datasets.append({"name": name, "current": snapshots.current_version(artifacts_dir)})
+    return {"datasets": datasets, "cache": _ARTIFACT_CACHE.stats()}
+
+
 @app.get("/")
 def root():
     return {
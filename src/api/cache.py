@@ -0,0 +1,69 @@
+
+import threading
+from collections import OrderedDict
+
+
+class ArtifactCache:
+    """
+    Thread-safe LRU of parsed artifacts bounded by an approximate byte budget shared by all datasets,
+    and optionally by an entry count. Keys are (dataset, version, name); each entry carries the size
+    it was charged. An entry larger than the whole budget is returned to the caller but not kept.
+    """
+
+    def __init__(self, max_bytes, max_entries=None):
+        self.max_bytes = int(max_bytes)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        size = max(int(size), 1)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes or (self.max_entries and len(self._entries) > self.max_entries):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def drop(self, dataset=None, keep_version=None):
+        """Drop every entry (of one dataset, optionally except its `keep_version`). Returns the count dropped."""
+        with self._lock:
+            doomed = [k for k in self._entries
+                      if (dataset is None or k[0] == dataset) and (keep_version is None or k[1] != keep_version)]
+            for key in doomed:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(doomed)
+
+    def stats(self):
+        with self._lock:
+            per_dataset = {}
+            for (dataset, _, _), (_, size) in self._entries.items():
+                per_dataset[dataset] = per_dataset.get(dataset, 0) + size
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes_by_dataset": per_dataset,
+            }
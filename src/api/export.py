@@ -0,0 +1,171 @@
+
+import os
+import sys
+import operator
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+from src.data.encoding import DOMAINS, MISSING, read_dictionary
+from src.data.store import TABLES
+
+# Streaming export of cleaned tables. The CSV is read in fixed-size chunks and each chunk is
+# filtered, sliced, decoded and serialized before the next one is read, so memory stays at one
+# chunk whatever the table size. Dictionary codes are decoded back to strings here, at the boundary.
+
+EXPORT_CHUNK_ROWS = 20000
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Longest operators first so "a>=1" is not read as "a>" "=1".
+_OPS = [("!=", operator.ne), (">=", operator.ge), ("<=", operator.le), ("=", operator.eq),
+        (">", operator.gt), ("<", operator.lt)]
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown table, column, filter or format)."""
+
+
+def _domain(col):
+    """'customer_code' -> 'customer' for dictionary-coded columns, else None."""
+    if col.endswith("_code") and col[:-5] in DOMAINS:
+        return col[:-5]
+    return None
+
+
+def exportable_tables():
+    return {name: [_domain(c) or c for c in schema] for name, (_, _, schema) in TABLES.items()}
+
+
+def plan_export(table, artifacts_dir=None, columns=None, filters=None, fmt="ndjson"):
+    """
+    Validate an export request before any byte is streamed. Columns and filters use the decoded
+    names (e.g. 'customer' rather than 'customer_code'). Filters look like 'branch=Conut Jnah' or 'qty>=2'.
+    """
+    if table not in TABLES:
+        raise ExportError(f"Unknown table: {table}. Available: {', '.join(TABLES)}")
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format: {fmt}. Use one of: {', '.join(FORMATS)}")
+    artifacts_dir = artifacts_dir or config.ARTIFACTS_DIR
+    _, path_attr, schema = TABLES[table]
+    path = os.path.join(artifacts_dir, os.path.basename(getattr(config, path_attr)))
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    public = {(_domain(c) or c): c for c in schema}  # output name -> column in the cleaned CSV
+    columns = list(columns or public)
+    unknown = [c for c in columns if c not in public]
+    if unknown:
+        raise ExportError(f"Unknown column(s) for {table}: {', '.join(unknown)}. Available: {', '.join(public)}")
+
+    dictionaries_dir = os.path.join(artifacts_dir, "dictionaries")
+    dictionaries = {}
+
+    def dictionary(domain):
+        if domain not in dictionaries:
+            dictionaries[domain] = read_dictionary(domain, dictionaries_dir)
+        return dictionaries[domain]
+
+    parsed = []
+    empty = False
+    for expr in filters or []:
+        for symbol, op in _OPS:
+            name, sep, value = expr.partition(symbol)
+            if sep:
+                break
+        else:
+            raise ExportError(f"Bad filter {expr!r}: expected <column><op><value> with op one of = != > >= < <=")
+        name, value = name.strip(), value.strip()
+        if name not in public:
+            raise ExportError(f"Unknown filter column: {name}")
+        col = public[name]
+        kind = schema[col]
+        if kind == "code":
+            if op not in (operator.eq, operator.ne):
+                raise ExportError(f"Only = and != are supported on {name}")
+            value = dictionary(_domain(col)).code(value)  # compare on the int code, never decode to filter
+            if value == MISSING:
+                # A name the dictionary does not know matches no row; comparing -1 would hit blank keys.
+                empty = empty or op is operator.eq
+                continue
+        elif kind in ("float", "int"):
+            try:
+                value = float(value)
+            except ValueError:
+                raise ExportError(f"Filter on {name} needs a number, got {value!r}")
+        parsed.append((col, op, value))
+
+    read_cols = list(dict.fromkeys([public[c] for c in columns] + [c for c, _, _ in parsed]))
+    for c in read_cols:
+        if schema[c] == "code":
+            dictionary(_domain(c))
+    return {
+        "table": table,
+        "path": path,
+        "schema": schema,
+        "columns": columns,
+        "source": {c: public[c] for c in columns},
+        "read_cols": read_cols,
+        "filters": parsed,
+        "empty": empty,
+        "dictionaries": dictionaries,
+        "format": fmt,
+        "media_type": FORMATS[fmt],
+    }
+
+
+def _typed(chunk, schema):
+    for col in chunk.columns:
+        kind = schema[col]
+        if kind == "code":
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce").fillna(-1).astype(np.int64)
+        elif kind in ("str", "datetime"):
+            chunk[col] = chunk[col].fillna("").astype(str)
+        else:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+    return chunk
+
+
+def iter_export(plan, offset=0, limit=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield the export as encoded byte blocks. `offset` / `limit` count matching rows, so a client
+    that received N rows resumes with offset += N and gets exactly the rows it is missing.
+    """
+    schema, fmt = plan["schema"], plan["format"]
+    skip, remaining = max(int(offset or 0), 0), limit
+    if fmt == "csv":
+        yield (",".join(plan["columns"]) + "\n").encode("utf-8")
+    if plan["empty"]:
+        return
+    # Open once: the pipeline replaces cleaned CSVs by rename, so an in-flight export keeps reading the old file.
+    with open(plan["path"], "r", encoding="utf-8", newline="") as f:
+        text_cols = {c: str for c in plan["read_cols"] if schema[c] in ("str", "datetime")}
+        reader = pd.read_csv(f, usecols=plan["read_cols"], chunksize=chunk_rows, dtype=text_cols)
+        for chunk in reader:
+            if remaining is not None and remaining <= 0:
+                break
+            chunk = _typed(chunk, schema)
+            if plan["filters"]:
+                mask = np.ones(len(chunk), dtype=bool)
+                for col, op, value in plan["filters"]:
+                    mask &= op(chunk[col], value).to_numpy(dtype=bool)
+                chunk = chunk[mask]
+            if skip:
+                dropped = min(skip, len(chunk))
+                chunk, skip = chunk.iloc[dropped:], skip - dropped
+            if remaining is not None:
+                chunk = chunk.iloc[:remaining]
+                remaining -= len(chunk)
+            if chunk.empty:
+                continue
+            out = pd.DataFrame({
+                name: (plan["dictionaries"][_domain(src)].decode(chunk[src].to_numpy())
+                       if schema[src] == "code" else chunk[src].to_numpy())
+                for name, src in plan["source"].items()
+            }, columns=plan["columns"])
+            if fmt == "csv":
+                yield out.to_csv(index=False, header=False).encode("utf-8")
+            else:
+                # Report values carry at most 2 decimals; 6 keeps them exact without binary noise like 1746011.6000000001.
+                yield (out.to_json(orient="records", lines=True, force_ascii=False, double_precision=6)
+                       .rstrip("\n").encode("utf-8") + b"\n")
@@ -0,0 +1,149 @@
+import os
+import csv
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+# Persistent global dictionaries: every product, customer, branch and employee string seen by
+# ingestion gets a compact int32 code that never changes across runs. Cleaned tables carry only
+# the codes; strings are decoded when payloads for the API are produced.
+
+DOMAINS = ("product", "customer", "branch", "employee")
+MISSING = -1
+
+
+class Dictionary:
+    """Append-only value <-> int32 code mapping for one domain."""
+
+    def __init__(self, domain, values=None):
+        self.domain = domain
+        self._values = list(values or [])
+        self._index = {v: i for i, v in enumerate(self._values)}
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def __len__(self):
+        return len(self._values)
+
+    def encode(self, values):
+        """Vectorized encode: factorize once, look up / assign codes for the uniques only. Blank -> -1."""
+        s = pd.Series(values, dtype=object).where(lambda x: x.notna(), "").astype(str).str.strip()
+        positions, uniques = pd.factorize(s, sort=False)
+        unique_codes = np.empty(len(uniques), dtype=np.int32)
+        with self._lock:
+            for i, v in enumerate(uniques):
+                if v == "":
+                    unique_codes[i] = MISSING
+                    continue
+                code = self._index.get(v)
+                if code is None:
+                    code = self._index[v] = len(self._values)
+                    self._values.append(v)
+                    self.dirty = True
+                unique_codes[i] = code
+        return unique_codes[positions] if len(positions) else np.empty(0, dtype=np.int32)
+
+    def code(self, value):
+        """Code for a single string, or -1 if it has never been seen."""
+        return self._index.get(str(value).strip(), MISSING)
+
+    def lookup(self, values):
+        """Vectorized code(): codes for existing values, -1 for unseen ones (never assigns)."""
+        s = pd.Series(values, dtype=object).where(lambda x: x.notna(), "").astype(str).str.strip()
+        return s.map(self._index).fillna(MISSING).to_numpy(dtype=np.int32)
+
+    def decode(self, codes):
+        """Vectorized decode of an int array (or scalar); -1 decodes to ''."""
+        table = np.asarray(self._values + [""], dtype=object)
+        codes = np.asarray(codes)
+        return table[np.where(codes < 0, len(self._values), codes)]
+
+    def values(self):
+        return list(self._values)
+
+
+def _path(domain, dictionaries_dir=None):
+    return os.path.join(dictionaries_dir or config.DICTIONARIES_DIR, f"{domain}.csv")
+
+
+def _read(domain, dictionaries_dir=None):
+    path = _path(domain, dictionaries_dir)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))[1:]
+    values = [""] * len(rows)
+    for code, value in rows:
+        values[int(code)] = value
+    return values
+
+
+_DICTS = {}
+_DICTS_LOCK = threading.Lock()
+
+
+def get_dictionaries():
+    """Dictionaries for the current config.ARTIFACTS_DIR, loaded from disk once per process."""
+    key = config.DICTIONARIES_DIR
+    with _DICTS_LOCK:
+        dicts = _DICTS.get(key)
+        if dicts is None:
+            dicts = _DICTS[key] = {d: Dictionary(d, _read(d)) for d in DOMAINS}
+    return dicts
+
+
+def get_dictionary(domain):
+    return get_dictionaries()[domain]
+
+
+_SNAPSHOTS = {}
+
+
+def read_dictionary(domain, dictionaries_dir=None):
+    """
+    Read-only view of a dictionary as currently saved on disk (e.g. another dataset's, from the API).
+    Re-read whenever the file changes, so codes appended by a later pipeline run always decode.
+    """
+    path = _path(domain, dictionaries_dir)
+    try:
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        sig = None
+    with _DICTS_LOCK:
+        cached = _SNAPSHOTS.get(path)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+    d = Dictionary(domain, _read(domain, dictionaries_dir))
+    with _DICTS_LOCK:
+        _SNAPSHOTS[path] = (sig, d)
+    return d
+
+
+def encode(domain, values):
+    return get_dictionary(domain).encode(values)
+
+
+def decode(domain, codes):
+    return get_dictionary(domain).decode(codes)
+
+
+def save_dictionaries():
+    """Write any dictionary that gained values; temp file + rename so readers never see a partial file."""
+    os.makedirs(config.DICTIONARIES_DIR, exist_ok=True)
+    for domain, d in get_dictionaries().items():
+        if not d.dirty and os.path.exists(_path(domain)):
+            continue
+        with d._lock:
+            values = d.values()
+            d.dirty = False
+        tmp = _path(domain) + ".tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f, lineterminator="\n")
+            w.writerow(["code", "value"])
+            w.writerows(enumerate(values))
+        os.replace(tmp, _path(domain))
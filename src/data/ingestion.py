@@ -3,10 +3,14 @@ import re
 import csv
 import pandas as pd
 import sys
+from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
 
+from src.data.encoding import encode, save_dictionaries
+from src.data.reconciliation import reconcile, write_validation_report
+
 
 def _clean_numeric(val):
     """Convert report-style numbers (e.g. '2,116,800.0') to float. Used across cleaning."""
@@ -21,25 +25,67 @@ def _clean_numeric(val):
         return None
 
 
-def load_and_clean_sales_detail():
+def _parse_duration(val):
+    """Convert 'HH.MM.SS' / 'HH:MM:SS' durations (hours may exceed 24) to hours, or None if unparseable."""
+    fields = str(val or "").strip().replace(".", ":").split(":")
+    try:
+        h = int(fields[0])
+        m = int(fields[1]) if len(fields) > 1 else 0
+        sec = int(fields[2]) if len(fields) > 2 else 0
+    except ValueError:
+        return None
+    return h + m / 60 + sec / 3600
+
+
+def _parse_punch(date, time_of_day):
+    """'19-Dec-25' + '19.02.17' -> datetime, or None."""
+    try:
+        return datetime.strptime(f"{date} {time_of_day}", "%d-%b-%y %H.%M.%S")
+    except ValueError:
+        return None
+
+
+def _encode_keys(df, columns):
+    """Replace string key columns with their global dictionary codes, keeping column position."""
+    out = {}
+    for col in df.columns:
+        if col in columns:
+            domain, code_col = columns[col]
+            out[code_col] = encode(domain, df[col])
+        else:
+            out[col] = df[col].to_numpy()
+    save_dictionaries()
+    return pd.DataFrame(out, columns=list(out))
+
+
+def _write_csv(df, path):
+    """Write a cleaned table via temp file + rename so readers never see a half-written CSV."""
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def load_and_clean_sales_detail(totals=None):
     """
     Load REP_S_00502.csv: line-item sales per customer.
     Report has: title rows, repeated 'Full Name,Qty,Description,Price' headers,
     'Branch :X', 'Person_XXXX' as customer name, then lines with ,Qty,Description,Price, 'Total :' rows.
-    We output one row per line item: customer_name, description, qty, price.
+    We output one row per line item: customer_code, product_code, qty, price.
+    Uses csv.reader so quoted prices ("893,918.92") and descriptions ("CARAMEL SAUCE, (R)") stay whole.
+    If `totals` is a list, the report's 'Total :' (per customer) and 'Total Branch:' rows are appended to it.
     """
     path = os.path.join(config.DATA_DIR, "REP_S_00502.csv")
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["customer_name", "description", "qty", "price"])
+        return pd.DataFrame(columns=["customer_code", "product_code", "qty", "price"])
 
     rows = []
     current_customer = None
     header_pattern = re.compile(r"^\s*Full Name\s*,", re.IGNORECASE)
 
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.rstrip("\n\r")
-            parts = [p.strip() for p in line.split(",")]
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        for parts in csv.reader(f):
+            parts = [p.strip() for p in parts]
+            line = ",".join(parts)
             if not parts or "Page" in line or "From Date" in line or "Sales by customer" in line:
                 continue
             if header_pattern.match(line) or line.startswith("Branch ") or "Branch :" in line:
@@ -47,50 +93,59 @@ def load_and_clean_sales_detail():
             if len(parts) >= 1 and re.match(r"^Person_\d+", str(parts[0])):
                 current_customer = parts[0]
                 continue
-            if "Total :" in line or (len(parts) >= 2 and str(parts[1]).strip() == "" and "Total" in str(parts[0])):
+            if parts[0].startswith("Total"):
+                if totals is not None and len(parts) >= 4:
+                    level, key = ("customer", current_customer) if parts[0] == "Total :" else ("report", "")
+                    totals.append({"level": level, "key": key, "qty": _clean_numeric(parts[1]), "price": _clean_numeric(parts[3])})
                 continue
             if current_customer is None:
                 continue
             if len(parts) >= 4:
                 qty_val = _clean_numeric(parts[1])
-                desc = parts[2].strip() if len(parts) > 2 else ""
+                desc = parts[2]
                 price_val = _clean_numeric(parts[3])
-                if desc and desc != "Total :" and qty_val is not None:
+                if desc and qty_val is not None:
                     rows.append({"customer_name": current_customer, "description": desc, "qty": qty_val, "price": price_val})
 
-    df = pd.DataFrame(rows)
-    df = df[df["qty"] != 0].copy()
-    df.to_csv(config.CLEANED_SALES_DETAIL_PATH, index=False)
+    df = pd.DataFrame(rows, columns=["customer_name", "description", "qty", "price"])
+    df = df[df["qty"] != 0]
+    df = _encode_keys(df, {"customer_name": ("customer", "customer_code"), "description": ("product", "product_code")})
+    _write_csv(df, config.CLEANED_SALES_DETAIL_PATH)
     return df
 
 
-def load_and_clean_customer_orders():
+def load_and_clean_customer_orders(totals=None):
     """
     Load rep_s_00150.csv: Customer Name, First Order, Last Order, Total, No. of Orders.
     Report has repeated headers every page; we keep rows where first column is Person_XXXX.
+    Uses csv.reader so quoted totals like "2,116,800.0" parse correctly.
+    If `totals` is a list, each 'Total By Branch' row (total, no. of orders) is appended to it.
     """
     path = os.path.join(config.DATA_DIR, "rep_s_00150.csv")
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["customer_name", "first_order", "last_order", "total", "num_orders"])
+        return pd.DataFrame(columns=["customer_code", "first_order", "last_order", "total", "num_orders"])
 
     rows = []
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.rstrip("\n\r")
-            if "Customer Name" in line and "Address" in line:
-                continue
-            if "Page " in line or "From Date" in line or "Conut -" in line and "," in line and line.count(",") > 3:
-                continue
-            parts = [p.strip() for p in line.split(",")]
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        for parts in csv.reader(f):
+            parts = [p.strip() for p in parts]
             if len(parts) < 8:
                 continue
             first = parts[0]
+            if len(parts) > 2 and parts[2] == "Total By Branch":
+                tail = [p for p in parts[6:] if p]
+                if totals is not None and len(tail) >= 2:
+                    totals.append({"level": "report", "key": "", "total": _clean_numeric(tail[-2]),
+                                   "num_orders": _clean_numeric(tail[-1])})
+                continue
             if not re.match(r"^Person_\d+", first):
                 continue
-            first_order = parts[3] if len(parts) > 3 else ""
-            last_order = parts[5] if len(parts) > 5 else ""
-            total = _clean_numeric(parts[7]) if len(parts) > 7 else None
-            num_orders = _clean_numeric(parts[8]) if len(parts) > 8 else None
+            first_order = parts[3]
+            last_order = parts[5]
+            # Some pages carry an extra empty column before Total, so take the last two filled fields.
+            tail = [p for p in parts[6:] if p]
+            total = _clean_numeric(tail[-2]) if len(tail) >= 2 else None
+            num_orders = _clean_numeric(tail[-1]) if tail else None
             if num_orders is not None and num_orders >= 0:
                 rows.append({
                     "customer_name": first,
@@ -101,18 +156,24 @@ def load_and_clean_customer_orders():
                 })
 
     df = pd.DataFrame(rows)
-    df.to_csv(config.CLEANED_ORDERS_PATH, index=False)
+    if not df.empty:
+        # Parsed once here ('2025-12-31 19:04:' -> 2025-12-31 19:04:00) so consumers get real timestamps.
+        for col in ("first_order", "last_order"):
+            df[col] = pd.to_datetime(df[col].str.rstrip(":"), format="%Y-%m-%d %H:%M", errors="coerce")
+    df = _encode_keys(df, {"customer_name": ("customer", "customer_code")})
+    _write_csv(df, config.CLEANED_ORDERS_PATH)
     return df
 
 
-def load_and_clean_monthly_sales():
+def load_and_clean_monthly_sales(totals=None):
     """
     Load rep_s_00334_1_SMRY.csv: Branch Name, Month, Year, Total.
     Uses csv.reader so quoted numbers like "554,074,782.88" parse correctly.
+    If `totals` is a list, the 'Total by Branch' and 'Grand Total' rows are appended to it.
     """
     path = os.path.join(config.DATA_DIR, "rep_s_00334_1_SMRY.csv")
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["branch", "month", "year", "total"])
+        return pd.DataFrame(columns=["branch_code", "month", "year", "total"])
 
     rows = []
     current_branch = None
@@ -128,7 +189,14 @@ def load_and_clean_monthly_sales():
             if "Branch Name:" in first:
                 current_branch = first.replace("Branch Name:", "").strip()
                 continue
-            if "Page" in first or "Year:" in first or "Total for" in first or "Total by Branch" in first or "Grand Total" in first:
+            label = " ".join(p.strip() for p in parts[:3])
+            if "Total by Branch" in label or "Grand Total" in label:
+                if totals is not None:
+                    level, key = ("branch", current_branch) if "Total by Branch" in label else ("report", "")
+                    totals.append({"level": level, "key": key,
+                                   "total": _clean_numeric(next((p for p in parts[3:] if p.strip()), None))})
+                continue
+            if "Page" in first or "Year:" in first or "Total for" in label:
                 continue
             if "REP_S_" in first or "Copyright" in first:
                 continue
@@ -146,18 +214,20 @@ def load_and_clean_monthly_sales():
                 })
 
     df = pd.DataFrame(rows)
-    df.to_csv(config.CLEANED_MONTHLY_SALES_PATH, index=False)
+    df = _encode_keys(df, {"branch": ("branch", "branch_code")})
+    _write_csv(df, config.CLEANED_MONTHLY_SALES_PATH)
     return df
 
 
-def load_and_clean_attendance():
+def load_and_clean_attendance(totals=None):
     """
     Load REP_S_00461.csv: EMP ID, NAME, Branch, PUNCH IN date/time, PUNCH OUT, Work Duration.
-    We extract: employee_id, employee_name, branch, punch_in_date, punch_out_date, duration_hours.
+    We extract: employee_code, employee_name, branch_code, punch_in_date, duration_hours.
+    If `totals` is a list, each employee block's 'Total :' work duration is appended to it.
     """
     path = os.path.join(config.DATA_DIR, "REP_S_00461.csv")
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["employee_id", "branch", "punch_in_date", "duration_hours"])
+        return pd.DataFrame(columns=["employee_code", "branch_code", "punch_in_date", "duration_hours"])
 
     rows = []
     current_emp_id = None
@@ -168,65 +238,62 @@ def load_and_clean_attendance():
         for line in f:
             line = line.rstrip("\n\r")
             if "EMP ID :" in line:
-                try:
-                    current_emp_id = line.split("EMP ID :")[1].split(",")[0].strip()
-                except IndexError:
-                    pass
+                current_emp_id = line.split("EMP ID :")[1].split(",")[0].strip()
+                if "NAME :" in line:
+                    current_name = line.split("NAME :")[1].split(",")[0].strip()
                 continue
             if "NAME :" in line:
-                try:
-                    current_name = line.split("NAME :")[1].strip()
-                except IndexError:
-                    pass
+                current_name = line.split("NAME :")[1].strip()
                 continue
             if "Main Street" in line or "Conut Jnah" in line or "Conut - Tyre" in line or "Conut," in line:
-                current_branch = line.split(",")[0].strip() or current_branch
-                continue
-            if "PUNCH IN" in line or "Total :" in line or "Time &" in line or "From Date" in line:
-                continue
-            try:
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) >= 5:
-                    date_in = parts[0]
-                    time_in = parts[1]
-                    date_out = parts[2]
-                    time_out = parts[3]
-                    dur_str = parts[4] if len(parts) > 4 else ""
-                    if re.match(r"\d{2}-[A-Za-z]{3}-\d{2}", date_in) and dur_str:
-                        dur_parts = dur_str.replace(".", ":").split(":")
-                        try:
-                            h = int(dur_parts[0])
-                            m = int(dur_parts[1]) if len(dur_parts) > 1 else 0
-                            s = int(dur_parts[2]) if len(dur_parts) > 2 else 0
-                            duration_hours = h + m / 60 + s / 3600
-                        except (ValueError, IndexError):
-                            duration_hours = None
-                        if duration_hours is not None and current_emp_id and current_branch:
-                            rows.append({
-                                "employee_id": current_emp_id,
-                                "employee_name": current_name,
-                                "branch": current_branch,
-                                "punch_in_date": date_in,
-                                "duration_hours": round(duration_hours, 2),
-                            })
-            except Exception:
-                pass
+                # Branch rows are ',Main Street Coffee,,,,' (the name is not always in the first column).
+                current_branch = next((p.strip() for p in line.split(",") if p.strip()), current_branch)
+                continue
+            if "Total :" in line:
+                if totals is not None and current_emp_id:
+                    totals.append({"level": "employee", "key": current_emp_id,
+                                   "duration_hours": _parse_duration(line.split("Total :")[1].strip(" ,"))})
+                continue
+            if "PUNCH IN" in line or "Time &" in line or "From Date" in line:
+                continue
+            parts = [p.strip() for p in line.split(",")]
+            if len(parts) < 5 or not re.match(r"\d{2}-[A-Za-z]{3}-\d{2}", parts[0]):
+                continue
+            # Layout: date in, (blank), time in, date out, time out, work duration. The duration column
+            # wraps at 24 h (a 5-day open shift shows as 20.00.13), so use the punch timestamps when present.
+            punch_in, punch_out = _parse_punch(parts[0], parts[2]), _parse_punch(parts[3], parts[4])
+            if punch_in and punch_out:
+                duration_hours = (punch_out - punch_in).total_seconds() / 3600
+            else:
+                duration_hours = _parse_duration(parts[5]) if len(parts) > 5 else None
+            if duration_hours is not None and current_emp_id and current_branch:
+                rows.append({
+                    "employee_id": current_emp_id,
+                    "employee_name": current_name,
+                    "branch": current_branch,
+                    "punch_in_date": parts[0],
+                    "duration_hours": round(duration_hours, 2),
+                })
 
     df = pd.DataFrame(rows)
-    df.to_csv(config.CLEANED_ATTENDANCE_PATH, index=False)
+    df = _encode_keys(df, {"employee_id": ("employee", "employee_code"), "branch": ("branch", "branch_code")})
+    _write_csv(df, config.CLEANED_ATTENDANCE_PATH)
     return df
 
 
-def load_and_clean_items_by_group():
+def load_and_clean_items_by_group(totals=None):
     """
-    Load rep_s_00191_SMRY.csv: Description, Qty, Total Amount by Division/Group.
+    Load rep_s_00191_SMRY.csv: Description, Qty, Total Amount by Branch/Division/Group.
     Uses csv.reader so quoted amounts like "2,860,540.50" parse correctly.
+    If `totals` is a list, the 'Total by Group' / 'Total by Division' / 'Total by Branch' rows are appended to it
+    (group and division totals keyed by (branch, name), as the report closes them within each branch).
     """
     path = os.path.join(config.DATA_DIR, "rep_s_00191_SMRY.csv")
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["description", "division", "group", "qty", "total_amount"])
+        return pd.DataFrame(columns=["product_code", "division", "group", "qty", "total_amount", "branch_code"])
 
     rows = []
+    current_branch = None
     current_division = None
     current_group = None
     with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
@@ -237,7 +304,16 @@ def load_and_clean_items_by_group():
             first = parts[0].strip() if parts else ""
             if "Page " in first or "Description" in first and "Barcode" in str(parts):
                 continue
-            if "Branch:" in first:
+            if "Total by" in first:
+                level, _, key = first.partition(":")
+                level = level.replace("Total by", "").strip().lower()
+                if totals is not None and level in ("group", "division", "branch") and len(parts) >= 4:
+                    key = key.strip() if level == "branch" else (current_branch or "", key.strip())
+                    totals.append({"level": level, "key": key, "qty": _clean_numeric(parts[2]),
+                                   "total_amount": _clean_numeric(parts[3])})
+                continue
+            if first.startswith("Branch:"):
+                current_branch = first.replace("Branch:", "").strip()
                 continue
             if "Division:" in first:
                 current_division = first.replace("Division:", "").strip()
@@ -245,8 +321,6 @@ def load_and_clean_items_by_group():
             if "Group:" in first:
                 current_group = first.replace("Group:", "").strip()
                 continue
-            if "Total by" in first:
-                continue
             if len(parts) < 4:
                 continue
             desc = first
@@ -259,86 +333,131 @@ def load_and_clean_items_by_group():
                     "group": current_group or "",
                     "qty": qty,
                     "total_amount": total,
+                    "branch": current_branch or "",
                 })
 
     df = pd.DataFrame(rows)
-    df.to_csv(config.CLEANED_ITEMS_GROUPS_PATH, index=False)
+    df = _encode_keys(df, {"description": ("product", "product_code"), "branch": ("branch", "branch_code")})
+    _write_csv(df, config.CLEANED_ITEMS_GROUPS_PATH)
     return df
 
 
-def load_and_clean_avg_sales_menu():
-    """Load rep_s_00435_SMRY.csv: Menu Name (branch/channel), # Cust, Sales, Avg Customer."""
+def load_and_clean_avg_sales_menu(totals=None):
+    """
+    Load rep_s_00435_SMRY.csv: Menu Name (channel) rows under a branch header row, # Cust, Sales, Avg Customer.
+    If `totals` is a list, the 'Total By Branch:' and grand 'Total :' rows are appended to it.
+    """
     path = os.path.join(config.DATA_DIR, "rep_s_00435_SMRY.csv")
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["menu_name", "branch", "channel", "num_cust", "sales", "avg_customer"])
+        return pd.DataFrame(columns=["menu_name", "branch_code", "channel", "num_cust", "sales", "avg_customer"])
 
     rows = []
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.rstrip("\n\r")
-            if "Menu Name" in line or "Copyright" in line or "Total :" in line and "Total By" not in line:
-                continue
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) < 4:
-                continue
+    current_branch = None
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        for parts in csv.reader(f):
+            parts = [p.strip() for p in parts] + [""] * 4
             menu = parts[0]
+            if not menu or "Menu Name" in menu or "Copyright" in menu or menu.startswith("REP_S_"):
+                continue
             num_cust = _clean_numeric(parts[1])
             sales = _clean_numeric(parts[2])
-            avg_cust = _clean_numeric(parts[3])
-            if menu and num_cust is not None and "Total" not in menu:
-                rows.append({
-                    "menu_name": menu,
-                    "num_cust": num_cust,
-                    "sales": sales,
-                    "avg_customer": avg_cust,
-                })
-
-    df = pd.DataFrame(rows)
-    df["branch"] = df["menu_name"].apply(lambda x: x if any(b in str(x) for b in ["Conut", "Main Street"]) else "")
+            if menu.startswith("Total"):
+                if totals is not None:
+                    level, key = ("branch", current_branch) if "Total By Branch" in menu else ("report", "")
+                    totals.append({"level": level, "key": key, "num_cust": num_cust, "sales": sales})
+                continue
+            if num_cust is None:
+                # A name with no figures is the branch header for the channel rows below it.
+                if not any(parts[1:4]):
+                    current_branch = menu
+                continue
+            rows.append({
+                "menu_name": menu,
+                "num_cust": num_cust,
+                "sales": sales,
+                "avg_customer": _clean_numeric(parts[3]),
+                "branch": current_branch or "",
+            })
+
+    df = pd.DataFrame(rows, columns=["menu_name", "num_cust", "sales", "avg_customer", "branch"])
     df["channel"] = df["menu_name"].apply(lambda x: "DELIVERY" if "DELIVERY" in str(x).upper() else "TABLE" if "TABLE" in str(x).upper() else "TAKE AWAY" if "TAKE AWAY" in str(x).upper() else "")
-    df.to_csv(config.CLEANED_AVG_SALES_MENU_PATH, index=False)
+    df = _encode_keys(df, {"branch": ("branch", "branch_code")})
+    _write_csv(df, config.CLEANED_AVG_SALES_MENU_PATH)
     return df
 
-def load_and_clean_tax_by_branch():
-    """Load REP_S_00194_SMRY.csv: Branch Name, Tax Total. Format: 'Branch Name:  X' then 'Total By Branch,...,number'."""
+def load_and_clean_tax_by_branch(totals=None):
+    """
+    Load REP_S_00194_SMRY.csv: Branch Name, Tax Total. Format: 'Branch Name:  X' then 'Total By Branch,VAT,...,Total'.
+    Uses csv.reader so the quoted amounts and the trailing empty columns of the branch row parse correctly.
+    If `totals` is a list, each branch row's Total column is appended to it.
+    """
     path = os.path.join(config.DATA_DIR, "REP_S_00194_SMRY.csv")
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["branch", "tax_total"])
+        return pd.DataFrame(columns=["branch_code", "tax_total"])
 
     rows = []
     current_branch = None
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.rstrip("\n\r")
-            if "Branch Name:" in line:
-                current_branch = line.replace("Branch Name:", "").strip()
-                continue
-            if "Total By Branch" in line and current_branch:
-                parts = [p.strip().replace('"', "") for p in line.split(",")]
-                for p in parts:
-                    tax_val = _clean_numeric(p)
-                    if tax_val is not None and tax_val > 0:
-                        rows.append({"branch": current_branch, "tax_total": tax_val})
-                        break
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        for parts in csv.reader(f):
+            parts = [p.strip() for p in parts]
+            if not parts:
+                continue
+            if "Branch Name:" in parts[0]:
+                current_branch = parts[0].replace("Branch Name:", "").strip()
+                continue
+            if "Total By Branch" in parts[0] and current_branch:
+                values = [_clean_numeric(p) for p in parts[1:]]
+                tax_val = next((v for v in values if v is not None and v > 0), None)
+                if tax_val is not None:
+                    rows.append({"branch": current_branch, "tax_total": tax_val})
+                if totals is not None:
+                    total = next((v for v in reversed(values) if v is not None), None)
+                    totals.append({"level": "branch", "key": current_branch, "tax_total": total})
                 current_branch = None
                 continue
 
-    df = pd.DataFrame(rows).drop_duplicates(subset=["branch"])
-    df.to_csv(config.CLEANED_TAX_BRANCH_PATH, index=False)
+    df = pd.DataFrame(rows, columns=["branch", "tax_total"]).drop_duplicates(subset=["branch"])
+    df = _encode_keys(df, {"branch": ("branch", "branch_code")})
+    _write_csv(df, config.CLEANED_TAX_BRANCH_PATH)
     return df
 
 
-def run_ingestion():
-    """Run all load_and_clean_* steps and save artifacts. Returns dict of dataframes."""
+# Report export file (lower-cased) -> (table name, loader). Order is the ingestion order.
+REPORT_LOADERS = {
+    "rep_s_00150.csv": ("orders", load_and_clean_customer_orders),
+    "rep_s_00502.csv": ("sales_detail", load_and_clean_sales_detail),
+    "rep_s_00334_1_smry.csv": ("monthly_sales", load_and_clean_monthly_sales),
+    "rep_s_00461.csv": ("attendance", load_and_clean_attendance),
+    "rep_s_00191_smry.csv": ("items_by_group", load_and_clean_items_by_group),
+    "rep_s_00435_smry.csv": ("avg_sales_menu", load_and_clean_avg_sales_menu),
+    "rep_s_00194_smry.csv": ("tax_by_branch", load_and_clean_tax_by_branch),
+}
+
+
+def tables_for_files(filenames):
+    """Table names whose source report is among the given file names (case-insensitive)."""
+    wanted = {os.path.basename(f).lower() for f in filenames}
+    return [table for name, (table, _) in REPORT_LOADERS.items() if name in wanted]
+
+
+def run_ingestion(tables=None):
+    """
+    Run the load_and_clean_* steps (all, or only the given tables) and save artifacts. Returns dict of dataframes.
+    Each table is reconciled against its report's total rows; see artifacts/validation_report.json.
+    """
     os.makedirs(config.ARTIFACTS_DIR, exist_ok=True)
-    result = {}
-    result["orders"] = load_and_clean_customer_orders()
-    result["sales_detail"] = load_and_clean_sales_detail()
-    result["monthly_sales"] = load_and_clean_monthly_sales()
-    result["attendance"] = load_and_clean_attendance()
-    result["items_by_group"] = load_and_clean_items_by_group()
-    result["avg_sales_menu"] = load_and_clean_avg_sales_menu()
-    result["tax_by_branch"] = load_and_clean_tax_by_branch()
+    result, checks, quarantines = {}, {}, {}
+    for table, loader in REPORT_LOADERS.values():
+        if tables is None or table in tables:
+            totals = []
+            result[table] = loader(totals)
+            checks[table], quarantines[table] = reconcile(table, result[table], totals)
+    write_validation_report(checks, quarantines)
+    for table, check in checks.items():
+        if check["status"] == "mismatch":
+            bad = sum(level["mismatched"] for level in check["levels"].values())
+            print(f"  [validation] {table}: {bad} block(s) disagree with the report totals"
+                  + (f" -> {check['quarantine_file']}" if check.get("quarantine_file") else ""))
     return result
 
 
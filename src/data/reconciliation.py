@@ -0,0 +1,192 @@
+
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+from src.data.encoding import get_dictionary
+
+# Every REP_S report carries its own checksums ('Total :', 'Total by Group', 'Total By Branch', ...).
+# Loaders hand those rows over as {"level", "key", <measure>: value} dicts; here they are compared
+# with group sums of the cleaned rows, one groupby per level, so a parse error shows up as a
+# mismatching block instead of silently skewing every objective downstream.
+
+# table -> {level: (key column in the cleaned table, dictionary domain of the key, measures)}.
+# The "report" level has no key: all rows are compared with the sum of those total rows. A tuple of
+# columns (with one domain each) is a composite key; the loader then emits each total's key as a
+# tuple in the same order, e.g. (branch, division) for blocks the report closes per branch.
+CHECKS = {
+    "orders": {"report": (None, None, ["total", "num_orders"])},
+    "sales_detail": {"customer": ("customer_code", "customer", ["qty", "price"]),
+                     "report": (None, None, ["qty", "price"])},
+    "monthly_sales": {"branch": ("branch_code", "branch", ["total"]),
+                      "report": (None, None, ["total"])},
+    "attendance": {"employee": ("employee_code", "employee", ["duration_hours"])},
+    "items_by_group": {"division": (("branch_code", "division"), ("branch", None), ["qty", "total_amount"]),
+                       "group": (("branch_code", "group"), ("branch", None), ["qty", "total_amount"]),
+                       "branch": ("branch_code", "branch", ["qty", "total_amount"])},
+    "avg_sales_menu": {"branch": ("branch_code", "branch", ["num_cust", "sales"]),
+                       "report": (None, None, ["num_cust", "sales"])},
+    "tax_by_branch": {"branch": ("branch_code", "branch", ["tax_total"])},
+}
+
+# measure -> (absolute tolerance, extra tolerance per cleaned row). Money totals may be rounded to
+# units and lines to cents; durations are rounded to 0.01 h per row; counts must match exactly.
+TOLERANCE = {
+    "qty": (1e-6, 0.0),
+    "num_orders": (1e-6, 0.0),
+    "num_cust": (1e-6, 0.0),
+    "duration_hours": (0.01, 0.005),
+}
+DEFAULT_TOLERANCE = (1.0, 0.01)
+RELATIVE_TOLERANCE = 1e-6
+MAX_LISTED = 50
+
+
+def _row_index(df, key_col):
+    """Key of every cleaned row: an Index for one column, a MultiIndex for a composite key."""
+    if isinstance(key_col, tuple):
+        return pd.MultiIndex.from_arrays([df[c].to_numpy() for c in key_col])
+    return pd.Index(df[key_col].to_numpy())
+
+
+def _check_level(df, level_totals, key_col, domain, measures):
+    """Compare one level's totals with the cleaned rows. Returns (summary, mismatching keys as row values)."""
+    expected = pd.DataFrame(level_totals).reindex(columns=["key"] + measures)
+    for m in measures:
+        expected[m] = pd.to_numeric(expected[m], errors="coerce")
+    composite = isinstance(key_col, tuple)
+    by = "key"
+    if composite:
+        parts = [f"key{i}" for i in range(len(key_col))]
+        expected[parts] = pd.DataFrame(expected["key"].tolist(), index=expected.index)
+        by = parts
+    # A key can close several blocks (e.g. a customer under two branches): compare the sums.
+    expected = expected.groupby(by, sort=False)[measures].sum(min_count=1)
+    values = df[measures].apply(pd.to_numeric, errors="coerce") if len(df) else pd.DataFrame(columns=measures, dtype=float)
+
+    if key_col is None:
+        exp = expected.sum(min_count=1).to_numpy()[None, :]
+        act = values.sum().to_numpy(dtype=float)[None, :]
+        counts = np.array([len(df)])
+        keys = np.array([""], dtype=object)
+        row_keys = None
+        uncovered = 0
+    else:
+        if composite:
+            lookup = pd.MultiIndex.from_arrays([
+                get_dictionary(d).lookup(expected.index.get_level_values(i).to_numpy(dtype=object)) if d
+                else expected.index.get_level_values(i).to_numpy(dtype=object)
+                for i, d in enumerate(domain)])
+            keys = np.empty(len(expected), dtype=object)
+            keys[:] = [list(k) for k in expected.index]
+        else:
+            keys = expected.index.to_numpy(dtype=object)
+            lookup = pd.Index(get_dictionary(domain).lookup(keys) if domain else keys)
+        row_keys = _row_index(df, key_col)
+        grouped = values.groupby(row_keys, sort=False)
+        act = grouped.sum().reindex(lookup).to_numpy(dtype=float)
+        counts = grouped.size().reindex(lookup).to_numpy(dtype=float)
+        act = np.nan_to_num(act)  # a total with no cleaned rows at all compares against 0
+        counts = np.nan_to_num(counts)
+        exp = expected.to_numpy(dtype=float)
+        uncovered = int((~row_keys.isin(lookup)).sum())
+
+    atol = np.array([TOLERANCE.get(m, DEFAULT_TOLERANCE)[0] for m in measures])
+    row_tol = np.array([TOLERANCE.get(m, DEFAULT_TOLERANCE)[1] for m in measures])
+    tol = atol + counts[:, None] * row_tol + RELATIVE_TOLERANCE * np.abs(np.nan_to_num(exp))
+    diff = act - exp
+    bad = ~(np.abs(diff) <= tol)  # NaN (unparseable total) counts as a mismatch
+    bad_rows = np.flatnonzero(bad.any(axis=1))
+
+    mismatches = []
+    for i in bad_rows[:MAX_LISTED]:
+        mismatches.append({
+            "key": keys[i],
+            "rows": int(counts[i]),
+            "measures": {m: {"expected": None if np.isnan(exp[i, j]) else round(float(exp[i, j]), 4),
+                             "actual": round(float(act[i, j]), 4),
+                             "diff": None if np.isnan(diff[i, j]) else round(float(diff[i, j]), 4)}
+                         for j, m in enumerate(measures) if bad[i, j]},
+        })
+    summary = {
+        "blocks": int(len(keys)),
+        "mismatched": int(len(bad_rows)),
+        "unreconciled_rows": uncovered,
+        "mismatches": mismatches,
+    }
+    bad_keys = None
+    if key_col is not None:
+        bad_keys = lookup[bad_rows]
+    return summary, bad_keys
+
+
+def reconcile(table, df, totals):
+    """
+    Reconcile a freshly cleaned table against the total rows its loader captured.
+    Returns (result dict for the validation report, DataFrame of rows in mismatching blocks).
+    """
+    checks = CHECKS.get(table, {})
+    levels, quarantine = {}, []
+    for level, (key_col, domain, measures) in checks.items():
+        level_totals = [t for t in totals if t.get("level") == level]
+        if not level_totals:
+            continue
+        summary, bad_keys = _check_level(df, level_totals, key_col, domain, measures)
+        levels[level] = summary
+        if bad_keys is not None and len(bad_keys):
+            rows = df[_row_index(df, key_col).isin(bad_keys)].copy()
+            rows.insert(0, "quarantine_level", level)
+            quarantine.append(rows)
+    if not levels:
+        status = "no_totals"
+    elif any(l["mismatched"] for l in levels.values()):
+        status = "mismatch"
+    else:
+        status = "ok"
+    result = {"status": status, "rows": int(len(df)), "levels": levels}
+    quarantined = pd.concat(quarantine, ignore_index=True) if quarantine else None
+    return result, quarantined
+
+
+def _quarantine_path(table):
+    return os.path.join(config.QUARANTINE_DIR, f"{table}.csv")
+
+
+def write_validation_report(results, quarantines):
+    """
+    Merge per-table results into validation_report.json (tables not re-run keep their last entry)
+    and write / clear quarantine/<table>.csv. Returns the report.
+    """
+    report = {"tables": {}}
+    if os.path.exists(config.VALIDATION_REPORT_PATH):
+        try:
+            with open(config.VALIDATION_REPORT_PATH, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            pass
+    os.makedirs(config.QUARANTINE_DIR, exist_ok=True)
+    for table, result in results.items():
+        path = _quarantine_path(table)
+        rows = quarantines.get(table)
+        if rows is not None and not rows.empty:
+            tmp = f"{path}.tmp"
+            rows.to_csv(tmp, index=False)
+            os.replace(tmp, path)
+            result["quarantine_file"] = os.path.relpath(path, config.ARTIFACTS_DIR)
+            result["quarantined_rows"] = int(len(rows))
+        elif os.path.exists(path):
+            os.remove(path)
+        report.setdefault("tables", {})[table] = result
+    report["generated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    report["status"] = "mismatch" if any(t.get("status") == "mismatch" for t in report["tables"].values()) else "ok"
+    tmp = f"{config.VALIDATION_REPORT_PATH}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    os.replace(tmp, config.VALIDATION_REPORT_PATH)
+    return report
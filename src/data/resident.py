@@ -0,0 +1,324 @@
+
+import os
+import json
+import mmap
+import uuid
+import shutil
+import numpy as np
+import pandas as pd
+
+# Read-only, memory-mapped form of a snapshot, shared by every API worker on the host. publish()
+# packs a snapshot into <snapshot>/.resident/ before CURRENT is flipped, so a worker that sees the
+# new version always finds it packed: tables become one .npy file per column (opened with
+# mmap_mode="r") plus a sorted key index, JSON artifacts become compact pre-rendered response bytes
+# with the byte spans of every top-level value and of each record in their lists, so endpoints can
+# filter, slice and project a document by splicing bytes instead of parsing it per worker.
+# The pages live in the OS page cache once, however many workers map them.
+
+RESIDENT_DIR = ".resident"
+# Table artifacts served by the API -> key column for O(log n) lookups (searchsorted on the mapped keys).
+RESIDENT_TABLES = {"customer_features.csv": "customer", "branch_features.csv": "branch", "item_forecasts.csv": "product"}
+_SKIP = ("manifest.json",)
+
+
+def _resident_path(path):
+    """<dir>/<name> -> <dir>/.resident/<name> (a directory for tables and JSON documents alike)."""
+    return os.path.join(os.path.dirname(path), RESIDENT_DIR, os.path.basename(path))
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode("utf-8")
+
+
+def _render_list(items, emit, pos):
+    """Render a list at byte `pos`; returns (element spans, per-element field spans or None, field names)."""
+    spans, field_spans = [], []
+    names = list(items[0]) if items and isinstance(items[0], dict) else None
+    emit(b"[")
+    for i, item in enumerate(items):
+        if i:
+            emit(b",")
+        start = pos()
+        if names is not None and isinstance(item, dict) and list(item) == names:
+            emit(b"{")
+            fields = []
+            for j, (k, v) in enumerate(item.items()):
+                if j:
+                    emit(b",")
+                field_start = pos()
+                emit(_dumps(k) + b":" + _dumps(v))
+                fields.append((field_start, pos()))
+            emit(b"}")
+            field_spans.append(fields)
+        else:
+            names = None  # records of differing shapes: element spans only
+            emit(_dumps(item))
+        spans.append((start, pos()))
+    emit(b"]")
+    return spans, (field_spans if names is not None else None), names
+
+
+def _render_json(path, target):
+    """body (compact JSON) + meta.json (top-level value spans) + per list: element spans, field spans, labels."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    data = json.loads(text.replace(": NaN", ": null").replace(": nan", ": null"))
+    os.makedirs(target)
+    out, size = [], [0]
+
+    def emit(chunk):
+        out.append(chunk)
+        size[0] += len(chunk)
+
+    def pos():
+        return size[0]
+
+    meta = {"keys": {}, "lists": {}}
+    if isinstance(data, dict):
+        emit(b"{")
+        for i, (key, value) in enumerate(data.items()):
+            emit((b"," if i else b"") + _dumps(key) + b":")
+            start = pos()
+            if isinstance(value, list):
+                n = len(meta["lists"])
+                spans, field_spans, names = _render_list(value, emit, pos)
+                np.save(os.path.join(target, f"{n}.items.npy"), np.array(spans, dtype=np.int64).reshape(-1, 2))
+                if field_spans is not None:
+                    np.save(os.path.join(target, f"{n}.fields.npy"),
+                            np.array(field_spans, dtype=np.int64).reshape(len(value), len(names), 2))
+                # A record's first field names it (branch, cohort, combo); it is what list filters match on.
+                first = next(iter(value[0]), None) if value and isinstance(value[0], dict) else None
+                labels = [str(v.get(first) or "") if first and isinstance(v, dict) else "" for v in value]
+                np.save(os.path.join(target, f"{n}.labels.npy"), np.array(labels, dtype="U"))
+                meta["lists"][key] = {"id": n, "fields": names if field_spans is not None else None}
+            else:
+                emit(_dumps(value))
+            meta["keys"][key] = [start, pos()]
+        emit(b"}")
+    else:
+        emit(_dumps(data))
+    with open(os.path.join(target, "body"), "wb") as f:
+        f.write(b"".join(out))
+    with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _pack_table(path, target, key=None):
+    """One .npy per column (strings as fixed-width unicode so they can be mapped too) + meta.json."""
+    df = pd.read_csv(path)
+    os.makedirs(target)
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if values.dtype == object:
+            values = values.fillna("").astype(str).to_numpy(dtype="U")
+        else:
+            values = values.to_numpy()
+        np.save(os.path.join(target, f"{i}.npy"), values)
+    meta = {"columns": list(map(str, df.columns)), "rows": int(len(df)), "key": key if key in df.columns else None}
+    if meta["key"]:
+        keys = df[key].fillna("").astype(str).to_numpy(dtype="U")
+        order = np.argsort(keys, kind="stable")
+        np.save(os.path.join(target, "key_sorted.npy"), keys[order])
+        np.save(os.path.join(target, "key_order.npy"), order.astype(np.int64))
+    with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _pack_one(path, target):
+    name = os.path.basename(path)
+    if name.endswith(".json"):
+        _render_json(path, target)
+    elif name in RESIDENT_TABLES:
+        _pack_table(path, target, RESIDENT_TABLES[name])
+
+
+def _link(src, dst):
+    if os.path.isdir(src):
+        os.makedirs(dst)
+        for name in os.listdir(src):
+            _link(os.path.join(src, name), os.path.join(dst, name))
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def pack_snapshot(directory, previous=None):
+    """
+    Build <directory>/.resident/ for every JSON artifact and served table. Artifacts hard-linked
+    unchanged from the `previous` snapshot reuse its packed form instead of being re-parsed.
+    """
+    target = os.path.join(directory, RESIDENT_DIR)
+    if os.path.isdir(target):
+        return target
+    tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(tmp)
+    try:
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if name.startswith(".") or name in _SKIP or not os.path.isfile(path):
+                continue
+            if not (name.endswith(".json") or name in RESIDENT_TABLES):
+                continue
+            old = os.path.join(previous, name) if previous else None
+            old_packed = os.path.join(previous, RESIDENT_DIR, name) if previous else None
+            if old and os.path.exists(old) and os.path.isdir(old_packed) and os.path.samefile(old, path):
+                _link(old_packed, os.path.join(tmp, name))
+            else:
+                _pack_one(path, os.path.join(tmp, name))
+        os.rename(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(target):  # losing a race with another packer is fine; anything else is not
+            raise
+    return target
+
+
+def _ensure_packed(path):
+    """Packed form of one artifact, packing it on first use (snapshots published before packing existed)."""
+    packed = _resident_path(path)
+    # Snapshot files never change; the mtime check only matters for the flat legacy layout.
+    # Every packed form is a directory; a plain file is JSON rendered before documents were indexed.
+    if os.path.isdir(packed) and os.path.getmtime(packed) >= os.path.getmtime(path):
+        return packed
+    os.makedirs(os.path.dirname(packed), exist_ok=True)
+    tmp = f"{packed}.{uuid.uuid4().hex}.tmp"
+    _pack_one(path, tmp)
+    if os.path.isdir(packed):
+        shutil.rmtree(packed, ignore_errors=True)
+    elif os.path.exists(packed):
+        os.remove(packed)
+    try:
+        os.rename(tmp, packed)
+    except OSError:  # another worker packed it first
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp, ignore_errors=True)
+        elif os.path.exists(tmp):
+            os.remove(tmp)
+    return packed
+
+
+def render_object(parts):
+    """JSON object bytes from {key: value}; memoryview/bytes values are spliced in as already-rendered JSON."""
+    out = []
+    for key, value in parts.items():
+        out.append(_dumps(key) + b":" + (bytes(value) if isinstance(value, (bytes, memoryview)) else _dumps(value)))
+    return b"{" + b",".join(out) + b"}"
+
+
+def _load(path):
+    # Empty arrays cannot be mapped; they cost nothing to load.
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)
+
+
+def _without(value, drop):
+    return {k: v for k, v in value.items() if k not in drop} if isinstance(value, dict) else value
+
+
+class ResidentDocument:
+    """A packed JSON artifact: the rendered body is one read-only mapping, sliced by the recorded byte spans."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, "body"), "rb") as f:
+            self.body = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        self.keys = list(meta["keys"])
+        self._spans = meta["keys"]
+        self._lists = {}
+        for key, info in meta["lists"].items():
+            n = info["id"]
+            fields = _load(os.path.join(directory, f"{n}.fields.npy")) if info["fields"] is not None else None
+            self._lists[key] = (_load(os.path.join(directory, f"{n}.items.npy")), fields, info["fields"],
+                                _load(os.path.join(directory, f"{n}.labels.npy")))
+        self.nbytes = self.body.nbytes + sum(a.nbytes for arrays in self._lists.values()
+                                             for a in (arrays[0], arrays[1], arrays[3]) if a is not None)
+
+    def __contains__(self, key):
+        return key in self._spans
+
+    def value(self, key):
+        """Rendered bytes of one top-level value."""
+        start, end = self._spans[key]
+        return self.body[start:end]
+
+    def labels(self, key):
+        """First-field value of every record of a top-level list ("" where absent)."""
+        return self._lists[key][3]
+
+    def items(self, key, rows=None, drop=()):
+        """Rendered JSON array of the list's records at `rows` (all by default), without the fields in `drop`."""
+        spans, field_spans, names, _ = self._lists[key]
+        rows = np.arange(len(spans)) if rows is None else np.asarray(rows, dtype=np.int64)
+        body = self.body
+        if not drop:
+            parts = [body[s:e] for s, e in spans[rows]]
+        elif field_spans is not None:
+            cols = [i for i, name in enumerate(names) if name not in drop]
+            parts = [b"{" + b",".join(body[s:e] for s, e in field_spans[r, cols]) + b"}" for r in rows]
+        else:
+            parts = [_dumps(_without(json.loads(bytes(body[s:e])), drop)) for s, e in spans[rows]]
+        return b"[" + b",".join(parts) + b"]"
+
+    def render(self, replace=None, drop=()):
+        """The top-level object with some values replaced (rendered bytes or plain values) and some keys dropped."""
+        replace = replace or {}
+        return render_object({k: replace[k] if k in replace else self.value(k) for k in self.keys if k not in drop})
+
+
+class ResidentTable:
+    """A packed table: columns are read-only memory maps, rows are materialized only when asked for."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.columns = meta["columns"]
+        self.key = meta["key"]
+        self._arrays = {c: _load(os.path.join(directory, f"{i}.npy")) for i, c in enumerate(self.columns)}
+        self._rows = meta["rows"]
+        self.nbytes = sum(a.nbytes for a in self._arrays.values())
+        if self.key:
+            self._sorted = _load(os.path.join(directory, "key_sorted.npy"))
+            self._order = _load(os.path.join(directory, "key_order.npy"))
+            self.nbytes += self._sorted.nbytes + self._order.nbytes
+
+    def __len__(self):
+        return self._rows
+
+    def column(self, name):
+        return self._arrays[name]
+
+    def find(self, value):
+        """Row number of `value` in the key column, or None."""
+        if not self.key or not self._rows:
+            return None
+        i = int(np.searchsorted(self._sorted, value))
+        if i < self._rows and self._sorted[i] == value:
+            return int(self._order[i])
+        return None
+
+    def find_all(self, value):
+        """Row numbers of every row whose key equals `value` (keys need not be unique)."""
+        if not self.key or not self._rows:
+            return np.empty(0, dtype=np.int64)
+        lo, hi = np.searchsorted(self._sorted, value, side="left"), np.searchsorted(self._sorted, value, side="right")
+        return np.sort(np.asarray(self._order[lo:hi]))
+
+    def frame(self, rows):
+        """DataFrame of the given row numbers (a private copy of just those rows)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return pd.DataFrame({c: np.asarray(a[rows]) for c, a in self._arrays.items()}, columns=self.columns)
+
+
+def open_document(path):
+    """ResidentDocument for a JSON artifact path inside a snapshot (e.g. .../demand_forecast.json)."""
+    return ResidentDocument(_ensure_packed(path))
+
+
+def open_table(path):
+    """ResidentTable for a table artifact path inside a snapshot (e.g. .../customer_features.csv)."""
+    return ResidentTable(_ensure_packed(path))
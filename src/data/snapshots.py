@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import time
+import shutil
+import uuid
+import argparse
+import contextlib
+import contextvars
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+from src.data import resident
+
+# Versioned artifact publishing. Objectives write into a private staging directory; publish()
+# renames it to snapshots/<version>/ and then atomically replaces the CURRENT pointer file, so
+# a reader sees either the complete old snapshot or the complete new one, never a partial file.
+# The previous config.SNAPSHOT_KEEP snapshots are kept for rollback.
+
+MANIFEST = "manifest.json"
+_ACTIVE = contextvars.ContextVar("active_snapshot_staging", default=None)
+
+
+def _atomic_write_bytes(path, data):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _atomic_write_text(path, text):
+    _atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def _snapshots_root(artifacts_dir=None):
+    return os.path.join(artifacts_dir, "snapshots") if artifacts_dir else config.SNAPSHOTS_DIR
+
+
+def _pointer(artifacts_dir=None):
+    return os.path.join(artifacts_dir, "CURRENT") if artifacts_dir else config.CURRENT_SNAPSHOT_POINTER
+
+
+# Read-side functions take an optional artifacts_dir so one API process can serve several
+# datasets; without it they use the process-wide config (the pipeline's dataset).
+
+def current_version(artifacts_dir=None):
+    """Name of the live snapshot, or None if nothing has been published yet."""
+    try:
+        with open(_pointer(artifacts_dir), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def snapshot_dir(version, artifacts_dir=None):
+    return os.path.join(_snapshots_root(artifacts_dir), version)
+
+
+def list_versions(artifacts_dir=None):
+    """Published snapshot names, oldest first (names sort chronologically)."""
+    root = _snapshots_root(artifacts_dir)
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root)
+                  if not d.startswith(".") and os.path.isdir(os.path.join(root, d)))
+
+
+def read_manifest(version, artifacts_dir=None):
+    with open(os.path.join(snapshot_dir(version, artifacts_dir), MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def begin():
+    """Create a staging directory seeded with the current snapshot's files (hard links, never rewritten in place)."""
+    os.makedirs(config.SNAPSHOTS_DIR, exist_ok=True)
+    staging = os.path.join(config.SNAPSHOTS_DIR, f".staging-{uuid.uuid4().hex}")
+    os.makedirs(staging)
+    version = current_version()
+    if version and os.path.isdir(snapshot_dir(version)):
+        for name in os.listdir(snapshot_dir(version)):
+            if name == MANIFEST or name.startswith("."):
+                continue
+            src, dst = os.path.join(snapshot_dir(version), name), os.path.join(staging, name)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+    return staging
+
+
+def write_json(staging, name, obj):
+    """Write one artifact into a staging directory (temp file + rename, so hard-linked files are replaced, not modified)."""
+    _atomic_write_text(os.path.join(staging, name), json.dumps(obj, indent=2))
+
+
+def write_text(staging, name, text):
+    """Write a non-JSON artifact (e.g. a CSV feature table) into a staging directory."""
+    _atomic_write_text(os.path.join(staging, name), text)
+
+
+def _new_version():
+    base = time.strftime("%Y%m%dT%H%M%S") + f"{int(time.time() * 1000) % 1000:03d}"
+    version, n = base, 1
+    while os.path.exists(snapshot_dir(version)):
+        version, n = f"{base}-{n}", n + 1
+    return version
+
+
+def _set_current(version, artifacts_dir=None):
+    _atomic_write_text(_pointer(artifacts_dir), version + "\n")
+
+
+def _mirror_legacy(version, artifacts_dir=None):
+    """Keep artifacts/<name> in step with the live snapshot for tooling that reads the flat layout."""
+    src_dir = snapshot_dir(version, artifacts_dir)
+    for name in os.listdir(src_dir):
+        if name == MANIFEST or name.startswith("."):
+            continue
+        with open(os.path.join(src_dir, name), "rb") as f:
+            _atomic_write_bytes(os.path.join(artifacts_dir or config.ARTIFACTS_DIR, name), f.read())
+
+
+def prune(keep=None):
+    """Delete snapshots beyond the newest `keep` (the current one is always kept)."""
+    keep = config.SNAPSHOT_KEEP if keep is None else keep
+    current = current_version()
+    older = [v for v in list_versions() if v != current]
+    for version in older[:max(0, len(older) - keep)]:
+        shutil.rmtree(snapshot_dir(version), ignore_errors=True)
+
+
+def publish(staging):
+    """Turn a staging directory into a new snapshot and make it current. Returns the version name."""
+    version = _new_version()
+    files = sorted(n for n in os.listdir(staging) if not n.endswith(".tmp") and not n.startswith("."))
+    manifest = {
+        "version": version,
+        "previous": current_version(),
+        "published_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": files,
+    }
+    write_json(staging, MANIFEST, manifest)
+    # Pack the shared read-only form before CURRENT moves, so API workers never see an unpacked snapshot.
+    previous = snapshot_dir(manifest["previous"]) if manifest["previous"] else None
+    resident.pack_snapshot(staging, previous if previous and os.path.isdir(previous) else None)
+    os.rename(staging, snapshot_dir(version))
+    _set_current(version)
+    _mirror_legacy(version)
+    prune()
+    return version
+
+
+def rollback(version=None, artifacts_dir=None):
+    """Point CURRENT at `version`, or at the snapshot published before the current one."""
+    versions = list_versions(artifacts_dir)
+    if version is None:
+        current = current_version(artifacts_dir)
+        earlier = [v for v in versions if current is None or v < current]
+        if not earlier:
+            raise ValueError("No earlier snapshot to roll back to.")
+        version = earlier[-1]
+    if version not in versions:
+        raise ValueError(f"Unknown snapshot: {version}")
+    _set_current(version, artifacts_dir)
+    _mirror_legacy(version, artifacts_dir)
+    return version
+
+
+@contextlib.contextmanager
+def staging():
+    """
+    Collect every write_artifact() inside the block into one snapshot, published atomically on exit.
+    If the block raises, the staging directory is discarded and the live snapshot is untouched.
+    """
+    if _ACTIVE.get() is not None:
+        yield _ACTIVE.get()
+        return
+    directory = begin()
+    token = _ACTIVE.set(directory)
+    try:
+        yield directory
+    except BaseException:
+        _ACTIVE.reset(token)
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    _ACTIVE.reset(token)
+    publish(directory)
+
+
+def write_artifact(path, obj):
+    """
+    Write a JSON artifact named after `path` (e.g. config.COMBO_ARTIFACT). Inside staging() it joins
+    the pending snapshot; on its own it is published immediately as a snapshot of its own.
+    """
+    name = os.path.basename(path)
+    active = _ACTIVE.get()
+    if active is not None:
+        write_json(active, name, obj)
+        return
+    with staging() as directory:
+        write_json(directory, name, obj)
+
+
+def write_table(path, df):
+    """Like write_artifact, for a DataFrame stored as CSV (e.g. config.CUSTOMER_FEATURES_ARTIFACT)."""
+    name = os.path.basename(path)
+    text = df.to_csv(index=False)
+    active = _ACTIVE.get()
+    if active is not None:
+        write_text(active, name, text)
+        return
+    with staging() as directory:
+        write_text(directory, name, text)
+
+
+def write_bytes(path, data):
+    """Like write_artifact, for a binary artifact (e.g. a pickled nearest-neighbour index)."""
+    name = os.path.basename(path)
+    active = _ACTIVE.get()
+    if active is not None:
+        _atomic_write_bytes(os.path.join(active, name), data)
+        return
+    with staging() as directory:
+        _atomic_write_bytes(os.path.join(directory, name), data)
+
+
+def artifact_path(name, version=None, artifacts_dir=None):
+    """Path of an artifact in the given (default: current) snapshot, or the flat legacy path if none is published."""
+    version = version or current_version(artifacts_dir)
+    if version:
+        return os.path.join(snapshot_dir(version, artifacts_dir), name)
+    return os.path.join(artifacts_dir or config.ARTIFACTS_DIR, name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List published artifact snapshots or roll back to one.")
+    parser.add_argument("--dataset", default=config.DEFAULT_DATASET, help="Named dataset (see config.DATASETS_DIR).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    rb = sub.add_parser("rollback")
+    rb.add_argument("version", nargs="?", help="Snapshot to make current (default: the previous one).")
+    args = parser.parse_args(argv)
+    config.use_dataset(args.dataset)
+
+    if args.command == "list":
+        current = current_version()
+        for v in list_versions():
+            print(("* " if v == current else "  ") + v)
+    else:
+        print("Current snapshot:", rollback(args.version))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+from src.data import ingestion
+
+# Table name -> (loader, config attribute of its cleaned CSV, {column: kind}).
+# kind is "code" (int32 dictionary code, see src/data/encoding.py), "str", "float", "int" or "datetime";
+# every table is normalized to these dtypes exactly once.
+TABLES = {
+    "orders": (ingestion.load_and_clean_customer_orders, "CLEANED_ORDERS_PATH", {
+        "customer_code": "code", "first_order": "datetime", "last_order": "datetime", "total": "float", "num_orders": "int",
+    }),
+    "sales_detail": (ingestion.load_and_clean_sales_detail, "CLEANED_SALES_DETAIL_PATH", {
+        "customer_code": "code", "product_code": "code", "qty": "float", "price": "float",
+    }),
+    "monthly_sales": (ingestion.load_and_clean_monthly_sales, "CLEANED_MONTHLY_SALES_PATH", {
+        "branch_code": "code", "month": "str", "year": "int", "total": "float",
+    }),
+    "attendance": (ingestion.load_and_clean_attendance, "CLEANED_ATTENDANCE_PATH", {
+        "employee_code": "code", "employee_name": "str", "branch_code": "code", "punch_in_date": "str", "duration_hours": "float",
+    }),
+    "items_by_group": (ingestion.load_and_clean_items_by_group, "CLEANED_ITEMS_GROUPS_PATH", {
+        "product_code": "code", "division": "str", "group": "str", "qty": "float", "total_amount": "float",
+        "branch_code": "code",
+    }),
+    "avg_sales_menu": (ingestion.load_and_clean_avg_sales_menu, "CLEANED_AVG_SALES_MENU_PATH", {
+        "menu_name": "str", "num_cust": "float", "sales": "float", "avg_customer": "float", "branch_code": "code", "channel": "str",
+    }),
+    "tax_by_branch": (ingestion.load_and_clean_tax_by_branch, "CLEANED_TAX_BRANCH_PATH", {
+        "branch_code": "code", "tax_total": "float",
+    }),
+}
+
+
+def _normalize(df, schema):
+    """Coerce every schema column to its kind and freeze the backing arrays (one array per column)."""
+    columns = {}
+    n = len(df)
+    for col, kind in schema.items():
+        if col not in df.columns:
+            fill, dtype = {"str": ("", object), "code": (-1, "int32"), "int": (0, "int64"),
+                           "datetime": ("NaT", "datetime64[ns]")}.get(kind, (np.nan, "float64"))
+            values = np.full(n, fill, dtype=dtype)
+        elif kind == "str":
+            s = df[col]
+            values = s.where(s.notna(), "").astype(str).to_numpy(dtype=object)
+        elif kind == "code":
+            values = pd.to_numeric(df[col], errors="coerce").fillna(-1).to_numpy(dtype="int32")
+        elif kind == "datetime":
+            values = pd.to_datetime(df[col], format="ISO8601", errors="coerce").to_numpy(dtype="datetime64[ns]")
+        elif kind == "int":
+            values = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype="int64")
+        else:
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+        values = np.array(values, copy=True)
+        values.setflags(write=False)
+        columns[col] = values
+    # copy=False keeps one frozen array per column, so writes through any view raise instead of leaking.
+    return pd.DataFrame(columns, copy=False)
+
+
+class DataStore:
+    """
+    Typed, read-only cleaned tables shared by all objectives.
+    Each table is loaded on first access (preloaded frame -> cleaned CSV -> raw loader),
+    normalized once, and handed out as a zero-copy view whose arrays are not writeable.
+    """
+
+    def __init__(self, frames=None):
+        self._raw = dict(frames or {})
+        self._tables = {}
+        self._locks = {name: threading.Lock() for name in TABLES}
+
+    def table(self, name):
+        if name not in TABLES:
+            raise KeyError(f"Unknown table: {name}")
+        frame = self._tables.get(name)
+        if frame is None:
+            with self._locks[name]:
+                frame = self._tables.get(name)
+                if frame is None:
+                    frame = _normalize(self._load(name), TABLES[name][2])
+                    self._tables[name] = frame
+                    self._raw.pop(name, None)
+        # Shallow copy: callers may add or reassign columns on their view without touching the store.
+        return frame.copy(deep=False)
+
+    __getitem__ = table
+
+    def put(self, name, frame):
+        """Replace a table with a freshly loaded frame; views handed out earlier keep the old arrays."""
+        with self._locks[name]:
+            self._raw[name] = frame
+            self._tables.pop(name, None)
+
+    def get(self, name, default=None):
+        return self.table(name) if name in TABLES else default
+
+    def loaded(self):
+        return sorted(self._tables)
+
+    def _load(self, name):
+        if self._raw.get(name) is not None:
+            return self._raw[name]
+        loader, path_attr, _ = TABLES[name]
+        path = getattr(config, path_attr)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            try:
+                return pd.read_csv(path)
+            except pd.errors.EmptyDataError:
+                pass
+        return loader()
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store():
+    """Process-wide store for the current config.DATA_DIR / ARTIFACTS_DIR (used by standalone objective runs)."""
+    key = (config.DATA_DIR, config.ARTIFACTS_DIR)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = DataStore()
+    return store
@@ -0,0 +1,469 @@
+import os
+import csv
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+# Synthetic REP_S exports at configurable scale, written in the exact report layouts
+# that src/data/ingestion.py parses (title rows, page breaks, block headers, Total rows).
+# Scale 1 reproduces the size of the sample set in `Conut bakery Scaled Data/`.
+
+BASE_BRANCHES = ["Conut - Tyre", "Conut", "Conut Jnah", "Main Street Coffee"]
+# Attendance blocks are only recognised for these names, so extra branches reuse them with a suffix.
+EXTRA_BRANCH_BASES = ["Conut - Tyre", "Conut Jnah", "Main Street Coffee"]
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+MONTH_ABBR = [m[:3] for m in MONTH_NAMES]
+
+BASE_CUSTOMERS = 500          # rep_s_00150 has ~500 delivery customers
+BASE_DETAIL_SHARE = 0.25      # ~1 in 4 of them appears in the REP_S_00502 line-item report
+BASE_MONTHS = 5               # sample covers Aug–Dec 2025
+MAX_MONTHS = 36               # exports span at most 3 years; larger month scales grow customers instead
+BASE_EMPLOYEES_PER_BRANCH = 4
+SHIFTS_PER_MONTH = 20
+LINES_PER_PAGE = 36
+REPORT_DATE = "30-Jan-26"
+
+FALLBACK_CATALOG = [
+    ("CAFFE LATTE", "Hot-Coffee Based", "Hot-Coffee Based", 47.0, 417162.16),
+    ("DOUBLE ESPRESSO", "Hot-Coffee Based", "Hot-Coffee Based", 55.0, 328432.43),
+    ("MOCHA FRAPPE", "Frappes", "Frappes", 30.0, 536351.34),
+    ("PISTACHIO MILKSHAKE", "Shakes", "Shakes", 25.0, 893918.92),
+    ("CLASSIC CHIMNEY", "ITEMS", "Chimney", 80.0, 595945.95),
+    ("CONUT THE ONE", "Conuts", "Conuts", 60.0, 893918.92),
+    ("DELIVERY CHARGE", "Delivery Service", "Delivery Service", 108.0, 238378.38),
+    ("FULL FAT MILK", "MILK OPTIONS", "MILK OPTIONS", 120.0, 0.0),
+    ("PRESSED", "CHIMNEY CAKE OPTIONS", "CHIMNEY CAKE OPTIONS", 292.0, 0.0),
+    ("WHIPPED CREAM...", "Free Whipped Cream", "Free Whipped Cream", 73.0, 0.0),
+]
+
+
+def _fmt(val, decimals=2):
+    """Report-style number: thousands separators, fixed decimals (e.g. '1,251,486.48')."""
+    return f"{val:,.{decimals}f}"
+
+
+_TWO_DIGITS = np.array([f"{i:02d}" for i in range(100)], dtype=object)
+
+
+def _fmt_all(values, decimals=2):
+    """_fmt over an array (object array of strings)."""
+    return np.array([f"{v:,.{decimals}f}" for v in np.asarray(values, dtype=float).tolist()], dtype=object)
+
+
+def _day_labels(days):
+    """datetime64[D] array -> 'DD-Mon-YY' strings, as printed by the attendance report."""
+    months = days.astype("datetime64[M]")
+    dom = (days - months).astype(np.int64) + 1
+    month = months.astype(np.int64) % 12
+    year = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    return _TWO_DIGITS[dom] + "-" + np.asarray(MONTH_ABBR, dtype=object)[month] + "-" + _TWO_DIGITS[year % 100]
+
+
+def _hms_all(seconds, sep):
+    """_hms over an int array (hours below 100)."""
+    seconds = np.asarray(seconds, dtype=np.int64)
+    return (_TWO_DIGITS[seconds // 3600] + sep + _TWO_DIGITS[seconds % 3600 // 60] + sep + _TWO_DIGITS[seconds % 60])
+
+
+def _load_catalog(data_dir):
+    """
+    Build the product catalog (description, division, group, qty, unit price) from the sample
+    rep_s_00191 export so generated baskets follow the real product mix and price levels.
+    """
+    path = os.path.join(data_dir, "rep_s_00191_SMRY.csv")
+    if not os.path.exists(path):
+        return FALLBACK_CATALOG
+
+    seen = {}
+    division = group = ""
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        for parts in csv.reader(f):
+            if not parts:
+                continue
+            first = parts[0].strip()
+            if first.startswith("Division:"):
+                division = first.replace("Division:", "").strip()
+                continue
+            if first.startswith("Group:"):
+                group = first.replace("Group:", "").strip()
+                continue
+            if not first or first.startswith(("Total", "Branch:", "Description", "REP_S_", "Conut", "Sales by")) or len(parts) < 4:
+                continue
+            try:
+                qty = float(parts[2].replace(",", ""))
+                total = float(parts[3].replace(",", ""))
+            except ValueError:
+                continue
+            if qty <= 0 or first in seen:
+                continue
+            seen[first] = (first, division, group, qty, round(total / qty, 2))
+    return list(seen.values()) or FALLBACK_CATALOG
+
+
+def _branches(n):
+    names = list(BASE_BRANCHES[:n])
+    k = 0
+    while len(names) < n:
+        base = EXTRA_BRANCH_BASES[k % len(EXTRA_BRANCH_BASES)]
+        names.append(f"{base} {k // len(EXTRA_BRANCH_BASES) + 2}")
+        k += 1
+    return names
+
+
+def _months(n, end_year=2025, end_month=12):
+    """Last n (year, month) pairs ending at end_year/end_month, oldest first."""
+    out = []
+    y, m = end_year, end_month
+    for _ in range(n):
+        out.append((y, m))
+        m -= 1
+        if m == 0:
+            y, m = y - 1, 12
+    return out[::-1]
+
+
+class _PagedWriter:
+    """csv.writer that inserts the report's page-break rows every LINES_PER_PAGE lines."""
+
+    def __init__(self, f, page_rows):
+        self._w = csv.writer(f, lineterminator="\n")
+        self._w_file = f
+        self._page_rows = page_rows
+        self._lines = 0
+        self._page = 1
+        self.rows = 0
+
+    def writerow(self, row):
+        if self._lines and self._lines % LINES_PER_PAGE == 0:
+            self._page += 1
+            for r in self._page_rows(self._page):
+                self._w.writerow(r)
+        self._w.writerow(row)
+        self._lines += 1
+        self.rows += 1
+
+    def writeblock(self, frame):
+        """Write a DataFrame of string cells in one to_csv call, splicing in page breaks like writerow."""
+        if frame.empty:
+            return
+        lines = frame.to_csv(header=False, index=False, lineterminator="\n").split("\n")[:-1]
+        f, i = self._w_file, 0
+        while i < len(lines):
+            if self._lines and self._lines % LINES_PER_PAGE == 0:
+                self._page += 1
+                for r in self._page_rows(self._page):
+                    self._w.writerow(r)
+            n = LINES_PER_PAGE - self._lines % LINES_PER_PAGE
+            f.write("\n".join(lines[i:i + n]) + "\n")
+            self._lines += len(lines[i:i + n])
+            i += n
+        self.rows += len(lines)
+
+
+def write_sales_detail(path, rng, catalog, branches, n_customers, start_id):
+    """REP_S_00502: line items per customer per branch with 'Total :' and 'Total Branch:' rows."""
+    names = np.array([f"  {c[0]}" for c in catalog], dtype=object)
+    prices = np.array([c[4] for c in catalog])
+    price_text, neg_price_text = _fmt_all(prices), _fmt_all(-prices)
+    weights = np.array([c[3] for c in catalog], dtype=float)
+    weights /= weights.sum()
+    width = max(4, len(str(start_id + n_customers)))
+    per_branch = np.array_split(np.arange(start_id, start_id + n_customers), len(branches))
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        page = lambda p: [[REPORT_DATE, "From Date: 01-Jan-2026", "To Date: 30-Jan-2026", f"Page {p} of", " 0"],
+                          ["Full Name", "Qty", "  Description", "Price", ""]]
+        w = _PagedWriter(f, page)
+        w.writerow([branches[0], "", "", "", ""])
+        w.writerow(["Sales by customer in details (delivery)", "", "", "", ""])
+        for r in page(1):
+            w.writerow(r)
+        for branch, ids in zip(branches, per_branch):
+            w.writerow([f"Branch :{branch}", "", "", "", ""])
+            n_items = np.maximum(1, rng.lognormal(mean=2.2, sigma=0.8, size=len(ids)).astype(np.int64))
+            picks = rng.choice(len(names), size=int(n_items.sum()), p=weights)
+            # Voided line: the POS prints the reversal and a re-entry before the kept line.
+            void = rng.random(len(picks)) < 0.05
+            owner = np.repeat(np.arange(len(ids)), n_items)
+            item_rows = 1 + 2 * void.astype(np.int64)
+            block_rows = 2 + np.bincount(owner, weights=item_rows, minlength=len(ids)).astype(np.int64)
+            block_start = np.cumsum(block_rows) - block_rows
+            item_offset = np.cumsum(item_rows) - item_rows
+            first_item = np.cumsum(n_items) - n_items
+            item_pos = block_start[owner] + 1 + item_offset - item_offset[first_item][owner]
+            kept_pos = item_pos + 2 * void
+
+            n_rows = int(block_rows.sum())
+            cells = np.full((n_rows, 5), "", dtype=object)
+            cells[block_start, 0] = [f"Person_{cid:0{width}d}" for cid in ids.tolist()]
+            for pos, qty, text in ((kept_pos, "1.0", price_text), (item_pos[void], "-1.0", neg_price_text),
+                                   (item_pos[void] + 1, "1.0", price_text)):
+                idx = picks if pos is kept_pos else picks[void]
+                cells[pos, 1], cells[pos, 2], cells[pos, 3] = qty, names[idx], text[idx]
+            cust_qty = n_items.astype(float)
+            cust_total = np.bincount(owner, weights=prices[picks], minlength=len(ids))
+            totals = block_start + block_rows - 1
+            cells[totals, 0], cells[totals, 1], cells[totals, 3] = "Total :", _fmt_all(cust_qty, 1), _fmt_all(cust_total)
+            w.writeblock(pd.DataFrame(cells))
+            w.writerow(["Total Branch:", _fmt(cust_qty.sum(), 1), "", _fmt(cust_total.sum()), ""])
+        w.writerow(["REP_S_00502", "Copyright © 2026 Omega Software, Inc. All Rights Reserved.", "", "www.omegapos.com", ""])
+    return w.rows
+
+
+def write_customer_orders(path, rng, branches, months, n_customers, start_id):
+    """rep_s_00150: one row per delivery customer with first/last order, total and order count."""
+    width = max(4, len(str(start_id + n_customers)))
+    per_branch = np.array_split(np.arange(start_id, start_id + n_customers), len(branches))
+    n_days = len(months) * 30
+    y0, m0 = months[0]
+    start = np.datetime64(f"{y0}-{m0:02d}-01T00:00", "m")
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        page = lambda p: [[REPORT_DATE, "", "From Date: 01-Jan-2025", "", "To Date: 31-Dec-2025", "", f"Page {p} of", "", "", " 0"],
+                          ["Customer Name", "Address", "Phone Number", "First Order", "", "Last Order", "", "Total", "No. of Orders", ""]]
+        w = _PagedWriter(f, page)
+        w.writerow([branches[0]] + [""] * 9)
+        w.writerow(["Customer Orders (Delivery)"] + [""] * 9)
+        for r in page(1):
+            w.writerow(r)
+        for branch, ids in zip(branches, per_branch):
+            w.writerow([branch] + [""] * 9)
+            first = rng.integers(0, n_days, size=len(ids))
+            span = np.minimum(rng.exponential(scale=n_days / 6, size=len(ids)).astype(int), n_days - 1 - first)
+            num_orders = rng.geometric(p=0.5, size=len(ids))
+            num_orders[span == 0] = 1
+            totals = num_orders * rng.lognormal(mean=14.8, sigma=0.4, size=len(ids))
+            minutes = rng.integers(10 * 60, 24 * 60, size=(len(ids), 2))
+            phones = rng.integers(1_000_000, 99_999_999, size=len(ids))
+            t0 = start + (first * 24 * 60 + minutes[:, 0]).astype("timedelta64[m]")
+            t1 = start + ((first + span) * 24 * 60 + minutes[:, 1]).astype("timedelta64[m]")
+            stamp = lambda t: pd.Series(np.datetime_as_string(t, unit="m")).str.replace("T", " ", regex=False) + ":"
+            w.writeblock(pd.DataFrame({
+                0: [f"Person_{cid:0{width}d}" for cid in ids.tolist()], 1: "     ",
+                2: [f"{p:08d} " for p in phones.tolist()], 3: stamp(t0), 4: "", 5: stamp(t1), 6: "",
+                7: _fmt_all(totals, 1), 8: num_orders.astype(str), 9: "",
+            }))
+            w.writerow(["", "", "Total By Branch", "", "", "", "", _fmt(totals.sum(), 0), str(int(num_orders.sum())), ""])
+        w.writerow(["REP_S_00150", "Copyright © 2026 Omega Software, Inc. All Rights Reserved.", "", "", "", "", "", "www.omegapos.com", "", ""])
+    return w.rows
+
+
+def write_monthly_sales(path, rng, branches, months):
+    """rep_s_00334_1: monthly totals per branch with 'Total for', 'Total by Branch' and 'Grand Total' rows."""
+    grand = 0.0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        page = lambda p: [[REPORT_DATE, "", "", "", ""], ["", f"Year: {months[-1][0]}", "", f"Page {p} of", " 0"]]
+        w = _PagedWriter(f, page)
+        w.writerow([branches[0], "", "", "", ""])
+        w.writerow(["Monthly Sales", "", "", "", ""])
+        for r in page(1):
+            w.writerow(r)
+        w.writerow(["Month", "", "Year", "Total", ""])
+        for branch in branches:
+            w.writerow([f"Branch Name: {branch}", "", "", "", ""])
+            level = rng.lognormal(mean=20.5, sigma=0.3)
+            growth = rng.normal(0.08, 0.05)
+            branch_total = 0.0
+            by_year = {}
+            for i, (y, m) in enumerate(months):
+                val = level * (1 + growth) ** i * rng.lognormal(0, 0.35)
+                by_year.setdefault(y, []).append((m, val))
+            for y, vals in by_year.items():
+                for m, val in vals:
+                    w.writerow([MONTH_NAMES[m - 1], "", str(y), _fmt(val), ""])
+                year_total = sum(v for _, v in vals)
+                w.writerow(["", "", f"Total for    {y}", _fmt(year_total), ""])
+                branch_total += year_total
+            w.writerow(["", "", "Total by Branch :", _fmt(branch_total), ""])
+            grand += branch_total
+        w.writerow(["", "", "Grand Total:", _fmt(grand), ""])
+        w.writerow(["REP_S_00334_1", "REP_S_00334_1 Copyright © 2026 Omega Software, Inc. All Rights ", "", "\"www.omegapos.com\"", ""])
+    return w.rows
+
+
+def write_attendance(path, rng, branches, months, employees_per_branch):
+    """REP_S_00461: punch in/out rows per employee block, closed by a 'Total :' duration row."""
+    y0, m0 = months[0]
+    start = np.datetime64(f"{y0}-{m0:02d}-01T00:00:00", "s")
+    n_days = len(months) * 30
+    emp_id = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        page = lambda p: [["", REPORT_DATE, "From Date: 01-Dec-2025 30-Dec-2025", "", "", ""],
+                          ["", "PUNCH IN", "", "PUNCH OUT", "", "Work Duration"]]
+        w = _PagedWriter(f, page)
+        w.writerow([branches[0], "", "", "", "", ""])
+        w.writerow(["Time & Attendance Report", "", "", "", "", ""])
+        for r in page(1):
+            w.writerow(r)
+        for branch in branches:
+            for _ in range(employees_per_branch):
+                emp_id += 1
+                w.writerow(["", f"EMP ID :{float(emp_id)}", f"NAME :Person_{emp_id:04d}", "", "", ""])
+                w.writerow(["", branch, "", "", "", ""])
+                n_shifts = int(len(months) * SHIFTS_PER_MONTH * rng.uniform(0.6, 1.1))
+                days = np.sort(rng.choice(n_days, size=min(n_shifts, n_days), replace=False))
+                starts = rng.integers(7 * 3600, 17 * 3600, size=len(days))
+                durations = np.clip(rng.normal(9 * 3600, 1.5 * 3600, size=len(days)), 60, 14 * 3600).astype(int)
+                t_in = start + (days * 86400 + starts).astype("timedelta64[s]")
+                t_out = t_in + durations.astype("timedelta64[s]")
+                d_in, d_out = t_in.astype("datetime64[D]"), t_out.astype("datetime64[D]")
+                w.writeblock(pd.DataFrame({
+                    0: _day_labels(d_in), 1: "", 2: _hms_all((t_in - d_in).astype(np.int64), "."),
+                    3: _day_labels(d_out), 4: _hms_all((t_out - d_out).astype(np.int64), "."), 5: _hms_all(durations, "."),
+                }))
+                total = int(durations.sum())
+                w.writerow(["", "", "", "", "Total :", f"{total // 3600}:{total % 3600 // 60}:{total % 60}"])
+        w.writerow(["REP_S_00461", "", "Copyright © 2026 Omega Software, Inc. All Rights Reserved.", "", "", "www.omegapos.com"])
+    return w.rows
+
+
+def write_items_by_group(path, rng, catalog, branches, volume):
+    """rep_s_00191: qty and amount per item, nested Branch > Division > Group with 'Total by' rows."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        page = lambda p: [[REPORT_DATE, "Years:2025 Months:0", "", f"Page {p} of", " 0"],
+                          ["Description", "Barcode", "Qty", "Total Amount", ""]]
+        w = _PagedWriter(f, page)
+        w.writerow([branches[0], "", "", "", ""])
+        w.writerow(["Sales by Items By Group", "", "", "", ""])
+        for r in page(1):
+            w.writerow(r)
+        divisions = {}
+        for desc, div, grp, qty, price in catalog:
+            divisions.setdefault(div, {}).setdefault(grp, []).append((desc, qty, price))
+        for branch in branches:
+            w.writerow([f"Branch: {branch}", "", "", "", ""])
+            b_qty = b_total = 0.0
+            for div, groups in divisions.items():
+                w.writerow([f"Division: {div}", "", "", "", ""])
+                d_qty = d_total = 0.0
+                for grp, items in groups.items():
+                    w.writerow([f"Group: {grp}", "", "", "", ""])
+                    g_qty = g_total = 0.0
+                    for desc, qty, price in items:
+                        q = float(rng.poisson(max(qty * volume * rng.uniform(0.3, 1.2), 0.1)))
+                        if q == 0:
+                            continue
+                        w.writerow([desc, "", _fmt(q, 1), _fmt(q * price), ""])
+                        g_qty += q
+                        g_total += q * price
+                    w.writerow([f"Total by Group: {grp}", "", _fmt(g_qty, 1), _fmt(g_total), ""])
+                    d_qty += g_qty
+                    d_total += g_total
+                w.writerow([f"Total by Division: {div}", "", _fmt(d_qty, 1), _fmt(d_total), ""])
+                b_qty += d_qty
+                b_total += d_total
+            w.writerow([f"Total by Branch: {branch}", "", _fmt(b_qty), _fmt(b_total), ""])
+        w.writerow(["REP_S_00191", "Copyright © 2026 Omega Software, Inc. All Rights ", "", "", ""])
+        w.writerow(["", "", "", "www.omegapos.com", ""])
+    return w.rows
+
+
+def write_avg_sales_menu(path, rng, branches, volume):
+    """rep_s_00435: customers / sales / average per channel for each branch."""
+    channels = ["DELIVERY", "TABLE", "TAKE AWAY"]
+    grand_cust = grand_sales = 0.0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow([branches[0], "", "", "", ""])
+        w.writerow(["Average Sales By Menu", "", "", "", ""])
+        w.writerow(["", "Year: 2025 - All Months", "", "Page 1 of", " 1"])
+        w.writerow([REPORT_DATE, "", "", "", ""])
+        w.writerow(["Menu Name", "# Cust", "Sales", "Avg Customer", ""])
+        rows = 5
+        for branch in branches:
+            w.writerow([branch, "", "", "", ""])
+            b_cust = b_sales = 0.0
+            active = [c for c in channels if rng.random() < 0.7] or ["TABLE"]
+            for ch in active:
+                cust = float(max(1, int(rng.lognormal(7.0, 1.0) * volume)))
+                avg = rng.lognormal(14.2, 0.2)
+                w.writerow([ch, f"{cust:.2f}", f"{cust * avg:.2f}", f"{avg:.2f}", ""])
+                b_cust += cust
+                b_sales += cust * avg
+            w.writerow(["Total By Branch:", f"{b_cust:.2f}", f"{b_sales:.2f}", f"{b_sales / b_cust:.2f}", ""])
+            grand_cust += b_cust
+            grand_sales += b_sales
+            rows += len(active) + 2
+        w.writerow(["Total :", f"{grand_cust:.2f}", f"{grand_sales:.2f}", f"{grand_sales / grand_cust:.2f}", ""])
+        w.writerow(["REP_S_00435", "Copyright © 2026 Omega Software, Inc. All Rights ", "", "www.omegapos.com", ""])
+    return rows + 2
+
+
+def write_tax_by_branch(path, rng, branches, volume):
+    """REP_S_00194: one 'Total By Branch' VAT row per branch."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow([branches[0]] + [""] * 9)
+        w.writerow(["Tax Report"] + [""] * 9)
+        w.writerow([REPORT_DATE] + [""] * 7 + ["Page 1 of", " 1"])
+        w.writerow(["", "Year: 2025 - All Months"] + [""] * 8)
+        w.writerow(["TAX DESCRIPTION", "VAT 11 %", "Tax 2", "Tax 3", "Tax 4", "Tax 5", "", "Service", "Total", ""])
+        for branch in branches:
+            vat = rng.lognormal(20.2, 0.2) * volume
+            w.writerow([f"Branch Name:  {branch}"] + [""] * 9)
+            w.writerow(["Total By Branch", _fmt(vat), "0.00", "0.00", "0.00", "", "0.00", "0.00", _fmt(vat), ""])
+        w.writerow(["REP_S_00194", "Copyright © 2026 Omega Software, Inc. All Rights Reserved."] + [""] * 6 + ["\"www.omegapos.com\"", ""])
+    return 6 + 2 * len(branches)
+
+
+def generate_dataset(out_dir, customers=1.0, branches=1.0, months=1.0, seed=0, sample_dir=None):
+    """
+    Write a full set of REP_S exports into out_dir.
+    customers / branches / months are multipliers over the sample set (4 branches, 5 months,
+    ~500 delivery customers). Months are capped at MAX_MONTHS; the part of the month multiplier
+    beyond the cap is applied to customers, so customers x months still grows by the requested factor.
+    Returns {filename: rows_written}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    catalog = _load_catalog(sample_dir or config.DATA_DIR)
+    if BASE_MONTHS * months > MAX_MONTHS:
+        surplus = BASE_MONTHS * months / MAX_MONTHS
+        customers, months = customers * surplus, MAX_MONTHS / BASE_MONTHS
+    branch_names = _branches(max(1, int(round(len(BASE_BRANCHES) * branches))))
+    month_list = _months(max(1, int(round(BASE_MONTHS * months))))
+    n_customers = max(1, int(round(BASE_CUSTOMERS * customers)))
+    n_detail = max(1, int(round(n_customers * BASE_DETAIL_SHARE)))
+    # Item volumes grow with customers and months, and are split across branches.
+    volume = customers * months / branches
+
+    out = {}
+    out["REP_S_00502.csv"] = write_sales_detail(os.path.join(out_dir, "REP_S_00502.csv"), rng, catalog, branch_names, n_detail, 1)
+    out["rep_s_00150.csv"] = write_customer_orders(os.path.join(out_dir, "rep_s_00150.csv"), rng, branch_names, month_list, n_customers, 1)
+    out["rep_s_00334_1_SMRY.csv"] = write_monthly_sales(os.path.join(out_dir, "rep_s_00334_1_SMRY.csv"), rng, branch_names, month_list)
+    out["REP_S_00461.csv"] = write_attendance(os.path.join(out_dir, "REP_S_00461.csv"), rng, branch_names, month_list, BASE_EMPLOYEES_PER_BRANCH)
+    out["rep_s_00191_SMRY.csv"] = write_items_by_group(os.path.join(out_dir, "rep_s_00191_SMRY.csv"), rng, catalog, branch_names, volume)
+    out["rep_s_00435_SMRY.csv"] = write_avg_sales_menu(os.path.join(out_dir, "rep_s_00435_SMRY.csv"), rng, branch_names, customers * months / 5)
+    out["REP_S_00194_SMRY.csv"] = write_tax_by_branch(os.path.join(out_dir, "REP_S_00194_SMRY.csv"), rng, branch_names, customers * months / branches)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic REP_S exports at a given scale.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to customers, branches and months.")
+    parser.add_argument("--customers", type=float, help="Override the customer multiplier.")
+    parser.add_argument("--branches", type=float, help="Override the branch multiplier.")
+    parser.add_argument("--months", type=float, help="Override the month multiplier.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = generate_dataset(
+        args.out_dir,
+        customers=args.customers or args.scale,
+        branches=args.branches or args.scale,
+        months=args.months or args.scale,
+        seed=args.seed,
+    )
+    for name, n in rows.items():
+        print(f"  {name}: {n} rows")
+    print("Synthetic exports in:", args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import json
+import threading
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+from src.data.ingestion import REPORT_LOADERS
+
+
+def _is_report(path):
+    return os.path.basename(path).lower() in REPORT_LOADERS
+
+
+def _snapshot(data_dir):
+    """{file name: (mtime_ns, size)} for every known report export in data_dir."""
+    out = {}
+    try:
+        entries = list(os.scandir(data_dir))
+    except FileNotFoundError:
+        return out
+    for entry in entries:
+        if entry.is_file() and _is_report(entry.name):
+            st = entry.stat()
+            out[entry.name] = (st.st_mtime_ns, st.st_size)
+    return out
+
+
+def _poll_changes(data_dir, debounce, interval, stop_event):
+    """Polling fallback: yield sets of changed report names once no new change was seen for `debounce` seconds."""
+    seen = _snapshot(data_dir)
+    pending, last_change = set(), None
+    while not stop_event.is_set():
+        stop_event.wait(interval)
+        current = _snapshot(data_dir)
+        changed = {name for name, sig in current.items() if seen.get(name) != sig}
+        seen = current
+        if changed:
+            pending |= changed
+            last_change = time.monotonic()
+        if pending and time.monotonic() - last_change >= debounce:
+            yield pending
+            pending = set()
+
+
+def _inotify_changes(data_dir, debounce, stop_event):
+    """inotify (via watchfiles); only added/modified report files are yielded."""
+    import watchfiles
+
+    quiet_ms = int(debounce * 1000)
+    # step = quiet period that closes a batch; debounce = hard cap so a constant trickle still flushes.
+    for changes in watchfiles.watch(data_dir, step=quiet_ms, debounce=quiet_ms * 10, stop_event=stop_event, recursive=False):
+        names = {os.path.basename(path) for change, path in changes
+                 if change != watchfiles.Change.deleted and _is_report(path)}
+        if names:
+            yield names
+
+
+def watch_changes(data_dir=None, debounce=2.0, interval=1.0, stop_event=None, use_inotify=True):
+    """
+    Yield batches of changed REP_S export names in data_dir. Bursts of writes (a POS dropping
+    several exports, or one large file written in chunks) are coalesced into one batch.
+    Uses inotify through watchfiles when available, otherwise stat polling every `interval` seconds.
+    """
+    data_dir = data_dir or config.DATA_DIR
+    stop_event = stop_event or threading.Event()
+    if use_inotify:
+        try:
+            import watchfiles  # noqa: F401
+        except ImportError:
+            use_inotify = False
+    if use_inotify:
+        yield from _inotify_changes(data_dir, debounce, stop_event)
+    else:
+        yield from _poll_changes(data_dir, debounce, interval, stop_event)
+
+
+def notify_api(base_url=None, timeout=3, dataset=None):
+    """Ask a running API to drop its cached artifacts of `dataset` (default: config.DATASET). Returns True if it acknowledged."""
+    base_url = (base_url or config.API_BASE_URL).rstrip("/")
+    query = urllib.parse.urlencode({"dataset": dataset or config.DATASET})
+    headers = {"Content-Type": "application/json"}
+    if config.ADMIN_TOKEN:
+        headers["X-Admin-Token"] = config.ADMIN_TOKEN
+    req = urllib.request.Request(f"{base_url}/api/admin/reload?{query}", data=b"{}", method="POST", headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode()).get("status") == "reloaded"
+    except Exception:
+        return False
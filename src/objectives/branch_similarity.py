@@ -0,0 +1,238 @@
+
+import io
+import os
+import re
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+import joblib
+from sklearn import config_context
+from sklearn.neighbors import NearestNeighbors
+
+from src.data.encoding import decode
+from src.data.snapshots import write_artifact, write_bytes, write_table
+from src.data.store import get_store
+
+# Divisions (by sales amount across all branches) that get their own mix column; the rest go to "div_other".
+TOP_DIVISIONS = 6
+# Size-like features are compared on a log scale so a branch twice as big is as far away as one half as big.
+LOG_FEATURES = ["avg_monthly_sales", "tax_total", "customers", "avg_ticket", "staff_hours_per_day", "employees"]
+# Reported next to each neighbour: what that branch actually achieved.
+OUTCOMES = ["total_sales", "avg_monthly_sales", "sales_growth", "customers", "avg_ticket", "tax_total"]
+MAX_PROFILES = 1000
+
+
+def _slug(prefix, name):
+    return prefix + re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_")
+
+
+def _shares(df, key, column, value, names=None):
+    """branch_code x category share of `value` (rows sum to 1; branches without data are all 0)."""
+    table = df.pivot_table(index=key, columns=column, values=value, aggfunc="sum", fill_value=0.0)
+    if names is not None:
+        other = table.drop(columns=[c for c in names if c in table.columns]).sum(axis=1)
+        table = table.reindex(columns=names, fill_value=0.0)
+        table["other"] = other
+    total = table.sum(axis=1).to_numpy()[:, None]
+    return pd.DataFrame(np.divide(table.to_numpy(dtype=float), total, out=np.zeros(table.shape), where=total > 0),
+                        index=table.index, columns=table.columns)
+
+
+def build_branch_features(monthly_sales, tax_by_branch, avg_sales_menu, attendance, items_by_group):
+    """
+    One row per branch: sales level / growth / volatility, tax, channel mix and ticket size,
+    staffing hours and division mix. Returns (features, {group: [columns]}).
+    """
+    groups = {}
+    parts = []
+
+    sales = monthly_sales[monthly_sales["branch_code"] >= 0]
+    if not sales.empty:
+        # Calendar order within each branch, whatever order the report listed the months in.
+        period = sales["year"].astype(int) * 12 + sales["month"].map({m: i for i, m in enumerate(config.MONTHS)})
+        sales = sales.assign(period=period).sort_values(["branch_code", "period"], kind="stable")
+        s = sales.groupby("branch_code")["total"]
+        position, size = s.cumcount(), s.transform("size")
+        first_half = sales["total"].where(position < np.maximum(size // 2, 1)).groupby(sales["branch_code"]).mean()
+        second_half = sales["total"].where(position >= size // 2).groupby(sales["branch_code"]).mean()
+        block = pd.DataFrame({
+            "total_sales": s.sum(),
+            "avg_monthly_sales": s.mean(),
+            "months_of_data": s.count().astype(float),
+            # Relative change from the first to the second half of the observed months.
+            "sales_growth": (second_half - first_half) / first_half.where(first_half > 0),
+            "sales_cv": s.std(ddof=0) / s.mean().where(s.mean() > 0),
+        })
+        parts.append(block)
+        groups["sales"] = ["avg_monthly_sales", "months_of_data", "sales_growth", "sales_cv"]
+
+    tax = tax_by_branch[tax_by_branch["branch_code"] >= 0]
+    if not tax.empty:
+        parts.append(tax.groupby("branch_code")["tax_total"].sum().to_frame())
+        groups["tax"] = ["tax_total", "tax_rate"]
+
+    menu = avg_sales_menu[avg_sales_menu["branch_code"] >= 0]
+    if not menu.empty:
+        m = menu.groupby("branch_code")[["num_cust", "sales"]].sum()
+        block = pd.DataFrame({"customers": m["num_cust"],
+                              "avg_ticket": m["sales"] / m["num_cust"].where(m["num_cust"] > 0)})
+        mix = _shares(menu, "branch_code", "channel", "sales")
+        mix.columns = [_slug("channel_", c) for c in mix.columns]
+        parts.append(block.join(mix))
+        groups["channel"] = ["customers", "avg_ticket"] + list(mix.columns)
+
+    staff = attendance[attendance["branch_code"] >= 0]
+    if not staff.empty:
+        a = staff.groupby("branch_code")
+        parts.append(pd.DataFrame({
+            "staff_hours_per_day": a["duration_hours"].sum() / a["punch_in_date"].nunique(),
+            "employees": a["employee_code"].nunique().astype(float),
+            "avg_shift_hours": a["duration_hours"].mean(),
+        }))
+        groups["staffing"] = ["staff_hours_per_day", "employees", "avg_shift_hours"]
+
+    items = items_by_group[(items_by_group["branch_code"] >= 0) & (items_by_group["division"] != "")]
+    if not items.empty:
+        top = list(items.groupby("division")["total_amount"].sum().sort_values(ascending=False, kind="stable").index[:TOP_DIVISIONS])
+        mix = _shares(items, "branch_code", "division", "total_amount", names=top)
+        mix.columns = [_slug("div_", c) for c in mix.columns]
+        parts.append(mix)
+        groups["division"] = list(mix.columns)
+
+    if not parts:
+        return pd.DataFrame(columns=["branch_code", "branch"]), {}
+    features = pd.concat(parts, axis=1).sort_index()
+    if "tax" in groups:
+        total = features["total_sales"] if "total_sales" in features else pd.Series(np.nan, index=features.index)
+        features["tax_rate"] = features["tax_total"] / total.where(total > 0)
+    # A branch missing from one report (e.g. no attendance export) sits at the fleet average there,
+    # so the gap neither drops it from the index nor pushes it away from every other branch.
+    features = features.fillna(features.mean()).fillna(0.0)
+    features.index.name = "branch_code"
+    features = features.reset_index()
+    features.insert(1, "branch", decode("branch", features["branch_code"]))
+    return features, groups
+
+
+def build_index(features, groups):
+    """
+    Standardize the feature columns and fit a NearestNeighbors index. Each group is weighted by
+    1/sqrt(columns) so e.g. seven division shares count as much as one sales level.
+    """
+    columns = [c for cols in groups.values() for c in cols]
+    weights = np.concatenate([np.full(len(cols), 1.0 / np.sqrt(len(cols))) for cols in groups.values()])
+    log_mask = np.array([c in LOG_FEATURES for c in columns])
+    X = features[columns].to_numpy(dtype=float)
+    X[:, log_mask] = np.log1p(np.clip(X[:, log_mask], 0, None))
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Z = (X - mean) / scale * weights
+    index = NearestNeighbors(algorithm="brute").fit(Z)
+    return {
+        "columns": columns,
+        "groups": groups,
+        "log_mask": log_mask,
+        "mean": mean,
+        "scale": scale,
+        "weights": weights,
+        "raw": features[columns].to_numpy(dtype=float),
+        "branches": features["branch"].tolist(),
+        "outcomes": features[[c for c in OUTCOMES if c in features]].round(4).to_dict(orient="records"),
+        "index": index,
+    }
+
+
+def profile_matrix(model, profiles, base=None):
+    """
+    Raw candidate profiles -> standardized query rows. Each profile maps feature columns to values in
+    branch_features.csv units; features left out take the `base` branch's value, or the fleet average.
+    """
+    columns = model["columns"]
+    position = {c: i for i, c in enumerate(columns)}
+    if base is not None:
+        names = [b.lower() for b in model["branches"]]
+        if base.lower() not in names:
+            raise KeyError(f"Unknown branch: {base}")
+        start = model["raw"][names.index(base.lower())]
+    else:
+        start = None
+    X = np.empty((len(profiles), len(columns)))
+    for row, profile in enumerate(profiles):
+        unknown = [k for k in profile if k not in position]
+        if unknown:
+            raise ValueError(f"Unknown feature(s): {', '.join(unknown)}. Available: {', '.join(columns)}")
+        if start is not None:
+            X[row] = start
+        else:
+            X[row] = np.nan  # filled with the fleet mean after the log transform
+        for key, value in profile.items():
+            value = float(value)
+            if not np.isfinite(value):  # NaN would otherwise pass as "omitted" and take the default
+                raise ValueError(f"Feature {key} must be a finite number, got {value}")
+            X[row, position[key]] = value
+    log_mask = model["log_mask"]
+    X[:, log_mask] = np.log1p(np.clip(X[:, log_mask], 0, None))
+    X = np.where(np.isnan(X), model["mean"], X)
+    return (X - model["mean"]) / model["scale"] * model["weights"]
+
+
+def nearest_branches(model, profiles, k=3, base=None, exclude_base=False):
+    """k most similar existing branches (with their outcomes) for each candidate profile."""
+    Z = profile_matrix(model, profiles, base=base)
+    if not np.isfinite(Z).all():  # e.g. a finite value so large that standardizing overflows
+        raise ValueError("Profile values are out of range for the branch feature scale")
+    n = len(model["branches"])
+    k_query = min(k + (1 if exclude_base and base else 0), n)
+    with config_context(assume_finite=True):
+        distances, indices = model["index"].kneighbors(Z, n_neighbors=k_query)
+    results = []
+    for dist_row, idx_row in zip(distances, indices):
+        neighbors = []
+        for d, i in zip(dist_row, idx_row):
+            if exclude_base and base and model["branches"][i].lower() == base.lower():
+                continue
+            neighbors.append({"branch": model["branches"][i], "distance": round(float(d), 4),
+                              "outcomes": model["outcomes"][i]})
+        results.append(neighbors[:k])
+    return results
+
+
+def run_branch_similarity(monthly_sales: pd.DataFrame = None, tax_by_branch: pd.DataFrame = None,
+                          avg_sales_menu: pd.DataFrame = None, attendance: pd.DataFrame = None,
+                          items_by_group: pd.DataFrame = None):
+    """
+    Branch feature vectors and a nearest-neighbour index for "which branch does this site resemble".
+    Output: branch_features.csv, branch_index.joblib (the fitted index) and branch_similarity.json (peers per branch).
+    """
+    store = get_store()
+    monthly_sales = store.table("monthly_sales") if monthly_sales is None else monthly_sales
+    tax_by_branch = store.table("tax_by_branch") if tax_by_branch is None else tax_by_branch
+    avg_sales_menu = store.table("avg_sales_menu") if avg_sales_menu is None else avg_sales_menu
+    attendance = store.table("attendance") if attendance is None else attendance
+    items_by_group = store.table("items_by_group") if items_by_group is None else items_by_group
+
+    features, groups = build_branch_features(monthly_sales, tax_by_branch, avg_sales_menu, attendance, items_by_group)
+    out = {"branches": int(len(features)), "feature_groups": groups, "peers": []}
+    if len(features) >= 2 and groups:
+        model = build_index(features, groups)
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        write_bytes(config.BRANCH_INDEX_ARTIFACT, buffer.getvalue())
+        for name in model["branches"]:
+            peers = nearest_branches(model, [{}], k=len(features) - 1, base=name, exclude_base=True)[0]
+            out["peers"].append({"branch": name, "most_similar": [{"branch": p["branch"], "distance": p["distance"]} for p in peers]})
+    write_table(config.BRANCH_FEATURES_ARTIFACT, features.round(6))
+    write_artifact(config.BRANCH_SIMILARITY_ARTIFACT, out)
+    return out
+
+
+if __name__ == "__main__":
+    r = run_branch_similarity()
+    print("Branches:", r["branches"])
+    for p in r["peers"]:
+        print(f"  {p['branch']}: " + ", ".join(f"{n['branch']} ({n['distance']})" for n in p["most_similar"]))
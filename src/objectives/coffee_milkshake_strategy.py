@@ -1,13 +1,17 @@
 
 import os
-import json
 import math
+import numpy as np
 import pandas as pd
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
 
+from src.data.encoding import get_dictionary
+from src.data.snapshots import write_artifact
+from src.data.store import get_store
+
 
 def _is_coffee(desc):
     desc = str(desc).upper()
@@ -19,57 +23,46 @@ def _is_milkshake(desc):
     return "MILKSHAKE" in desc or "SHAKE" in desc
 
 
+def _top_products(codes, qty, amount, mask, names, n=10):
+    """Sum qty / amount per product code (NaN propagates), keep first-seen order on ties, top n by qty."""
+    uniq, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    qty_sum = np.zeros(len(uniq))
+    amount_sum = np.zeros(len(uniq))
+    np.add.at(qty_sum, inverse, qty)
+    np.add.at(amount_sum, inverse, amount)
+    keep = np.flatnonzero(mask[uniq]) if len(uniq) else np.empty(0, dtype=np.int64)
+    keep = keep[np.argsort(first[keep], kind="stable")]
+    keep = keep[np.argsort(-qty_sum[keep], kind="stable")][:n]
+    return [(names[uniq[i]], {"qty": float(qty_sum[i]), "total_amount": float(amount_sum[i])}) for i in keep]
+
+
 def run_coffee_milkshake_strategy(items_by_group: pd.DataFrame = None, sales_detail: pd.DataFrame = None):
     """
     Analyze coffee and milkshake performance and output growth strategies.
     """
-    if items_by_group is None or items_by_group.empty:
-        if os.path.exists(config.CLEANED_ITEMS_GROUPS_PATH):
-            items_by_group = pd.read_csv(config.CLEANED_ITEMS_GROUPS_PATH)
-        else:
-            items_by_group = pd.DataFrame()
-
-    if sales_detail is None or sales_detail.empty and os.path.exists(config.CLEANED_SALES_DETAIL_PATH):
-        sales_detail = pd.read_csv(config.CLEANED_SALES_DETAIL_PATH)
+    store = get_store()
+    if items_by_group is None:
+        items_by_group = store.table("items_by_group")
+    if sales_detail is None:
+        sales_detail = store.table("sales_detail")
+
+    # Classify each product code once from the dictionary instead of re-testing strings per line.
+    products = get_dictionary("product")
+    names = products.decode(np.arange(len(products)))
+    is_coffee = np.array([_is_coffee(n) for n in names], dtype=bool)
+    is_milkshake = ~is_coffee & np.array([_is_milkshake(n) for n in names], dtype=bool)
 
     strategies = []
-    coffee_items = []
-    milkshake_items = []
-
-    if not items_by_group.empty:
-        items_by_group["qty"] = pd.to_numeric(items_by_group["qty"], errors="coerce")
-        items_by_group["total_amount"] = pd.to_numeric(items_by_group["total_amount"], errors="coerce")
-        for _, row in items_by_group.iterrows():
-            d = str(row.get("description", ""))
-            q = row.get("qty") or 0
-            t = row.get("total_amount") or 0
-            if _is_coffee(d):
-                coffee_items.append({"description": d, "qty": q, "total_amount": t})
-            elif _is_milkshake(d):
-                milkshake_items.append({"description": d, "qty": q, "total_amount": t})
-
-    if not sales_detail.empty:
-        sales_detail["qty"] = pd.to_numeric(sales_detail["qty"], errors="coerce")
-        sales_detail["price"] = pd.to_numeric(sales_detail["price"], errors="coerce")
-        for _, row in sales_detail.iterrows():
-            d = str(row.get("description", ""))
-            if _is_coffee(d) and not any(x["description"] == d for x in coffee_items):
-                coffee_items.append({"description": d, "qty": row["qty"], "total_amount": row.get("price", 0) * row["qty"]})
-            elif _is_milkshake(d) and not any(x["description"] == d for x in milkshake_items):
-                milkshake_items.append({"description": d, "qty": row["qty"], "total_amount": row.get("price", 0) * row["qty"]})
-
-    from collections import defaultdict
-    c_totals = defaultdict(lambda: {"qty": 0, "total_amount": 0})
-    for x in coffee_items:
-        c_totals[x["description"]]["qty"] += x.get("qty", 0)
-        c_totals[x["description"]]["total_amount"] += x.get("total_amount", 0)
-    m_totals = defaultdict(lambda: {"qty": 0, "total_amount": 0})
-    for x in milkshake_items:
-        m_totals[x["description"]]["qty"] += x.get("qty", 0)
-        m_totals[x["description"]]["total_amount"] += x.get("total_amount", 0)
-
-    top_coffee = sorted(c_totals.items(), key=lambda x: -x[1]["qty"])[:10]
-    top_milkshake = sorted(m_totals.items(), key=lambda x: -x[1]["qty"])[:10]
+    items = items_by_group[items_by_group["product_code"] >= 0]
+    # Line items only count for products that the item report does not already cover (first line per product).
+    lines = sales_detail[(sales_detail["product_code"] >= 0) & ~sales_detail["product_code"].isin(items["product_code"])]
+    lines = lines.drop_duplicates(subset=["product_code"], keep="first")
+    codes = np.concatenate([items["product_code"].to_numpy(), lines["product_code"].to_numpy()]).astype(np.int64)
+    qty = np.concatenate([items["qty"].to_numpy(), lines["qty"].to_numpy()])
+    amount = np.concatenate([items["total_amount"].to_numpy(), (lines["price"] * lines["qty"]).to_numpy()])
+
+    top_coffee = _top_products(codes, qty, amount, is_coffee, names)
+    top_milkshake = _top_products(codes, qty, amount, is_milkshake, names)
 
     strategies.append("Bundle coffee with popular pastries (use combo optimization pairs) to increase basket size.")
     strategies.append("Promote milkshakes during peak warm hours; run limited-time flavors to drive trials.")
@@ -89,6 +82,5 @@ def run_coffee_milkshake_strategy(items_by_group: pd.DataFrame = None, sales_det
         "milkshake": {"top_products_by_qty": [{"description": k, "qty": _sanitize(v["qty"]), "total_amount": _sanitize(v["total_amount"])} for k, v in top_milkshake]},
         "growth_strategies": strategies,
     }
-    with open(config.COFFEE_MILKSHAKE_STRATEGY_ARTIFACT, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
+    write_artifact(config.COFFEE_MILKSHAKE_STRATEGY_ARTIFACT, out)
     return out
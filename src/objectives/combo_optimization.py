@@ -1,6 +1,6 @@
 
 import os
-import json
+import numpy as np
 import pandas as pd
 from collections import defaultdict
 
@@ -8,50 +8,49 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
 
-
-def _normalize_product(desc):
-    """Normalize product name for grouping (strip extra spaces, optional: map variants)."""
-    if not isinstance(desc, str):
-        return ""
-    return desc.strip()
+from src.data.encoding import get_dictionary
+from src.data.snapshots import write_artifact
+from src.data.store import get_store
 
 
 def run_combo_optimization(sales_detail: pd.DataFrame = None):
     """
     Compute frequently bought-together pairs and top combo suggestions.
-    Uses co-occurrence in same order (same customer_name in sales_detail = same order context).
+    Uses co-occurrence in same order (same customer_code in sales_detail = same order context).
+    Pairs are counted on integer product codes; names are decoded only for the output.
     """
-    if sales_detail is None or sales_detail.empty:
-        if os.path.exists(config.CLEANED_SALES_DETAIL_PATH):
-            sales_detail = pd.read_csv(config.CLEANED_SALES_DETAIL_PATH)
-        else:
-            return {"top_pairs": [], "top_combos": [], "message": "No sales detail data."}
+    if sales_detail is None:
+        sales_detail = get_store().table("sales_detail")
+    if sales_detail.empty:
+        return {"top_pairs": [], "top_combos": [], "message": "No sales detail data."}
+
+    products = get_dictionary("product")
+    # Alphabetical rank of each code, so pairs keep their (name_a < name_b) orientation without string compares.
+    names = products.decode(np.arange(len(products)))
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[np.argsort(names.astype(str), kind="stable")] = np.arange(len(names))
 
-    orders = sales_detail.groupby("customer_name")["description"].apply(
-        lambda x: [_normalize_product(d) for d in x.dropna().unique() if _normalize_product(d)]
-    ).to_dict()
+    lines = sales_detail[sales_detail["product_code"] >= 0]
+    orders = lines.groupby("customer_code", sort=False)["product_code"].unique().to_dict()
 
     pair_counts = defaultdict(int)
-    for products in orders.values():
-        products = [p for p in products if p]
-        for i in range(len(products)):
-            for j in range(i + 1, len(products)):
-                a, b = products[i], products[j]
-                if a != b:
-                    pair_counts[(min(a, b), max(a, b))] += 1
+    for codes in orders.values():
+        codes = codes[np.argsort(rank[codes], kind="stable")].tolist()
+        for i in range(len(codes)):
+            for j in range(i + 1, len(codes)):
+                pair_counts[(codes[i], codes[j])] += 1
 
-    sorted_pairs = sorted(pair_counts.items(), key=lambda x: -x[1])[:30]
-    top_pairs = [{"item_a": a, "item_b": b, "count": c} for (a, b), c in sorted_pairs]
+    sorted_pairs = sorted(pair_counts.items(), key=lambda x: (-x[1], rank[x[0][0]], rank[x[0][1]]))[:30]
+    top_pairs = [{"item_a": names[a], "item_b": names[b], "count": c} for (a, b), c in sorted_pairs]
 
     combo_suggestions = []
-    for (a, b), c in sorted_pairs[:15]:
-        combo_suggestions.append({"combo": f"{a} + {b}", "co_occurrence_count": c})
+    for p in top_pairs[:15]:
+        combo_suggestions.append({"combo": f"{p['item_a']} + {p['item_b']}", "co_occurrence_count": p["count"]})
 
     out = {
         "top_pairs": top_pairs,
         "top_combos": combo_suggestions,
         "num_orders_analyzed": len(orders),
     }
-    with open(config.COMBO_ARTIFACT, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
+    write_artifact(config.COMBO_ARTIFACT, out)
     return out
@@ -0,0 +1,256 @@
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+from src.data import snapshots
+from src.data.snapshots import write_artifact, write_table
+from src.data.store import get_store
+
+# Cohort = month of a customer's first order; period k = k months later. rep_s_00150 only gives
+# first / last order per customer, so a customer counts as retained in period k while their last
+# order is at or after cohort month + k. Everything is kept as two cohort x span histograms
+# (customers and revenue by months between first and last order); retention is their reverse
+# cumulative sum along the span axis, so a refresh only has to move the customers that changed.
+
+STATE_COLUMNS = ["customer_code", "first_month", "last_month", "revenue", "orders"]
+
+
+def _month_index(ts):
+    """datetime64 array -> months since year 0 (int64), -1 for NaT."""
+    ts = np.asarray(ts, dtype="datetime64[M]")
+    out = ts.astype(np.int64) + 1970 * 12
+    return np.where(np.isnat(ts), -1, out)
+
+
+def _label(month):
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def customer_state(orders):
+    """One row per customer code: first / last order month, lifetime revenue and order count."""
+    o = orders[(orders["customer_code"] >= 0)]
+    first = _month_index(o["first_order"].to_numpy(dtype="datetime64[ns]"))
+    last = _month_index(o["last_order"].to_numpy(dtype="datetime64[ns]"))
+    frame = pd.DataFrame({
+        "customer_code": o["customer_code"].to_numpy(dtype=np.int64),
+        "first_month": np.where(first < 0, np.iinfo(np.int64).max, first),
+        "last_month": last,
+        "revenue": np.nan_to_num(o["total"].to_numpy(dtype="float64")),
+        "orders": o["num_orders"].to_numpy(dtype=np.int64),
+    })
+    # A customer listed under several branches: earliest first order, latest last order, summed spend.
+    state = frame.groupby("customer_code", sort=True).agg(
+        first_month=("first_month", "min"), last_month=("last_month", "max"),
+        revenue=("revenue", "sum"), orders=("orders", "sum")).reset_index()
+    state = state[(state["first_month"] != np.iinfo(np.int64).max) & (state["last_month"] >= 0)]
+    state["last_month"] = np.maximum(state["last_month"], state["first_month"])
+    return state.reset_index(drop=True)
+
+
+ORDER_COLUMNS = ["customer_code", "first_order", "last_order", "total", "num_orders"]
+
+
+def _row_keys(orders):
+    """One hash per orders row; repeats of an identical row get distinct keys (multiset semantics)."""
+    h = pd.util.hash_pandas_object(orders[ORDER_COLUMNS], index=False).to_numpy()
+    occurrence = pd.Series(h).groupby(h).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({"row": h, "occurrence": occurrence}), index=False).to_numpy()
+
+
+def changed_customers(previous_orders, orders):
+    """Codes of customers with an orders row added, removed or changed between two versions of the table."""
+    old_keys, new_keys = _row_keys(previous_orders), _row_keys(orders)
+    gone = previous_orders["customer_code"].to_numpy(dtype=np.int64)[~np.isin(old_keys, new_keys)]
+    came = orders["customer_code"].to_numpy(dtype=np.int64)[~np.isin(new_keys, old_keys)]
+    return np.union1d(gone, came)
+
+
+def _bin(state, origin, n_months, sign=1.0):
+    """Histogram contributions of `state` rows on an (n_months x n_months) cohort x span grid."""
+    cohort = state["first_month"].to_numpy(dtype=np.int64) - origin
+    span = state["last_month"].to_numpy(dtype=np.int64) - state["first_month"].to_numpy(dtype=np.int64)
+    cell = cohort * n_months + span
+    size = n_months * n_months
+    counts = np.bincount(cell, minlength=size).astype(np.int64) * int(sign)
+    revenue = np.bincount(cell, weights=state["revenue"].to_numpy(dtype="float64") * sign, minlength=size)
+    return counts.reshape(n_months, n_months), revenue.reshape(n_months, n_months)
+
+
+def _regrid(hist, origin, n_months, new_origin, new_n):
+    """Place a cohort x span grid into a bigger one (months earlier than origin shift the cohort axis)."""
+    out = np.zeros((new_n, new_n), dtype=hist.dtype)
+    shift = origin - new_origin
+    out[shift:shift + n_months, :n_months] = hist
+    return out
+
+
+def build_histograms(state):
+    """Full computation: (customers, revenue, origin month, number of months)."""
+    if state.empty:
+        return np.zeros((0, 0), dtype=np.int64), np.zeros((0, 0)), 0, 0
+    origin = int(state["first_month"].min())
+    n_months = int(state["last_month"].max()) - origin + 1
+    counts, revenue = _bin(state, origin, n_months)
+    return counts, revenue, origin, n_months
+
+
+def update_histograms(counts, revenue, origin, n_months, old_state, new_state):
+    """
+    Incremental refresh: diff the per-customer states and move only customers that are new,
+    gone or changed (e.g. a later last order) between histogram cells. Returns build_histograms()' tuple
+    plus the number of customers that moved.
+    """
+    old_codes = old_state["customer_code"].to_numpy(dtype=np.int64)
+    new_codes = new_state["customer_code"].to_numpy(dtype=np.int64)
+    _, oi, ni = np.intersect1d(old_codes, new_codes, assume_unique=True, return_indices=True)
+    same = np.ones(len(oi), dtype=bool)
+    for col in STATE_COLUMNS[1:]:
+        same &= np.isclose(old_state[col].to_numpy(dtype=float)[oi], new_state[col].to_numpy(dtype=float)[ni],
+                           rtol=0, atol=1e-9)
+    keep_old = np.ones(len(old_state), dtype=bool)
+    keep_old[oi[same]] = False
+    keep_new = np.ones(len(new_state), dtype=bool)
+    keep_new[ni[same]] = False
+    removed, added = old_state[keep_old], new_state[keep_new]
+    changed = int(keep_new.sum() + keep_old.sum() - (~same).sum())
+
+    months = [origin, origin + n_months - 1] if n_months else []
+    if not added.empty:
+        months += [int(added["first_month"].min()), int(added["last_month"].max())]
+    if not months:
+        return build_histograms(new_state) + (0,)
+    new_origin, new_last = min(months), max(months)
+    new_n = new_last - new_origin + 1
+    if (new_origin, new_n) != (origin, n_months):
+        counts = _regrid(counts, origin, n_months, new_origin, new_n)
+        revenue = _regrid(revenue, origin, n_months, new_origin, new_n)
+    counts, revenue = counts.copy(), revenue.copy()
+    if not removed.empty:
+        c, r = _bin(removed, new_origin, new_n, sign=-1.0)
+        counts += c
+        revenue += r
+    if not added.empty:
+        c, r = _bin(added, new_origin, new_n)
+        counts += c
+        revenue += r
+    return counts, revenue, new_origin, new_n, changed
+
+
+def retention_matrices(counts, revenue):
+    """Cohort x period retained customers / revenue: reverse cumulative sums over the span axis."""
+    retained = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+    retained_revenue = np.cumsum(revenue[:, ::-1], axis=1)[:, ::-1]
+    return retained, retained_revenue
+
+
+def _histograms_from_artifact(data):
+    """Rebuild the histograms from the exact cells stored in a published cohort artifact."""
+    hist = data.get("histogram") or {}
+    origin, n_months = hist.get("origin_month"), hist.get("months", 0)
+    if origin is None or not n_months:
+        return None
+    counts = np.zeros((n_months, n_months), dtype=np.int64)
+    revenue = np.zeros((n_months, n_months))
+    cells = np.asarray(hist.get("cells", []), dtype=float).reshape(-1, 4)
+    rows, cols = cells[:, 0].astype(np.int64), cells[:, 1].astype(np.int64)
+    counts[rows, cols] = cells[:, 2].astype(np.int64)
+    revenue[rows, cols] = cells[:, 3]
+    return counts, revenue, int(origin), int(n_months)
+
+
+def _previous(name, state_name):
+    """Last published cohort artifact and customer state, or (None, None)."""
+    version = snapshots.current_version()
+    path, state_path = snapshots.artifact_path(name, version), snapshots.artifact_path(state_name, version)
+    if not (version and os.path.exists(path) and os.path.exists(state_path)):
+        return None, None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data, pd.read_csv(state_path)
+
+
+def run_customer_cohorts(orders: pd.DataFrame = None, incremental: bool = True, previous: dict = None):
+    """
+    Cohort x period retention and revenue matrices from the orders report. When a previous snapshot
+    has the matrices and customer state, only customers whose first/last order or spend changed are
+    re-binned. With `previous` (table -> frame before this refresh, as passed by run_objectives), state
+    is recomputed only for customers whose orders rows changed; the rest carries over from the snapshot.
+    Output: customer_cohorts.json (+ customer_cohort_state.csv for the next refresh).
+    """
+    if orders is None:
+        orders = get_store().table("orders")
+    published, old_state = _previous(os.path.basename(config.CUSTOMER_COHORTS_ARTIFACT),
+                                     os.path.basename(config.CUSTOMER_COHORT_STATE_ARTIFACT)) if incremental else (None, None)
+    hist = _histograms_from_artifact(published) if published else None
+    if hist is None or list(old_state.columns) != STATE_COLUMNS:
+        state = customer_state(orders)
+        mode, changed = "full", int(len(state))
+        counts, revenue, origin, n_months = build_histograms(state)
+    elif previous is not None and previous.get("orders") is not None:
+        touched = changed_customers(previous["orders"], orders)
+        fresh = customer_state(orders[np.isin(orders["customer_code"].to_numpy(dtype=np.int64), touched)])
+        stale = np.isin(old_state["customer_code"].to_numpy(dtype=np.int64), touched)
+        counts, revenue, origin, n_months, changed = update_histograms(*hist, old_state[stale], fresh)
+        state = pd.concat([old_state[~stale], fresh], ignore_index=True).sort_values("customer_code", kind="stable")
+        mode = "incremental"
+    else:
+        state = customer_state(orders)
+        counts, revenue, origin, n_months, changed = update_histograms(*hist, old_state, state)
+        mode = "incremental"
+    # Trim months that no customer touches any more (e.g. after a correction removed the earliest cohort).
+    if n_months and counts.any():
+        rows, spans = np.nonzero(counts)
+        lead, last = int(rows.min()), int((rows + spans).max())
+        counts, revenue = counts[lead:last + 1, :last - lead + 1], revenue[lead:last + 1, :last - lead + 1]
+        origin, n_months = origin + lead, last - lead + 1
+    retained, retained_revenue = retention_matrices(counts, revenue)
+
+    cohorts = []
+    for i in range(n_months):
+        periods = n_months - i  # cohort i can only be observed for the months up to the latest one
+        size = int(retained[i, 0])
+        if size == 0:
+            continue
+        cohorts.append({
+            "cohort": _label(origin + i),
+            "customers": size,
+            "revenue": round(float(retained_revenue[i, 0]), 2),
+            "retained": retained[i, :periods].astype(int).tolist(),
+            "retention": np.round(retained[i, :periods] / size, 4).tolist(),
+            "retained_revenue": np.round(retained_revenue[i, :periods], 2).tolist(),
+        })
+
+    # Size-weighted average retention per period over the cohorts that have reached it.
+    observable = (np.arange(n_months)[:, None] + np.arange(n_months)[None, :]) < n_months
+    base = np.where(observable, retained[:, :1], 0).sum(axis=0)
+    average = np.divide(np.where(observable, retained, 0).sum(axis=0), base,
+                        out=np.zeros(n_months), where=base > 0)
+
+    out = {
+        "as_of_month": _label(origin + n_months - 1) if n_months else None,
+        "customers": int(len(state)),
+        "definition": "Cohort = first-order month; retained in period k if the last order is in or after cohort month + k.",
+        "average_retention": np.round(average, 4).tolist(),
+        "cohorts": cohorts,
+        "update": {"mode": mode, "changed_customers": int(changed)},
+        # Non-zero cohort x span cells at full precision: the base of the next incremental refresh.
+        "histogram": {"origin_month": origin if n_months else None, "months": n_months,
+                      "cells": [[int(i), int(j), int(counts[i, j]), float(revenue[i, j])]
+                                for i, j in zip(*np.nonzero(counts))]},
+    }
+    write_table(config.CUSTOMER_COHORT_STATE_ARTIFACT, state[STATE_COLUMNS])
+    write_artifact(config.CUSTOMER_COHORTS_ARTIFACT, out)
+    return out
+
+
+if __name__ == "__main__":
+    r = run_customer_cohorts()
+    print("Cohorts:", len(r["cohorts"]), "as of", r["as_of_month"], f"({r['update']['mode']})")
+    for c in r["cohorts"]:
+        print(f"  {c['cohort']}: {c['customers']} customers, retention {c['retention']}")
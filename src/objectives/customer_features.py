@@ -0,0 +1,206 @@
+
+import os
+import re
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
+
+from src.data.encoding import get_dictionary
+from src.data.snapshots import write_artifact, write_table
+from src.data.store import get_store
+
+# Divisions (from the items-by-group report) that get their own mix column; the rest go to "other".
+TOP_DIVISIONS = 6
+
+# (segment, rule on R/F/M scores 1-5), first match wins; everything else is "Needs attention".
+SEGMENT_RULES = [
+    ("Champions", lambda r, f, m: (r >= 4) & (f >= 4) & (m >= 4)),
+    ("Loyal", lambda r, f, m: (f >= 4) & (m >= 3)),
+    ("Potential loyalist", lambda r, f, m: (r >= 4) & (f >= 2)),
+    ("New", lambda r, f, m: (r >= 4) & (f <= 1)),
+    ("At risk", lambda r, f, m: (r <= 2) & (f >= 2) & ((f >= 3) | (m >= 3))),
+    ("Hibernating", lambda r, f, m: (r <= 2) & (f <= 2)),
+]
+DEFAULT_SEGMENT = "Needs attention"
+# Order counts where F scores 2..5 start. Most customers order once, so percentile ranks would put
+# every one-time buyer on the same middle score; absolute bands keep F=1 meaning "one order".
+FREQUENCY_BANDS = [2, 3, 4, 6]
+
+
+def _score(values, higher_is_better=True):
+    """Quintile score 1-5 by percentile rank; ties share a score, NaN scores 1."""
+    s = pd.Series(values, dtype="float64")
+    if not higher_is_better:
+        s = -s
+    pct = s.rank(method="average", pct=True)
+    return np.ceil(pct.fillna(0).to_numpy() * 5).clip(1, 5).astype(np.int8)
+
+
+def _frequency_score(orders):
+    """F score 1-5 from the order count (FREQUENCY_BANDS)."""
+    return (np.digitize(np.nan_to_num(np.asarray(orders, dtype="float64")), FREQUENCY_BANDS) + 1).astype(np.int8)
+
+
+def unreachable_segments():
+    """Segments in SEGMENT_RULES that no R/F/M score combination reaches (shadowed by earlier rules)."""
+    r, f, m = (g.ravel() for g in np.meshgrid(*[np.arange(1, 6)] * 3, indexing="ij"))
+    reached = np.select([rule(r, f, m) for _, rule in SEGMENT_RULES],
+                        [name for name, _ in SEGMENT_RULES], default=DEFAULT_SEGMENT)
+    return [name for name, _ in SEGMENT_RULES if name not in set(reached)]
+
+
+def _division_map(items_by_group, n_products):
+    """product code -> division index (the division where the product sells most), and the division names."""
+    items = items_by_group[(items_by_group["product_code"] >= 0) & (items_by_group["division"] != "")]
+    if items.empty:
+        return np.zeros(n_products, dtype=np.int64), []
+    by_div = items.groupby("division", sort=False)["qty"].sum().sort_values(ascending=False, kind="stable")
+    top = list(by_div.index[:TOP_DIVISIONS])
+    per_product = (items.groupby(["product_code", "division"], sort=False)["qty"].sum()
+                   .reset_index().sort_values("qty", ascending=False, kind="stable")
+                   .drop_duplicates("product_code"))
+    index = {d: i for i, d in enumerate(top)}
+    out = np.full(n_products, len(top), dtype=np.int64)  # unknown / minor division -> "other"
+    codes = per_product["product_code"].to_numpy(dtype=np.int64)
+    keep = codes < n_products
+    out[codes[keep]] = per_product["division"].map(index).fillna(len(top)).to_numpy(dtype=np.int64)[keep]
+    return out, top
+
+
+def build_customer_features(orders, sales_detail, items_by_group):
+    """
+    One row per customer code: recency / frequency / monetary from the orders report, basket and
+    spend from line items, category mix by division, RFM scores and a named segment.
+    Everything is computed with array ops keyed on the dictionary code; no per-customer Python loop.
+    """
+    customers = get_dictionary("customer")
+    products = get_dictionary("product")
+    n_cust, n_prod = len(customers), len(products)
+
+    o = orders[orders["customer_code"] >= 0]
+    oc = o["customer_code"].to_numpy(dtype=np.int64)
+    last = o["last_order"].to_numpy(dtype="datetime64[ns]")
+    first = o["first_order"].to_numpy(dtype="datetime64[ns]")
+    as_of = last[~np.isnat(last)].max() if (~np.isnat(last)).any() else np.datetime64("NaT")
+
+    has_order = np.bincount(oc, minlength=n_cust) > 0
+    frequency = np.bincount(oc, weights=o["num_orders"].to_numpy(dtype="float64"), minlength=n_cust)
+    order_total = np.bincount(oc, weights=np.nan_to_num(o["total"].to_numpy(dtype="float64")), minlength=n_cust)
+    # Latest / earliest order per customer (a customer may appear on several report pages).
+    last_ns = np.full(n_cust, np.iinfo(np.int64).min, dtype=np.int64)
+    first_ns = np.full(n_cust, np.iinfo(np.int64).max, dtype=np.int64)
+    ok = ~np.isnat(last)
+    np.maximum.at(last_ns, oc[ok], last[ok].astype(np.int64))
+    ok = ~np.isnat(first)
+    np.minimum.at(first_ns, oc[ok], first[ok].astype(np.int64))
+    # int64 min is NaT, so customers without a usable date come out as NaT.
+    last_ns = last_ns.astype("datetime64[ns]")
+    first_ns = np.where(first_ns == np.iinfo(np.int64).max, np.iinfo(np.int64).min, first_ns).astype("datetime64[ns]")
+    recency_days = (as_of - last_ns) / np.timedelta64(1, "D")
+    tenure_days = (last_ns - first_ns) / np.timedelta64(1, "D")
+
+    lines = sales_detail[(sales_detail["customer_code"] >= 0) & (sales_detail["product_code"] >= 0)]
+    lc = lines["customer_code"].to_numpy(dtype=np.int64)
+    lp = lines["product_code"].to_numpy(dtype=np.int64)
+    qty = np.nan_to_num(lines["qty"].to_numpy(dtype="float64"))
+    spend = qty * np.nan_to_num(lines["price"].to_numpy(dtype="float64"))
+    line_items = np.bincount(lc, minlength=n_cust)
+    line_qty = np.bincount(lc, weights=qty, minlength=n_cust)
+    line_spend = np.bincount(lc, weights=spend, minlength=n_cust)
+    # Distinct products per customer = basket breadth.
+    pairs = np.unique(lc * max(n_prod, 1) + lp)
+    basket_size = np.bincount(pairs // max(n_prod, 1), minlength=n_cust)
+
+    div_of, divisions = _division_map(items_by_group, n_prod)
+    n_div = len(divisions) + 1
+    cell = lc * n_div + div_of[lp]
+    mix = np.bincount(cell, weights=np.clip(qty, 0, None), minlength=n_cust * n_div).reshape(n_cust, n_div)
+    mix_total = mix.sum(axis=1, keepdims=True)
+    mix = np.divide(mix, mix_total, out=np.zeros_like(mix), where=mix_total > 0)
+
+    keep = has_order | (line_items > 0)
+    codes = np.flatnonzero(keep)
+    monetary = np.where(order_total > 0, order_total, line_spend)[codes]
+    freq = np.where(has_order, frequency, (line_items > 0).astype(float))[codes]
+    recency = recency_days[codes]
+
+    r = _score(recency, higher_is_better=False)
+    f = _frequency_score(freq)
+    m = _score(monetary)
+    segment = np.select([rule(r, f, m) for _, rule in SEGMENT_RULES],
+                        [name for name, _ in SEGMENT_RULES], default=DEFAULT_SEGMENT)
+
+    out = pd.DataFrame({
+        "customer_code": codes.astype(np.int32),
+        "customer": customers.decode(codes),
+        "recency_days": np.round(recency, 3),
+        "tenure_days": np.round(tenure_days[codes], 3),
+        "frequency": freq,
+        "monetary": monetary,
+        "order_total": order_total[codes],
+        "line_items": line_items[codes],
+        "line_qty": line_qty[codes],
+        "line_spend": line_spend[codes],
+        "basket_size": basket_size[codes],
+    })
+    for i, name in enumerate(divisions + ["other"]):
+        out["mix_" + re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")] = np.round(mix[codes, i], 4)
+    out["r_score"], out["f_score"], out["m_score"] = r, f, m
+    out["rfm"] = r.astype(int) * 100 + f.astype(int) * 10 + m.astype(int)
+    out["segment"] = segment
+    return out, (None if np.isnat(as_of) else str(pd.Timestamp(as_of)))
+
+
+def run_customer_features(orders: pd.DataFrame = None, sales_detail: pd.DataFrame = None,
+                          items_by_group: pd.DataFrame = None):
+    """
+    Precompute per-customer features and RFM segments. The full table is published as
+    customer_features.csv (one row per customer) and a per-segment summary as JSON.
+    """
+    store = get_store()
+    if orders is None:
+        orders = store.table("orders")
+    if sales_detail is None:
+        sales_detail = store.table("sales_detail")
+    if items_by_group is None:
+        items_by_group = store.table("items_by_group")
+
+    features, as_of = build_customer_features(orders, sales_detail, items_by_group)
+
+    segments = []
+    if not features.empty:
+        grouped = features.groupby("segment", sort=False)
+        summary = grouped.agg(customers=("customer_code", "size"), avg_recency_days=("recency_days", "mean"),
+                              avg_frequency=("frequency", "mean"), avg_monetary=("monetary", "mean"),
+                              total_monetary=("monetary", "sum"))
+        summary = summary.sort_values(["customers", "total_monetary"], ascending=False, kind="stable")
+        for name, row in summary.iterrows():
+            segments.append({
+                "segment": name,
+                "customers": int(row["customers"]),
+                "share": round(float(row["customers"]) / len(features), 4),
+                "avg_recency_days": round(float(row["avg_recency_days"]), 2) if pd.notna(row["avg_recency_days"]) else None,
+                "avg_frequency": round(float(row["avg_frequency"]), 2),
+                "avg_monetary": round(float(row["avg_monetary"]), 2),
+                "total_monetary": round(float(row["total_monetary"]), 2),
+            })
+
+    out = {
+        "as_of": as_of,
+        "customers": int(len(features)),
+        "segments": segments,
+        "feature_columns": [c for c in features.columns if c not in ("customer_code", "customer")],
+    }
+    write_table(config.CUSTOMER_FEATURES_ARTIFACT, features)
+    write_artifact(config.CUSTOMER_SEGMENTS_ARTIFACT, out)
+    return out
+
+
+if __name__ == "__main__":
+    r = run_customer_features()
+    print("Customers:", r["customers"], "as of", r["as_of"])
+    for s in r["segments"]:
+        print(f"  {s['segment']}: {s['customers']}")
@@ -1,12 +1,15 @@
 
 import os
-import json
 import pandas as pd
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
 
+from src.data.encoding import decode
+from src.data.snapshots import write_artifact
+from src.data.store import get_store
+
 
 def run_expansion_feasibility(
     monthly_sales: pd.DataFrame = None,
@@ -17,38 +20,39 @@ def run_expansion_feasibility(
     Score existing branches and produce feasibility summary for expansion.
     Output: expansion_feasibility.json.
     """
-    if monthly_sales is None and os.path.exists(config.CLEANED_MONTHLY_SALES_PATH):
-        monthly_sales = pd.read_csv(config.CLEANED_MONTHLY_SALES_PATH)
-    if tax_by_branch is None and os.path.exists(config.CLEANED_TAX_BRANCH_PATH):
-        tax_by_branch = pd.read_csv(config.CLEANED_TAX_BRANCH_PATH)
-    if avg_sales_menu is None and os.path.exists(config.CLEANED_AVG_SALES_MENU_PATH):
-        avg_sales_menu = pd.read_csv(config.CLEANED_AVG_SALES_MENU_PATH)
+    store = get_store()
+    if monthly_sales is None:
+        monthly_sales = store.table("monthly_sales")
+    if tax_by_branch is None:
+        tax_by_branch = store.table("tax_by_branch")
+    if avg_sales_menu is None:
+        avg_sales_menu = store.table("avg_sales_menu")
 
     branch_metrics = []
+    by_code = {}
     branches = set()
-    if monthly_sales is not None and not monthly_sales.empty:
-        monthly_sales["total"] = pd.to_numeric(monthly_sales["total"], errors="coerce")
-        by_branch = monthly_sales.groupby("branch")["total"].agg(["sum", "mean", "count"]).reset_index()
-        by_branch.columns = ["branch", "total_sales", "avg_monthly_sales", "months_of_data"]
+    if not monthly_sales.empty:
+        by_branch = monthly_sales.groupby("branch_code")["total"].agg(["sum", "mean", "count"]).reset_index()
+        by_branch.columns = ["branch_code", "total_sales", "avg_monthly_sales", "months_of_data"]
+        by_branch["branch"] = decode("branch", by_branch["branch_code"])
         for _, row in by_branch.iterrows():
-            branches.add(row["branch"])
-            branch_metrics.append({
+            branches.add(int(row["branch_code"]))
+            by_code[int(row["branch_code"])] = {
                 "branch": row["branch"],
                 "total_sales_scaled": round(float(row["total_sales"]), 2),
                 "avg_monthly_sales_scaled": round(float(row["avg_monthly_sales"]), 2),
                 "months_of_data": int(row["months_of_data"]),
-            })
+            }
+            branch_metrics.append(by_code[int(row["branch_code"])])
 
-    if tax_by_branch is not None and not tax_by_branch.empty:
-        tax_by_branch["tax_total"] = pd.to_numeric(tax_by_branch["tax_total"], errors="coerce")
-        for _, row in tax_by_branch.iterrows():
-            br = row["branch"]
-            branches.add(br)
-            existing = next((m for m in branch_metrics if m["branch"] == br), None)
+    if not tax_by_branch.empty:
+        for code, tax in zip(tax_by_branch["branch_code"], tax_by_branch["tax_total"]):
+            branches.add(int(code))
+            existing = by_code.get(int(code))
             if existing:
-                existing["tax_total_scaled"] = round(float(row["tax_total"]), 2)
+                existing["tax_total_scaled"] = round(float(tax), 2)
             else:
-                branch_metrics.append({"branch": br, "tax_total_scaled": round(float(row["tax_total"]), 2)})
+                branch_metrics.append({"branch": decode("branch", code), "tax_total_scaled": round(float(tax), 2)})
 
     total_sales_all = sum(m.get("total_sales_scaled", 0) or 0 for m in branch_metrics)
     avg_per_branch = total_sales_all / len(branch_metrics) if branch_metrics else 0
@@ -69,6 +73,5 @@ def run_expansion_feasibility(
         "branch_metrics": branch_metrics,
         "recommendation": recommendation,
     }
-    with open(config.EXPANSION_ARTIFACT, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
+    write_artifact(config.EXPANSION_ARTIFACT, out)
     return out
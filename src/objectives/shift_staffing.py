@@ -1,6 +1,5 @@
 
 import os
-import json
 import pandas as pd
 import numpy as np
 
@@ -8,6 +7,10 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
 
+from src.data.encoding import decode
+from src.data.snapshots import write_artifact
+from src.data.store import get_store
+
 
 def run_shift_staffing(attendance: pd.DataFrame = None, monthly_sales: pd.DataFrame = None):
     """
@@ -15,18 +18,17 @@ def run_shift_staffing(attendance: pd.DataFrame = None, monthly_sales: pd.DataFr
     Logic: use historical attendance (hours per branch) and demand (sales) to
     derive ratio; recommend staff count per branch for typical shift.
     """
-    if attendance is None or attendance.empty:
-        if os.path.exists(config.CLEANED_ATTENDANCE_PATH):
-            attendance = pd.read_csv(config.CLEANED_ATTENDANCE_PATH)
-        else:
-            return {"recommendations": [], "message": "No attendance data."}
-
-    attendance["duration_hours"] = pd.to_numeric(attendance["duration_hours"], errors="coerce")
-    branch_hours = attendance.groupby("branch").agg({
+    if attendance is None:
+        attendance = get_store().table("attendance")
+    if attendance.empty:
+        return {"recommendations": [], "message": "No attendance data."}
+
+    branch_hours = attendance.groupby("branch_code").agg({
         "duration_hours": "sum",
-        "employee_id": "nunique",
+        "employee_code": "nunique",
     }).reset_index()
-    branch_hours.columns = ["branch", "total_hours", "unique_employees"]
+    branch_hours.columns = ["branch_code", "total_hours", "unique_employees"]
+    branch_hours["branch"] = decode("branch", branch_hours["branch_code"])
 
     branch_hours["avg_hours_per_employee"] = branch_hours["total_hours"] / branch_hours["unique_employees"].replace(0, np.nan)
     hours_per_shift = 8.0
@@ -47,6 +49,5 @@ def run_shift_staffing(attendance: pd.DataFrame = None, monthly_sales: pd.DataFr
         })
 
     out = {"recommendations": recommendations, "shift_hours_assumed": hours_per_shift}
-    with open(config.STAFFING_ARTIFACT, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
+    write_artifact(config.STAFFING_ARTIFACT, out)
     return out
@@ -3,14 +3,19 @@
 
 # Run: python test_system.py
 # 1. Runs the full pipeline (ingestion + all 5 objectives)
-# 2. Starts the API in the background and calls each endpoint
-# 3. Prints pass/fail for each step
+# 2. Checks objective logic on small hand-made inputs
+# 3. Calls each endpoint of an API running on port 8000
+# 4. Prints pass/fail for each step
 
 
 import os
 import sys
 import json
+import socket
+import threading
+import time
 import subprocess
+import contextlib
 import urllib.request
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -63,6 +68,457 @@ def check_artifacts():
     return ok
 
 
+def check_segments():
+    """Every RFM segment is reachable and a one-order customer always scores F=1."""
+    from src.objectives import customer_features
+    assert customer_features.unreachable_segments() == [], customer_features.unreachable_segments()
+    assert list(customer_features._frequency_score([1, 1, 2, 3, 5, 6, 40])) == [1, 1, 2, 3, 4, 5, 5]
+
+
+def check_default_dataset_follows_configure():
+    """configure() moves the default dataset (the benchmark points the API at synthetic artifacts this way)."""
+    import tempfile
+    data_dir, artifacts_dir = config.DATA_DIR, config.ARTIFACTS_DIR
+    tmp = tempfile.mkdtemp()
+    try:
+        config.configure(data_dir=tmp, artifacts_dir=tmp)
+        assert config.dataset_dirs(config.DEFAULT_DATASET) == (tmp, tmp)
+    finally:
+        config.configure(data_dir=data_dir, artifacts_dir=artifacts_dir)
+        os.rmdir(tmp)
+    assert config.dataset_dirs(config.DEFAULT_DATASET) == (data_dir, artifacts_dir)
+
+
+def check_export_unknown_name():
+    """An export filter on a name missing from the dictionary matches no row, even rows with a blank key."""
+    import shutil
+    import tempfile
+    import pandas as pd
+    from src.api import export
+    tmp = tempfile.mkdtemp()
+    try:
+        shutil.copytree(config.DICTIONARIES_DIR, os.path.join(tmp, "dictionaries"))
+        table = pd.read_csv(config.CLEANED_SALES_DETAIL_PATH).head(10)
+        table.loc[:4, "customer_code"] = None  # blank keys, read back as -1
+        table.to_csv(os.path.join(tmp, os.path.basename(config.CLEANED_SALES_DETAIL_PATH)), index=False)
+
+        def rows(filters):
+            plan = export.plan_export("sales_detail", tmp, filters=filters, fmt="csv")
+            return b"".join(export.iter_export(plan)).decode("utf-8").count("\n") - 1
+        assert rows(["customer=NoSuchName"]) == 0
+        assert rows(["customer!=NoSuchName"]) == 10
+        assert rows(["customer!=NoSuchName", "qty>=0"]) == rows(["qty>=0"])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def _local_api():
+    """Serve the app from a thread on a free port; yields the base URL."""
+    import uvicorn
+    from src.api.app import app
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def _post(url, body):
+    req = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return json.loads(resp.read().decode())
+
+
+def check_tool_batch():
+    """Batch contract: request order, identical calls run once, one pinned snapshot, per-call errors."""
+    from src.api import app as api
+    from src.data import snapshots
+
+    def probe(tag: str = ""):
+        return {"tag": tag, "snapshot": api._PINNED_VERSION.get()}
+
+    def fail():
+        raise ValueError("broken tool")
+
+    api.TOOLS["check_probe"] = (probe, "GET", "/check/probe")
+    api.TOOLS["check_fail"] = (fail, "GET", "/check/fail")
+    try:
+        with _local_api() as base:
+            out = _post(base + "/api/tools/batch", {"calls": [
+                {"tool": "check_probe", "args": {"tag": "a"}},
+                {"tool": "check_fail"},
+                {"tool": "demand_forecast"},
+                {"tool": "check_probe", "args": {"tag": "a"}},
+                {"tool": "no_such_tool"},
+                {"tool": "check_probe", "args": {"tag": "b"}},
+            ]})
+    finally:
+        del api.TOOLS["check_probe"], api.TOOLS["check_fail"]
+    statuses = [r["status"] for r in out["results"]]
+    assert statuses == [200, 500, 200, 200, 404, 200], statuses
+    assert out["calls"] == 6 and out["executed"] == 4, (out["calls"], out["executed"])
+    assert out["results"][1]["error"] == "broken tool"
+    assert [out["results"][i]["result"]["tag"] for i in (0, 3, 5)] == ["a", "a", "b"]
+    assert out["snapshot"] == snapshots.current_version()
+    assert {out["results"][i]["result"]["snapshot"] for i in (0, 3, 5)} == {out["snapshot"]}
+
+
+def check_dictionary():
+    """encode assigns stable codes (blank -> -1), lookup never assigns, decode inverts both."""
+    from src.data.encoding import Dictionary, MISSING
+    d = Dictionary("check", ["Conut"])
+    codes = d.encode(["Conut Jnah", " Conut ", None, "", "Conut Jnah"])
+    assert list(codes) == [1, 0, MISSING, MISSING, 1] and len(d) == 2
+    assert list(d.lookup(["Conut Jnah", "Tyre"])) == [1, MISSING] and len(d) == 2
+    assert list(d.decode(codes)) == ["Conut Jnah", "Conut", "", "", "Conut Jnah"]
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        return json.loads(resp.read().decode())
+
+
+def check_snapshots():
+    """Publish, failed publish, rollback and the admin endpoints, on a throwaway named dataset."""
+    import shutil
+    import tempfile
+    from src.data import snapshots
+    datasets_dir, tmp = config.DATASETS_DIR, tempfile.mkdtemp()
+    config.DATASETS_DIR = tmp
+    try:
+        config.use_dataset("check")
+        with snapshots.staging():
+            snapshots.write_artifact(config.DEMAND_FORECAST_ARTIFACT, {"forecasts": [{"branch": "v1"}]})
+        first = snapshots.current_version()
+        snapshots.write_artifact(config.DEMAND_FORECAST_ARTIFACT, {"forecasts": [{"branch": "v2"}]})
+        second = snapshots.current_version()
+        try:
+            with snapshots.staging():
+                snapshots.write_artifact(config.DEMAND_FORECAST_ARTIFACT, {"forecasts": [{"branch": "v3"}]})
+                raise RuntimeError("objective failed")
+        except RuntimeError:
+            pass
+        assert snapshots.list_versions() == [first, second] and snapshots.current_version() == second
+
+        with _local_api() as base:
+            forecast = base + "/api/demand_forecast?dataset=check"
+            assert _get(forecast)["forecasts"] == [{"branch": "v2"}]
+            listed = _get(base + "/api/admin/snapshots?dataset=check")
+            assert listed["current"] == second and listed["versions"] == [first, second]
+            rolled = _post(base + "/api/admin/rollback?dataset=check", {})
+            assert rolled["current"] == first
+            assert _get(forecast)["forecasts"] == [{"branch": "v1"}]
+        with open(config.DEMAND_FORECAST_ARTIFACT, "r", encoding="utf-8") as f:
+            assert json.load(f)["forecasts"] == [{"branch": "v1"}]  # flat mirror follows the rollback
+    finally:
+        config.use_dataset(config.DEFAULT_DATASET)
+        config.DATASETS_DIR = datasets_dir
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def check_admin_guard():
+    """State-changing admin endpoints: local-only without a token, X-Admin-Token with one, never CORS."""
+    import urllib.error
+
+    def status(url, method="POST", **headers):
+        req = urllib.request.Request(url, data=b"{}" if method == "POST" else None, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                return resp.status, resp.headers.get("access-control-allow-origin")
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get("access-control-allow-origin")
+
+    token = config.ADMIN_TOKEN
+    with _local_api() as base:
+        reload_url = base + "/api/admin/reload"
+        try:
+            assert status(reload_url) == (200, None)
+            assert status(reload_url, Origin="http://evil.example") == (403, None)
+            assert status(base + "/api/admin/rollback", Origin="http://evil.example") == (403, None)
+            assert status(reload_url, method="OPTIONS", Origin="http://evil.example",
+                          **{"Access-Control-Request-Method": "POST"})[1] is None
+            assert status(base + "/health", method="GET", Origin="http://evil.example") == (200, "*")
+            config.ADMIN_TOKEN = "check-token"
+            assert status(reload_url)[0] == 401
+            assert status(reload_url, **{"X-Admin-Token": "wrong"})[0] == 401
+            assert status(reload_url, **{"X-Admin-Token": "check-token"})[0] == 200
+        finally:
+            config.ADMIN_TOKEN = token
+
+
+def check_export_endpoint():
+    """GET /api/export/{table} streams the header plus exactly `limit` rows."""
+    with _local_api() as base:
+        with urllib.request.urlopen(base + "/api/export/sales_detail?format=csv&limit=3", timeout=10) as resp:
+            assert len(resp.read().decode().strip().splitlines()) == 4
+        assert "sales_detail" in _get(base + "/api/export")["tables"]
+
+
+def check_reconcile():
+    """Blocks whose cleaned rows sum to the report's Total row pass; others are flagged and quarantined, per branch."""
+    import pandas as pd
+    from src.data.encoding import get_dictionary
+    from src.data.reconciliation import reconcile
+    tyre, jnah = get_dictionary("branch").lookup(["Conut - Tyre", "Conut Jnah"])
+    df = pd.DataFrame({"branch_code": [tyre, tyre, tyre, jnah], "division": ["Hot", "Hot", "Cold", "Cold"],
+                       "qty": [2.0, 3.0, 4.0, 1.0], "total_amount": [10.0, 15.0, 20.0, 5.0]})
+    # Cold sums to 5 across both branches, but the report closes it per branch: Tyre's block is off by one.
+    totals = [{"level": "division", "key": ("Conut - Tyre", "Hot"), "qty": 5.0, "total_amount": 25.0},
+              {"level": "division", "key": ("Conut - Tyre", "Cold"), "qty": 3.0, "total_amount": 20.0},
+              {"level": "division", "key": ("Conut Jnah", "Cold"), "qty": 2.0, "total_amount": 5.0}]
+    result, quarantined = reconcile("items_by_group", df, totals)
+    division = result["levels"]["division"]
+    assert result["status"] == "mismatch" and division["blocks"] == 3 and division["mismatched"] == 2
+    assert [m["key"] for m in division["mismatches"]] == [["Conut - Tyre", "Cold"], ["Conut Jnah", "Cold"]]
+    assert list(division["mismatches"][0]["measures"]) == ["qty"] and division["unreconciled_rows"] == 0
+    assert quarantined["qty"].tolist() == [4.0, 1.0]
+    assert reconcile("items_by_group", df, totals[:1])[0]["status"] == "ok"
+
+
+def check_validation_endpoint():
+    """GET /api/admin/validation serves the last ingestion's report."""
+    with _local_api() as base:
+        report = _get(base + "/api/admin/validation")
+    assert report["status"] in ("ok", "mismatch", "no_totals") and "tables" in report
+
+
+def check_cohort_update():
+    """Incremental cohort refresh equals a full rebuild (changed, removed, added and earlier-cohort customers)."""
+    import numpy as np
+    import pandas as pd
+    from src.objectives import customer_cohorts as cohorts
+    rng = np.random.default_rng(0)
+    n = 500
+    first = rng.integers(24300, 24310, n)
+    old = pd.DataFrame({"customer_code": np.arange(n), "first_month": first,
+                        "last_month": first + rng.integers(0, 4, n),
+                        "revenue": rng.uniform(0, 100, n).round(2), "orders": rng.integers(1, 5, n)})
+    new = old.iloc[40:].copy()  # 40 customers gone
+    new.loc[new.index[:60], "last_month"] += 3  # 60 ordered again later
+    new.loc[new.index[60:80], "revenue"] += 10.5
+    added = pd.DataFrame({"customer_code": np.arange(n, n + 30), "first_month": np.full(30, 24295),
+                          "last_month": np.full(30, 24312), "revenue": np.full(30, 7.25), "orders": np.ones(30, dtype=int)})
+    new = pd.concat([new, added], ignore_index=True)
+
+    counts, revenue, origin, n_months, changed = cohorts.update_histograms(*cohorts.build_histograms(old), old, new)
+    full_counts, full_revenue, full_origin, full_n = cohorts.build_histograms(new)
+    assert (origin, n_months) == (full_origin, full_n)
+    assert np.array_equal(counts, full_counts)
+    assert np.allclose(revenue, full_revenue)
+    assert changed == 40 + 80 + 30, changed
+
+
+def check_cohort_refresh_from_changed_rows():
+    """With the previous orders table, only customers whose rows changed are recomputed; the result equals a full run."""
+    import shutil
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from src.objectives import customer_cohorts as cohorts
+    rng = np.random.default_rng(1)
+    n = 300
+    first = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 200, n), unit="D")
+    old = pd.DataFrame({"customer_code": np.arange(n) % 250, "first_order": first,
+                        "last_order": first + pd.to_timedelta(rng.integers(0, 150, n), unit="D"),
+                        "total": rng.uniform(1, 100, n).round(2), "num_orders": rng.integers(1, 9, n)})
+    new = old.drop(index=range(10)).reset_index(drop=True)  # customers 0-9 lose a row
+    new.loc[20:24, "last_order"] += pd.Timedelta(days=90)  # customers 30-34 ordered again
+    new = pd.concat([new, old.iloc[[100]], pd.DataFrame({
+        "customer_code": [400], "first_order": [pd.Timestamp("2024-11-05")], "last_order": [pd.Timestamp("2025-08-01")],
+        "total": [5.0], "num_orders": [1]})], ignore_index=True)  # duplicate row for customer 100, one new customer
+    assert list(cohorts.changed_customers(old, new)) == list(range(10)) + list(range(30, 35)) + [100, 400]
+
+    datasets_dir, tmp = config.DATASETS_DIR, tempfile.mkdtemp()
+    config.DATASETS_DIR = tmp
+    try:
+        config.use_dataset("check")
+        cohorts.run_customer_cohorts(old)
+        refreshed = cohorts.run_customer_cohorts(new, previous={"orders": old})
+        full = cohorts.run_customer_cohorts(new, incremental=False)
+    finally:
+        config.use_dataset(config.DEFAULT_DATASET)
+        config.DATASETS_DIR = datasets_dir
+        shutil.rmtree(tmp, ignore_errors=True)
+    assert refreshed["update"]["mode"] == "incremental" and refreshed["update"]["changed_customers"] <= 17
+    assert refreshed["customers"] == full["customers"]
+    assert refreshed["cohorts"] == full["cohorts"] and refreshed["average_retention"] == full["average_retention"]
+
+
+def check_cohorts_endpoint():
+    """GET /api/customer_cohorts serves the matrices; ?cohort= narrows them to one cohort."""
+    with _local_api() as base:
+        cohorts = _get(base + "/api/customer_cohorts")["cohorts"]
+        one = _get(base + "/api/customer_cohorts?cohort=" + cohorts[0]["cohort"])["cohorts"]
+    assert len(one) == 1 and one[0]["cohort"] == cohorts[0]["cohort"]
+
+
+def check_similar_branches_endpoint():
+    """GET peers of one branch (never itself), POST a sweep of candidate profiles, reject non-finite values."""
+    import urllib.error
+    import urllib.parse
+    with _local_api() as base:
+        branch = _get(base + "/api/expansion/similar_branches")["peers"][0]["branch"]
+        near = _get(base + "/api/expansion/similar_branches?k=2&branch=" + urllib.parse.quote(branch))
+        assert len(near["neighbors"]) == 2 and branch not in [n["branch"] for n in near["neighbors"]]
+        swept = _post(base + "/api/expansion/similar_branches", {"profiles": [{}, {"avg_monthly_sales": 1e9}], "k": 1})
+        for bad in (float("nan"), float("inf")):
+            try:
+                _post(base + "/api/expansion/similar_branches", {"profiles": [{"avg_monthly_sales": bad}]})
+                raise AssertionError(f"profile value {bad} was accepted")
+            except urllib.error.HTTPError as e:
+                assert e.code in (400, 422), e.code
+    assert len(swept["results"]) == 2 and all(len(r["neighbors"]) == 1 for r in swept["results"])
+
+
+def check_resident_table():
+    """Packed tables: key lookups (unique and repeated keys) and row materialization."""
+    import shutil
+    import tempfile
+    import pandas as pd
+    from src.data import resident
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "item_forecasts.csv")
+        pd.DataFrame({"product": ["B", "A", "C", "A", "B", "A"], "units": [1.5, 2.0, 3.0, 4.0, 5.0, 6.0]}).to_csv(path, index=False)
+        table = resident.open_table(path)
+        assert len(table) == 6 and table.find("C") == 2 and table.find("Z") is None
+        assert list(table.find_all("A")) == [1, 3, 5] and len(table.find_all("Z")) == 0
+        assert table.frame(table.find_all("B"))["units"].tolist() == [1.5, 5.0]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def check_resident_document():
+    """Packed JSON documents: spliced slices and projections equal the parsed artifact; mapped entries count against the cache."""
+    import shutil
+    import tempfile
+    from src.api.cache import ArtifactCache
+    from src.data import resident
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "customer_cohorts.json")
+        data = {"as_of": "2025-12", "cohorts": [{"cohort": "2025-01", "n": 1, "retention": [1.0, 0.5]},
+                                                {"cohort": "2025-02", "n": 2, "retention": [1.0]}],
+                "mixed": [{"a": 1}, {"b": "é"}, 3], "histogram": {"1": 2}}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        doc = resident.open_document(path)
+        assert json.loads(bytes(doc.body)) == data
+        assert list(doc.labels("cohorts")) == ["2025-01", "2025-02"]
+        assert json.loads(doc.items("cohorts", [1])) == data["cohorts"][1:]
+        assert json.loads(doc.items("cohorts", drop=("retention",))) == [{"cohort": "2025-01", "n": 1}, {"cohort": "2025-02", "n": 2}]
+        assert json.loads(doc.items("mixed", [1, 2], drop=("a",))) == [{"b": "é"}, 3]
+        assert json.loads(doc.render({"cohorts": doc.items("cohorts", [])}, drop=("histogram",))) == {
+            "as_of": "2025-12", "cohorts": [], "mixed": data["mixed"]}
+        cache = ArtifactCache(doc.nbytes * 2, max_entries=2)
+        for i in range(3):
+            cache.put(("check", None, i), doc, doc.nbytes)
+        assert cache.stats()["entries"] == 2 and cache.get(("check", None, 0)) is None
+        cache.put(("check", None, 3), doc, doc.nbytes + 1)
+        assert cache.stats()["entries"] == 1  # mapped size counts against the byte budget
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def check_item_forecast_endpoint():
+    """GET /api/item_forecast: summary without filters, substring branch filter with a row limit."""
+    import urllib.parse
+    with _local_api() as base:
+        summary = _get(base + "/api/item_forecast")
+        name = summary["branches"][-1]["branch"]
+        rows = _get(base + "/api/item_forecast?limit=5&branch=" + urllib.parse.quote(name))
+    matching = sum(b["series"] for b in summary["branches"] if name.lower() in b["branch"].lower())
+    assert rows["total"] == matching and len(rows["series"]) == min(5, matching)
+
+
+def check_watch_survives_bad_export():
+    """Watch mode: a malformed export fails its batch only; the next good export is still picked up."""
+    import shutil
+    import tempfile
+    import run_pipeline
+    from src.data import snapshots
+    from src.data.ingestion import run_ingestion
+    from src.data.store import DataStore
+    datasets_dir, tmp = config.DATASETS_DIR, tempfile.mkdtemp()
+    watch_changes, notify_api = run_pipeline.watch_changes, run_pipeline.notify_api
+    name = "rep_s_00334_1_SMRY.csv"
+    config.DATASETS_DIR = tmp
+    try:
+        data_dir = config.dataset_dirs("check")[0]
+        shutil.copytree(config.DATA_DIR, data_dir)
+        config.use_dataset("check")
+        with open(os.path.join(data_dir, name), "rb") as f:
+            good = f.read()
+        data = DataStore(run_ingestion())
+        first = run_pipeline.run_objectives(data)
+        months = len(data.table("monthly_sales"))
+
+        def batches(*args, **kwargs):
+            with open(os.path.join(data_dir, name), "w", encoding="utf-8") as f:
+                f.write("Branch Name: Conut\nAugust,,1e999,100,\n")  # year overflows int()
+            yield {name}
+            with open(os.path.join(data_dir, name), "wb") as f:
+                f.write(good)
+            yield {name}
+
+        run_pipeline.watch_changes, run_pipeline.notify_api = batches, lambda *args, **kwargs: False
+        run_pipeline.watch(data, debounce=0, interval=0, use_inotify=False)
+        versions = snapshots.list_versions()
+        assert len(versions) == 2 and versions[0] == first and snapshots.current_version() == versions[1], versions
+        assert len(data.table("monthly_sales")) == months
+        assert not [d for d in os.listdir(config.SNAPSHOTS_DIR) if d.startswith(".staging")]
+    finally:
+        run_pipeline.watch_changes, run_pipeline.notify_api = watch_changes, notify_api
+        config.use_dataset(config.DEFAULT_DATASET)
+        config.DATASETS_DIR = datasets_dir
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+LOGIC_CHECKS = [
+    ("RFM segment rules", check_segments),
+    ("default dataset follows configure()", check_default_dataset_follows_configure),
+    ("export filter on an unknown name", check_export_unknown_name),
+    ("tool batch contract", check_tool_batch),
+    ("dictionary encode / lookup", check_dictionary),
+    ("snapshot publish / rollback", check_snapshots),
+    ("admin endpoint guard", check_admin_guard),
+    ("export endpoint", check_export_endpoint),
+    ("report total reconciliation", check_reconcile),
+    ("validation endpoint", check_validation_endpoint),
+    ("incremental cohort refresh", check_cohort_update),
+    ("cohort refresh from changed orders rows", check_cohort_refresh_from_changed_rows),
+    ("cohorts endpoint", check_cohorts_endpoint),
+    ("similar branches endpoints", check_similar_branches_endpoint),
+    ("resident table lookups", check_resident_table),
+    ("resident document slicing", check_resident_document),
+    ("item forecast endpoint", check_item_forecast_endpoint),
+    ("watch mode survives a bad export", check_watch_survives_bad_export),
+]
+
+
+def check_logic():
+    """Run the LOGIC_CHECKS; each raises AssertionError on a wrong result."""
+    print("Step 3: Checking objective logic...")
+    ok = True
+    for name, check in LOGIC_CHECKS:
+        try:
+            check()
+            print("  OK -", name)
+        except Exception as e:
+            print("  FAIL -", name, ":", repr(e)[:200])
+            ok = False
+    return ok
+
+
 def call_api(path):
     """GET request to local API. Returns (success, data or error string)."""
     try:
@@ -76,7 +532,7 @@ def call_api(path):
 
 def test_api_endpoints():
     """Test API endpoints. API must already be running (e.g. uvicorn src.api.app:app --port 8000)."""
-    print("Step 3: Testing API endpoints (expects API on http://127.0.0.1:8000)...")
+    print("Step 4: Testing API endpoints (expects API on http://127.0.0.1:8000)...")
     try:
         req = urllib.request.Request("http://127.0.0.1:8000/health")
         urllib.request.urlopen(req, timeout=2)
@@ -94,6 +550,13 @@ def test_api_endpoints():
         ("/api/expansion_feasibility", "expansion feasibility"),
         ("/api/staffing_recommendation", "staffing recommendation"),
         ("/api/coffee_milkshake_strategy", "coffee/milkshake strategy"),
+        ("/api/admin/snapshots", "snapshots"),
+        ("/api/customers/segments", "customer segments"),
+        ("/api/admin/datasets", "datasets"),
+        ("/api/export", "export tables"),
+        ("/api/customer_cohorts", "customer cohorts"),
+        ("/api/expansion/similar_branches", "similar branches"),
+        ("/api/item_forecast", "item forecast"),
     ]
     all_ok = True
     for path, name in endpoints:
@@ -112,9 +575,10 @@ def main():
     print("=" * 60)
     p = run_pipeline()
     a = check_artifacts()
+    logic_ok = check_logic()
     api_ok = test_api_endpoints()
     print("=" * 60)
-    if p and a and api_ok:
+    if p and a and logic_ok and api_ok:
         print("All tests PASSED. System is working.")
     else:
         print("Some tests failed. Check output above.")